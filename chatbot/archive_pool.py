@@ -0,0 +1,152 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+ZIM Archive Handle Pool.
+Keeps at most `max_open` libzim.Archive handles open, evicting the least
+recently used one when a new archive is needed, so large collections stay
+within file-descriptor and memory limits. Archives can be pre-opened on a
+background thread at startup; `ready` is set once that pass finishes.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from chatbot.debug_utils import debug_print
+
+
+class ArchivePool:
+    """Thread-safe LRU of open archives keyed by absolute path."""
+
+    def __init__(self, max_open: int, on_open: Callable = None, on_evict: Callable = None):
+        """
+        Args:
+            max_open: Maximum number of simultaneously open archives (<= 0 means unlimited)
+            on_open: Called as on_open(path, archive) after an archive is opened
+            on_evict: Called as on_evict(path) after an archive is dropped from the pool
+        """
+        self.max_open = max_open
+        self.on_open = on_open
+        self.on_evict = on_evict
+        self._archives: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._opening: Dict[str, threading.Event] = {}
+        self.failed: Dict[str, str] = {}
+        self.evictions = 0
+
+        # Background pre-open state
+        self.ready = threading.Event()
+        self.ready.set()  # Nothing pending until preopen() is called
+        self._preopen_total = 0
+        self._preopen_done = 0
+
+    def __len__(self) -> int:
+        return len(self._archives)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._archives
+
+    def get(self, path: str):
+        """Return an open archive for path, opening (and evicting) as needed. None on failure."""
+        while True:
+            with self._lock:
+                archive = self._archives.get(path)
+                if archive is not None:
+                    self._archives.move_to_end(path)
+                    return archive
+                pending = self._opening.get(path)
+                if pending is None:
+                    # This caller opens it; concurrent callers wait for the result
+                    pending = self._opening[path] = threading.Event()
+                    break
+            pending.wait()
+            with self._lock:
+                if path in self.failed and path not in self._archives:
+                    return None
+
+        try:
+            return self._open(path)
+        finally:
+            with self._lock:
+                del self._opening[path]
+            pending.set()
+
+    def _open(self, path: str):
+        import libzim
+
+        debug_print(f"Opening ZIM archive (pooled): {os.path.basename(path)}")
+        try:
+            archive = libzim.Archive(path)
+            if self.on_open:
+                self.on_open(path, archive)
+        except Exception as e:
+            print(f"Failed to open ZIM: {path}: {e}")
+            with self._lock:
+                self.failed[path] = str(e)
+            return None
+
+        evicted = []
+        with self._lock:
+            self.failed.pop(path, None)
+            self._archives[path] = archive
+            while self.max_open > 0 and len(self._archives) > self.max_open:
+                old_path, _ = self._archives.popitem(last=False)
+                evicted.append(old_path)
+                self.evictions += 1
+        for old_path in evicted:
+            # Handles still held by in-flight probes stay valid until released
+            debug_print(f"Evicted ZIM archive from pool: {os.path.basename(old_path)}")
+            if self.on_evict:
+                self.on_evict(old_path)
+        return archive
+
+    def preopen(self, paths: List[str], then: Optional[Callable] = None) -> threading.Thread:
+        """
+        Open archives in order on a daemon thread (at most max_open of them).
+        then(), if given, runs on that thread once the pass has finished.
+        """
+        if self.max_open > 0:
+            paths = paths[:self.max_open]
+        self._preopen_total = len(paths)
+        self._preopen_done = 0
+        self.ready.clear()
+
+        def run():
+            try:
+                for path in paths:
+                    self.get(path)
+                    self._preopen_done += 1
+            finally:
+                self.ready.set()
+                debug_print(f"ZIM pre-open finished: {len(self._archives)} archive(s) open")
+            if then is not None:
+                then()
+
+        thread = threading.Thread(target=run, name="zim-preopen", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> Dict:
+        """Readiness summary for status displays."""
+        with self._lock:
+            return {
+                'ready': self.ready.is_set(),
+                'open': len(self._archives),
+                'max_open': self.max_open,
+                'preopened': self._preopen_done,
+                'preopen_total': self._preopen_total,
+                'failed': len(self.failed),
+                'evictions': self.evictions,
+            }
+
+    def close_all(self) -> None:
+        with self._lock:
+            paths = list(self._archives)
+            self._archives.clear()
+        for path in paths:
+            if self.on_evict:
+                self.on_evict(path)
@@ -0,0 +1,171 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Shared Article Text Cache.
+An in-process, byte-budgeted LRU of cleaned article text keyed by
+(archive fingerprint, entry index, view). Retrieval, search_by_title,
+the multi-hop resolver and the CLI/GUI article viewers all read through
+one instance, so an article is decompressed and cleaned once per process.
+
+The most recently used entries are kept as plain strings. Older ("cold")
+entries are zstd-compressed when the optional zstandard package is
+installed, and stored as UTF-8 bytes otherwise.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from chatbot import config
+from chatbot.zim_utils import entry_index
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Views of an article's text; each is cached under its own key
+LEAD = "lead"      # bounded retrieval text (TextProcessor.extract_lead_text)
+RENDER = "render"  # formatted full text for the article viewers
+
+
+def article_key(archive_id: str, entry, view: str = LEAD) -> Tuple[str, int, str]:
+    """Cache key for an entry's text. archive_id is archive_fingerprint() of its archive."""
+    return (archive_id, entry_index(entry), view)
+
+
+class ArticleTextCache:
+    """Thread-safe LRU of article text with a total byte budget."""
+
+    def __init__(self, max_bytes: int, hot_entries: int = 64, compress: bool = True):
+        self.max_bytes = max_bytes
+        self.hot_entries = hot_entries
+        self._lock = threading.Lock()
+        self._hot: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._cold: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+        self._compressor = None
+        self._decompressor = None
+        if compress and zstandard is not None:
+            self._compressor = zstandard.ZstdCompressor(level=3)
+            self._decompressor = zstandard.ZstdDecompressor()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._hot) + len(self._cold)
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """Return cached text (promoting it to most-recent), or None on a miss."""
+        with self._lock:
+            text = self._hot.get(key)
+            if text is not None:
+                self._hot.move_to_end(key)
+                self.hits += 1
+                return text
+            blob = self._cold.pop(key, None)
+            if blob is None:
+                self.misses += 1
+                return None
+            self._bytes -= self._sizes.pop(key)
+            text = self._decode(blob)
+            self._insert_hot(key, text)
+            self.hits += 1
+            return text
+
+    def put(self, key: Hashable, text: str) -> None:
+        """Insert or replace an entry. Text larger than the whole budget is not cached."""
+        size = sys.getsizeof(text)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._insert_hot(key, text)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], str]) -> str:
+        """Return cached text, or call loader() outside the lock and cache its result."""
+        text = self.get(key)
+        if text is None:
+            text = loader()
+            self.put(key, text)
+        return text
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hot.clear()
+            self._cold.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._hot) + len(self._cold),
+                'cold_entries': len(self._cold),
+                'bytes': self._bytes,
+            }
+
+    # --- internals (caller holds the lock) ---
+
+    def _insert_hot(self, key: Hashable, text: str) -> None:
+        size = sys.getsizeof(text)
+        self._hot[key] = text
+        self._sizes[key] = size
+        self._bytes += size
+
+        # Demote the least recently used hot entries to the cold tier
+        while len(self._hot) > self.hot_entries:
+            old_key, old_text = self._hot.popitem(last=False)
+            self._bytes -= self._sizes[old_key]
+            blob = self._encode(old_text)
+            self._cold[old_key] = blob
+            self._sizes[old_key] = len(blob)
+            self._bytes += len(blob)
+
+        # Enforce the byte budget, coldest entries first
+        while self._bytes > self.max_bytes and (self._cold or len(self._hot) > 1):
+            tier = self._cold if self._cold else self._hot
+            old_key, _ = tier.popitem(last=False)
+            self._bytes -= self._sizes.pop(old_key)
+            self.evictions += 1
+
+    def _discard(self, key: Hashable) -> None:
+        if self._hot.pop(key, None) is not None or self._cold.pop(key, None) is not None:
+            self._bytes -= self._sizes.pop(key)
+
+    def _encode(self, text: str) -> bytes:
+        data = text.encode('utf-8')
+        if self._compressor is not None:
+            return self._compressor.compress(data)
+        return data
+
+    def _decode(self, blob: bytes) -> str:
+        if self._decompressor is not None:
+            blob = self._decompressor.decompress(blob)
+        return blob.decode('utf-8')
+
+
+_shared_cache: Optional[ArticleTextCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_article_cache() -> ArticleTextCache:
+    """Process-wide cache instance, sized from config."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ArticleTextCache(
+                max_bytes=config.ARTICLE_CACHE_MAX_BYTES,
+                hot_entries=config.ARTICLE_CACHE_HOT_ENTRIES,
+                compress=config.ARTICLE_CACHE_COMPRESS,
+            )
+        return _shared_cache
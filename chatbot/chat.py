@@ -25,6 +25,7 @@ from typing import List, Iterable
 from chatbot.models import Message
 from chatbot import config
 from chatbot.model_manager import ModelManager
+from chatbot import speculative
 
 
 
@@ -51,71 +52,103 @@ def _update_status(status: str):
             pass
 
 
+def _draft_model_for(model: str):
+    """Draft model for speculative answer decoding, or None to decode plainly."""
+    draft = getattr(config, 'SPECULATIVE_DRAFT_MODEL', None)
+    if not getattr(config, 'SPECULATIVE_DECODING', False) or config.API_MODE:
+        return None
+    if not draft or draft == model or not speculative.pair_enabled(model, draft):
+        return None
+    return draft
+
+
 def stream_chat(model: str, messages: List[dict]) -> Iterable[str]:
-    """Stream chat with local model."""
+    """
+    Stream chat with local model.
+    Holds ModelManager.inference_lock until the stream ends or the generator is
+    closed, so consume it on one thread.
+    """
     debug_print(f"stream_chat called with model='{model}'")
     
     try:
-        # Get model instance (caching handled by manager)
-        # Use global config context or default to 8192 (safe for 12GB VRAM)
-        n_ctx = getattr(config, 'DEFAULT_CONTEXT_SIZE', 8192)
-        llm = ModelManager.get_model(model, n_ctx=n_ctx)
+        # Joints reuse this llama.cpp instance (ModelManager shares it across context
+        # sizes), so hold inference_lock from lookup to the end of the stream, as
+        # joints.base.local_inference does; retrieval for other queries waits meanwhile
+        with ModelManager.inference_lock:
+            # Get model instance (caching handled by manager)
+            # Use global config context or default to 8192 (safe for 12GB VRAM)
+            n_ctx = getattr(config, 'DEFAULT_CONTEXT_SIZE', 8192)
+            draft = _draft_model_for(model)
+            llm = ModelManager.get_model(model, n_ctx=n_ctx, chat_model=True, draft_model=draft)
+            drafter = getattr(llm, 'draft_model', None) if draft else None
+            if drafter is not None:
+                drafter.reset_stats()
+            timer = speculative.StreamTimer("draft" if drafter is not None else "plain")
         
-        debug_print("Starting local generation stream...")
-        _update_status("Reading context (Processing Prompt)...")
-        stream = llm.create_chat_completion(
-            messages=messages,
-            stream=True,
-            temperature=0.3, # Lower temp for more focused answers
-            repeat_penalty=1.2, # Stronger penalty to prevent "But wait" loops
-            max_tokens=None  # Allow full generation
-        )
+            debug_print("Starting local generation stream...")
+            _update_status("Reading context (Processing Prompt)...")
+            stream = llm.create_chat_completion(
+                messages=messages,
+                stream=True,
+                temperature=0.3, # Lower temp for more focused answers
+                repeat_penalty=1.2, # Stronger penalty to prevent "But wait" loops
+                max_tokens=None  # Allow full generation
+            )
         
-        buffer = ""
-        in_thought_block = False
+            try:
+                buffer = ""
+                in_thought_block = False
 
-        for chunk in stream:
-            delta = chunk.get('choices', [{}])[0].get('delta', {})
-            if 'content' in delta and delta['content'] is not None:
-                content = str(delta['content'])
-                buffer += content
+                for chunk in stream:
+                    timer.tick()
+                    delta = chunk.get('choices', [{}])[0].get('delta', {})
+                    if 'content' in delta and delta['content'] is not None:
+                        content = str(delta['content'])
+                        buffer += content
 
-                while True:
-                    if in_thought_block:
-                        end_tag = "</thought>"
-                        if end_tag in buffer:
-                            _, after = buffer.split(end_tag, 1)
-                            buffer = after
-                            in_thought_block = False
-                        else:
-                            break
-                    else:
-                        start_tag = "<thought>"
-                        if start_tag in buffer:
-                            before, after = buffer.split(start_tag, 1)
-                            if before:
-                                yield before
-                            buffer = after
-                            in_thought_block = True
-                        else:
-                            # Optimization: only check potential start tag
-                            if "<" in buffer:
-                                safe_len = buffer.find("<")
-                                if safe_len > 0:
-                                    yield buffer[:safe_len]
-                                    buffer = buffer[safe_len:]
-                                break
+                        while True:
+                            if in_thought_block:
+                                end_tag = "</thought>"
+                                if end_tag in buffer:
+                                    _, after = buffer.split(end_tag, 1)
+                                    buffer = after
+                                    in_thought_block = False
+                                else:
+                                    break
                             else:
-                                if buffer:
-                                    yield buffer
-                                    buffer = ""
-                                break
+                                start_tag = "<thought>"
+                                if start_tag in buffer:
+                                    before, after = buffer.split(start_tag, 1)
+                                    if before:
+                                        yield before
+                                    buffer = after
+                                    in_thought_block = True
+                                else:
+                                    # Optimization: only check potential start tag
+                                    if "<" in buffer:
+                                        safe_len = buffer.find("<")
+                                        if safe_len > 0:
+                                            yield buffer[:safe_len]
+                                            buffer = buffer[safe_len:]
+                                        break
+                                    else:
+                                        if buffer:
+                                            yield buffer
+                                            buffer = ""
+                                        break
         
-        # Yield remaining buffer if not in thought block
-        if buffer and not in_thought_block:
-            yield buffer
+                # Yield remaining buffer if not in thought block
+                if buffer and not in_thought_block:
+                    yield buffer
             
-        debug_print(f"Stream complete.")
+                timer.finish()
+                if drafter is not None:
+                    debug_print(f"Draft acceptance: {drafter.accepted}/{drafter.proposed} ({drafter.acceptance:.0%})")
+                debug_print(f"Stream complete.")
+            finally:
+                if drafter is not None:
+                    # Joints are served by this instance between answers and decode plainly
+                    drafter.pause()
             
     except Exception as e:
         debug_print(f"Local inference error: {e}")
@@ -127,19 +160,21 @@ def full_chat(model: str, messages: List[dict]) -> str:
     debug_print(f"full_chat called with model='{model}'")
     
     try:
-        n_ctx = getattr(config, 'DEFAULT_CONTEXT_SIZE', 16384)
-        llm = ModelManager.get_model(model, n_ctx=n_ctx)
+        # Same instance as the joints: see stream_chat
+        with ModelManager.inference_lock:
+            n_ctx = getattr(config, 'DEFAULT_CONTEXT_SIZE', 16384)
+            llm = ModelManager.get_model(model, n_ctx=n_ctx, chat_model=True)
         
-        _update_status("Reading context (Processing Prompt)...")
-        resp = llm.create_chat_completion(
-            messages=messages,
-            stream=False,
-            temperature=0.3,
-            repeat_penalty=1.2
-        )
-        debug_print(f"RAW LLM RESP: {resp}")
+            _update_status("Reading context (Processing Prompt)...")
+            resp = llm.create_chat_completion(
+                messages=messages,
+                stream=False,
+                temperature=0.3,
+                repeat_penalty=1.2
+            )
+            debug_print(f"RAW LLM RESP: {resp}")
         
-        return resp['choices'][0]['message']['content']
+            return resp['choices'][0]['message']['content']
             
     except Exception as e:
         debug_print(f"Local inference error: {e}")
@@ -163,7 +198,7 @@ def get_rag_system():
         zim_files = glob.glob("*.zim")
         zim_paths = [os.path.abspath(z) for z in zim_files]
         
-        has_index = os.path.exists("data/indices/content_index.faiss") or os.path.exists("data/indices/title_index.faiss")
+        has_index = os.path.exists("data/indices/content_index.faiss") or os.path.isdir("data/indices/title_shards")
         
         if has_index or zim_paths:
             try:
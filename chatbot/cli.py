@@ -27,6 +27,9 @@ from chatbot.rag import RAGSystem, TextProcessor
 from chatbot import config
 from chatbot.chat import build_messages, stream_chat
 from chatbot.models import Message
+from chatbot.title_hash_index import TitleHashIndex
+from chatbot.article_cache import get_article_cache, article_key, RENDER
+from chatbot.zim_utils import archive_fingerprint, follow_redirects
 
 class ChatbotCLI(cmd.Cmd):
     """Command-line interface for Hermit."""
@@ -147,8 +150,17 @@ class ChatbotCLI(cmd.Cmd):
             except:
                 return None
 
+        # Strategy 0: Normalized title hash index (one lookup covers every spelling)
+        title_index = TitleHashIndex.load_cached(zim_file, zim, self.rag.title_hash_indexes if self.rag else None)
+        if title_index is not None:
+            entry = follow_redirects(title_index.find_entry(zim, path))
+            if not entry:
+                print(f"Article not found: '{path}'")
+                return
+
         # Strategy 1: Direct
-        entry = try_find(path)
+        if not entry:
+            entry = try_find(path)
         
         # Strategy 2: Title
         if not entry:
@@ -189,7 +201,8 @@ class ChatbotCLI(cmd.Cmd):
         print(f"\n=== {entry.title} ===\n")
         try:
             # Use the robust renderable extraction
-            content = TextProcessor.extract_renderable_text(item.content)
+            key = article_key(archive_fingerprint(zim), entry, RENDER)
+            content = get_article_cache().get_or_load(key, lambda: TextProcessor.extract_renderable_text(item.content))
             
             # Apply ANSI Highlighting
             if highlight_terms:
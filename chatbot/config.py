@@ -19,6 +19,8 @@
 
 """Configuration constants."""
 
+import os
+
 OLLAMA_CHAT_URL = "N/A" # Legacy/Deprecated
 # Local Model Repositories
 MODEL_QWEN_3B = "Qwen/Qwen2.5-3B-Instruct-GGUF" 
@@ -78,6 +80,121 @@ JOINT_TIMEOUT = 30 # Increased for 7B model generation
 # Adaptive RAG Configuration
 ADAPTIVE_THRESHOLD = 3.0  # Lowered to trigger fewer expansions when data is present
 
+# Model residency: several models stay loaded while their estimated footprint
+# (GGUF size * overhead + KV cache) fits the budget; LRU unpinned models are unloaded
+# first, the chat model is pinned, and idle models are unloaded in the background
+MODEL_MEMORY_BUDGET_GB = 0          # 0 = auto (90% of VRAM with CUDA, else half of RAM)
+MODEL_MEMORY_OVERHEAD = 1.1         # Compute buffers on top of the weights
+MODEL_KV_BYTES_PER_TOKEN = 64 * 1024  # Conservative for 3B-8B GGUFs at f16 KV
+MODEL_IDLE_UNLOAD_SECONDS = 600     # 0 disables idle unloading
+
+# Joint prompt prefixes: each joint's static instructions are evaluated once per model
+# and the llama state is restored before every call, so only the query part is processed
+JOINT_PREFIX_CACHE = True
+JOINT_PREFIX_CACHE_RAM_ENTRIES = 8   # States kept in RAM (tens of MB each for 3B models)
+JOINT_PREFIX_CACHE_DISK = True       # Also persist states, so restarts skip the first evaluation
+JOINT_PREFIX_CACHE_DIR = "data/kv_cache"
+
+# Batched joint inference: independent joint prompts (e.g. fact refinement of the top
+# results) run as parallel sequences of one xllamacpp server with this many slots.
+# Needs the optional xllamacpp package; without it (or at 1) prompts run one by one.
+# Opt-in: the server is a second resident copy of the joint model, charged for
+# n_ctx x slots, and making room for it can evict the chat model.
+JOINT_BATCH_SLOTS = 1
+
+# Speculative decoding for the final answer: the small model drafts tokens that the chat
+# model verifies in one batch. Off by default - llama-cpp then keeps logits for every
+# context position (n_ctx x vocab floats, ~5GB at 8192 tokens for Qwen), and the draft
+# model needs its own VRAM. The drafting instance also serves the joints' calls to the chat
+# model (without drafting). Pairs whose acceptance stays low fall back to plain decoding.
+SPECULATIVE_DECODING = False
+SPECULATIVE_DRAFT_MODEL = MODEL_QWEN_1_5B  # Must share the chat model's tokenizer
+SPECULATIVE_DRAFT_TOKENS = 8               # Tokens drafted per verification step
+SPECULATIVE_MIN_ACCEPTANCE = 0.4           # Below this accepted/drafted ratio, drafting stops
+SPECULATIVE_ACCEPTANCE_WINDOW = 64         # Drafted tokens observed before judging the ratio
+
+# === ZERO-INDEX LOOKUP CACHING ===
+# Persist title -> entry resolutions (and misses) in data/indices/title_cache.sqlite.
+# Rows are keyed by archive UUID/checksum, so replaced ZIMs are never served stale hits;
+# rows of removed/replaced archives are pruned after the startup pre-open (ZIM_PREOPEN).
+TITLE_CACHE_ENABLED = True
+
+# Parallel multi-ZIM probing: each candidate title is looked up in all archives at once.
+# The first archive with a hit wins; archives slower than the budget are abandoned.
+ZIM_PROBE_WORKERS = 8
+ZIM_PROBE_BUDGET_MS = 1500
+
+# Archive handle pool: at most this many ZIMs stay open (LRU eviction beyond it),
+# and they are opened on a background thread at startup
+ZIM_MAX_OPEN_ARCHIVES = 32
+ZIM_PREOPEN = True
+
+# Per-ZIM title bloom filters (built by `hermit index-titles`): candidates are checked
+# before any archive is opened or probed. ~1.2 bytes per title at 1% false positives.
+TITLE_BLOOM_FALSE_POSITIVE_RATE = 0.01
+
+# Characters of cleaned article text kept per retrieval hit (lead section + infobox first)
+ARTICLE_TEXT_CHARS = 6000
+
+# Shared in-process cache of cleaned article text (retrieval, multi-hop resolver, article viewers)
+ARTICLE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+ARTICLE_CACHE_HOT_ENTRIES = 64   # Most recent entries stay uncompressed
+ARTICLE_CACHE_COMPRESS = True    # zstd-compress colder entries (needs `zstandard`)
+
+# Full-text fallback: when every title candidate misses, query the archives'
+# embedded Xapian indexes (title suggestions if none) before any LLM expansion
+ENABLE_FULLTEXT_FALLBACK = True
+FULLTEXT_MAX_RESULTS = 5        # Cap across all archives
+FULLTEXT_BUDGET_MS = 3000
+FULLTEXT_RESULT_SCORE = 5.0     # Below direct title hits (10.0) until re-scored
+
+# Lexical index (built by `hermit index-titles`): BM25 over titles + lead paragraphs,
+# queried alongside exact-title probing in the orchestrator's search step
+ENABLE_LEXICAL_SEARCH = True
+LEXICAL_MAX_RESULTS = 5          # Cap across all archives
+LEXICAL_RESULT_SCORE = 6.0       # Between full-text (5.0) and direct title hits (10.0) until re-scored
+LEXICAL_LEAD_CHARS = 600         # Cleaned lead text indexed per article
+LEXICAL_TITLE_WEIGHT = 3         # Title tokens count this many times
+LEXICAL_BM25_K1 = 1.2
+LEXICAL_BM25_B = 0.75
+LEXICAL_BLOCK_BATCH = 32         # Postings blocks scored between top-k threshold updates
+
+# Async retrieval (RAGSystem.aretrieve): threads shared by all in-flight queries for
+# LLM calls, archive probes and article extraction
+ASYNC_RETRIEVAL_WORKERS = 8
+
+# Query embeddings: requests arriving within the window share one encode call,
+# and repeated queries are served from an LRU of vectors (title embeddings are
+# only computed by the offline index build, in its own batches)
+ENCODER_BATCH_WINDOW_MS = 3
+ENCODER_MAX_BATCH = 64
+ENCODER_CACHE_ENTRIES = 4096
+
+# Title index build (RAGSystem.build_index): entry ranges are scanned by worker processes
+# ahead of the encoder and checkpointed one range at a time, so interrupted builds resume
+TITLE_INDEX_CHUNK_ENTRIES = 50000
+TITLE_INDEX_SCAN_WORKERS = max(1, min(8, (os.cpu_count() or 2) - 1))
+TITLE_INDEX_ENCODE_PROCESSES = max(1, min(4, (os.cpu_count() or 2) // 2))  # CPU only; GPU encodes in-process
+
+# Title shard index type: "flat" (exact), "sq8", "hnsw" or "ivfpq" (see chatbot/title_ann.py).
+# Compare them on your archives with `hermit index-report` before switching.
+TITLE_INDEX_TYPE = "flat"
+TITLE_INDEX_MIN_ANN_TITLES = 100000   # Smaller shards are always flat
+TITLE_INDEX_TRAIN_SAMPLES = 200000    # Vectors used to train IVF/PQ
+TITLE_INDEX_IVF_NLIST = 0             # 0 = 4 * sqrt(titles)
+TITLE_INDEX_PQ_M = 48                 # Bytes per title (must divide the embedding dim)
+TITLE_INDEX_NPROBE = 32
+TITLE_INDEX_HNSW_M = 32
+TITLE_INDEX_HNSW_EF_SEARCH = 64
+TITLE_INDEX_MMAP = True               # Page shards in on demand where the type allows it
+TITLE_INDEX_BACKGROUND_LOAD = True    # Load shards on a startup thread; queries fall back until ready
+
+# LLM-free title candidates: when the title index is loaded, the query's nearest titles
+# are used as candidates and the LLM title generator only runs if none scores this high
+SEMANTIC_CANDIDATES_ENABLED = True
+SEMANTIC_CANDIDATE_COUNT = 10
+SEMANTIC_CANDIDATE_MIN_SCORE = 0.6   # Cosine similarity (all-MiniLM-L6-v2)
+
 # Global Context Window Configuration
 DEFAULT_CONTEXT_SIZE = 8192
 
@@ -0,0 +1,154 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Query Encoder Service.
+Single entry point for query-time embeddings. Texts already seen are served
+from an LRU of normalized vectors; the rest are queued, and a worker thread
+encodes everything that arrives within ENCODER_BATCH_WINDOW_MS in one
+SentenceTransformer call. Concurrent retrievals therefore share batches,
+and identical in-flight texts are encoded once.
+
+Titles are not routed through here: they are only embedded by the offline
+title index build (title_index_builder.py), which already encodes in large
+batches on a multi-process pool and sees each title once, so caching them
+would only evict query vectors.
+"""
+
+import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Dict, List
+
+import numpy as np
+
+from chatbot import config
+from chatbot.debug_utils import debug_print
+
+
+class EncoderService:
+    """Micro-batching, caching front end for a SentenceTransformer-like encoder."""
+
+    def __init__(self, encoder, cache_entries: int = None, window_ms: float = None, max_batch: int = None):
+        """
+        Args:
+            encoder: Object with encode(List[str], batch_size=...) -> array (n x dim)
+            cache_entries: LRU capacity in vectors (0 disables caching)
+            window_ms: How long the worker waits for more requests after the first
+            max_batch: Maximum texts per encode call
+        """
+        self.encoder = encoder
+        self.cache_entries = config.ENCODER_CACHE_ENTRIES if cache_entries is None else cache_entries
+        self.window = (config.ENCODER_BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000.0
+        self.max_batch = max_batch or config.ENCODER_MAX_BATCH
+
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._queue: List[str] = []
+        self._cond = threading.Condition()
+        self._worker = None
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+        self._recent = deque(maxlen=256)  # (batch size, ms)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """L2-normalized float32 embeddings (len(texts) x dim), in input order."""
+        vectors = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        with self._cond:
+            for i, text in enumerate(texts):
+                cached = self._cache.get(text)
+                if cached is not None:
+                    self._cache.move_to_end(text)
+                    vectors[i] = cached
+                    self.hits += 1
+                else:
+                    missing.setdefault(text, []).append(i)
+            futures = {text: self._submit(text) for text in missing}
+
+        for text, future in futures.items():
+            vector = future.result()
+            for i in missing[text]:
+                vectors[i] = vector
+        return np.stack(vectors) if vectors else np.zeros((0, 0), dtype='float32')
+
+    def _submit(self, text: str) -> Future:
+        """Queue a text for the next batch (caller holds the lock)."""
+        future = self._inflight.get(text)
+        if future is not None:
+            return future  # Already being encoded for another caller
+        self.misses += 1
+        future = self._inflight[text] = Future()
+        self._queue.append(text)
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="encoder-batcher", daemon=True)
+            self._worker.start()
+        self._cond.notify()
+        return future
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                # Give concurrent callers a short window to join this batch
+                deadline = time.monotonic() + self.window
+                while len(self._queue) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._queue[:self.max_batch]
+                del self._queue[:self.max_batch]
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch: List[str]) -> None:
+        start = time.perf_counter()
+        try:
+            vectors = np.asarray(self.encoder.encode(batch, batch_size=len(batch)), dtype='float32')
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = np.ascontiguousarray(vectors / np.maximum(norms, 1e-12))
+        except Exception as e:
+            with self._cond:
+                futures = [self._inflight.pop(text) for text in batch]
+            for future in futures:
+                future.set_exception(e)
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._cond:
+            self.batches += 1
+            self._recent.append((len(batch), elapsed_ms))
+            futures = []
+            for text, vector in zip(batch, vectors):
+                vector.flags.writeable = False  # Shared through the cache
+                if self.cache_entries > 0:
+                    self._cache[text] = vector
+                futures.append((self._inflight.pop(text), vector))
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        debug_print(f"Encoder batch: {len(batch)} text(s) in {elapsed_ms:.1f} ms")
+        for future, vector in futures:
+            future.set_result(vector)
+
+    def stats(self) -> Dict:
+        """Cache and batch latency summary (latencies over the last 256 batches)."""
+        with self._cond:
+            recent = list(self._recent)
+        sizes = [size for size, _ in recent]
+        latencies = [ms for _, ms in recent]
+        return {
+            'cache_entries': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'batches': self.batches,
+            'mean_batch': float(np.mean(sizes)) if sizes else 0.0,
+            'mean_ms': float(np.mean(latencies)) if latencies else 0.0,
+            'p95_ms': float(np.percentile(latencies, 95)) if latencies else 0.0,
+        }
@@ -0,0 +1,41 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Archive Full-Text Search.
+Thin wrapper over libzim's embedded Xapian indexes. Archives built with
+full-text indexing (Kiwix dumps, Forge's config_indexing(True, ...)) are
+queried with Searcher; archives that only carry a title index fall back to
+SuggestionSearcher. No model calls are involved.
+"""
+
+from typing import List
+
+from chatbot.debug_utils import debug_print
+
+try:
+    from libzim.search import Query, Searcher
+    from libzim.suggestion import SuggestionSearcher
+except ImportError:
+    Query = Searcher = SuggestionSearcher = None
+
+
+def search_archive(archive, query: str, limit: int) -> List[str]:
+    """
+    Return up to `limit` entry paths matching `query`, best match first.
+    Returns [] if the archive has no usable index.
+    """
+    if Searcher is None or not query or limit <= 0:
+        return []
+    try:
+        if archive.has_fulltext_index:
+            search = Searcher(archive).search(Query().set_query(query))
+            return list(search.getResults(0, limit))
+        if archive.has_title_index:
+            suggestion = SuggestionSearcher(archive).suggest(query)
+            return list(suggestion.getResults(0, limit))
+    except Exception as e:
+        debug_print(f"Full-text search failed: {e}")
+    return []
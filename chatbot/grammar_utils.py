@@ -27,12 +27,20 @@ issues like conversational filler, trailing commas, and Markdown code blocks.
 GBNF is a constraint-based approach that restricts token generation at the
 model level, making it impossible for the model to output anything other
 than valid JSON.
+
+Each joint asks for a schema-specific grammar (SCHEMAS below) that also pins
+key names, enums and list lengths, so the model can only emit the structure
+the joint parses. Grammars are compiled once per process, and every schema
+carries the max_tokens budget its largest valid output needs.
 """
 
-from typing import Optional
+import sys
+import threading
+from typing import Dict, Optional, Tuple
 
-# Cache the grammar instance to avoid recreation
-_json_grammar_instance = None
+# Compiled LlamaGrammar per schema name (None = compilation failed / llama_cpp missing)
+_grammar_cache: Dict[str, object] = {}
+_grammar_lock = threading.Lock()
 
 
 # =============================================================================
@@ -125,140 +133,111 @@ ws ::= [ \t\n\r]*
 '''
 
 
-def get_json_grammar():
-    """
-    Get a LlamaGrammar object that enforces valid JSON output.
-    
-    Returns:
-        LlamaGrammar: A compiled grammar object, or None if compilation fails.
-        
-    Notes:
-        - The grammar is cached after first creation for performance.
-        - If llama_cpp is not available or grammar compilation fails,
-          returns None (caller should fall back to regex extraction).
-    """
-    global _json_grammar_instance
-    
-    if _json_grammar_instance is not None:
-        return _json_grammar_instance
-    
-    try:
-        from llama_cpp import LlamaGrammar
-        _json_grammar_instance = LlamaGrammar.from_string(JSON_OBJECT_OR_ARRAY_GRAMMAR)
-        return _json_grammar_instance
-    except ImportError:
-        # llama_cpp not installed
-        return None
-    except Exception as e:
-        # Grammar compilation failed
-        import sys
-        print(f"[WARN] Failed to compile JSON grammar: {e}", file=sys.stderr)
-        return None
-
-
-def get_array_grammar():
-    """
-    Get a LlamaGrammar object that enforces JSON array output only.
-    
-    This is useful when you specifically expect an array response,
-    like a list of suggestions or scores.
-    
-    Returns:
-        LlamaGrammar: A compiled grammar object, or None if compilation fails.
-    """
-    array_only_grammar = r'''
-root ::= array
-
-value ::= object | array | string | number | boolean | null
-
-object ::= "{" ws ( pair ( "," ws pair )* )? ws "}"
-
-pair ::= string ws ":" ws value
-
-array ::= "[" ws ( value ( "," ws value )* )? ws "]"
-
-string ::= "\"" chars "\""
-
-chars ::= char*
-
-char ::= [^"\\] | "\\" escape
-
-escape ::= "\"" | "\\" | "/" | "b" | "f" | "n" | "r" | "t" | unicode
-
-unicode ::= "u" hex hex hex hex
-
-hex ::= [0-9a-fA-F]
-
-number ::= integer fraction? exponent?
-
-integer ::= "-"? ( "0" | [1-9] [0-9]* )
-
-fraction ::= "." [0-9]+
-
-exponent ::= [eE] [+-]? [0-9]+
+# =============================================================================
+# Joint Schemas
+# =============================================================================
 
+# Terminals shared by every schema grammar
+_PRIMITIVES = r"""
+string ::= "\"" char* "\""
+char ::= [^"\\\x7F\x00-\x1F] | "\\" escape
+escape ::= ["\\/bfnrt] | "u" [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F]
 boolean ::= "true" | "false"
-
 null ::= "null"
-
-ws ::= [ \t\n\r]*
-'''
-    try:
-        from llama_cpp import LlamaGrammar
-        return LlamaGrammar.from_string(array_only_grammar)
-    except (ImportError, Exception):
-        return None
+score ::= "10" | [0-9]
+int ::= [1-9] [0-9]?
+ws ::= [ \t\n]*
+"""
 
 
-def get_object_grammar():
+def _at_most(item: str, n: int) -> str:
+    """GBNF for 0..n comma-separated `item`s, nested so that every length parses one way."""
+    tail = ""
+    for _ in range(n - 1):
+        tail = f' ( "," ws {item}{tail} )?'
+    return f"( {item}{tail} )?"
+
+
+# Entity extraction: up to 4 entities with up to 4 aliases each
+ENTITY_GRAMMAR = r"""
+root ::= "{" ws "\"is_comparison\":" ws boolean "," ws "\"entities\":" ws entities "," ws "\"action\":" ws string "," ws "\"answer_type\":" ws answer-type "," ws "\"comparison_dimension\":" ws dimension ws "}"
+entities ::= "[" ws entity ( "," ws entity )? ( "," ws entity )? ( "," ws entity )? ws "]"
+entity ::= "{" ws "\"name\":" ws string "," ws "\"type\":" ws entity-type "," ws "\"aliases\":" ws aliases ws "}"
+entity-type ::= "\"" ( "person" | "place" | "event" | "concept" | "technology" | "organization" ) "\""
+aliases ::= "[" ws ( string ( "," ws string )? ( "," ws string )? ( "," ws string )? )? ws "]"
+answer-type ::= "\"" ( "birthdate" | "birthplace" | "education" | "inventor" | "death_date" | "death_cause" | "language" | "measurement" | "cause" | "general" ) "\""
+dimension ::= null | "\"" ( "creation_date" | "age" | "size" | "height" | "speed" | "quantity" | "success" ) "\""
+""" + _PRIMITIVES
+
+# Article scoring: up to 20 {"title", "score"} pairs (one per listed title)
+TITLE_SCORES_GRAMMAR = r"""
+root ::= "[" ws """ + _at_most("item", 20) + r""" ws "]"
+item ::= "{" ws "\"title\":" ws string "," ws "\"score\":" ws score ws "}"
+""" + _PRIMITIVES
+
+# Chunk filtering: {"id", "score"} pairs for up to 15 numbered chunks
+CHUNK_SCORES_GRAMMAR = r"""
+root ::= "[" ws """ + _at_most("item", 15) + r""" ws "]"
+item ::= "{" ws "\"id\":" ws int "," ws "\"score\":" ws score ws "}"
+""" + _PRIMITIVES
+
+# Fact refinement (3-5 facts) and search expansion (3 suggestions)
+STRING_LIST_GRAMMAR = r"""
+root ::= "[" ws string ( "," ws string )? ( "," ws string )? ( "," ws string )? ( "," ws string )? ws "]"
+""" + _PRIMITIVES
+
+# Multi-hop detection: either a resolved relationship or a reason it has none
+INDIRECT_GRAMMAR = r"""
+root ::= "{" ws ( found | not-found ) ws "}"
+found ::= "\"has_indirect\":" ws "true" "," ws "\"base_entity\":" ws string "," ws "\"relationship\":" ws string "," ws "\"target_type\":" ws string
+not-found ::= "\"has_indirect\":" ws "false" "," ws "\"reason\":" ws string
+""" + _PRIMITIVES
+
+# Multi-hop resolution: {"entity": "Name"} or {"entity": null}
+RESOLVED_ENTITY_GRAMMAR = r"""
+root ::= "{" ws "\"entity\":" ws ( string | null ) ws "}"
+""" + _PRIMITIVES
+
+# name -> (grammar, max_tokens sized for the largest valid output)
+SCHEMAS: Dict[str, Tuple[str, int]] = {
+    "json": (JSON_OBJECT_OR_ARRAY_GRAMMAR, 512),
+    "entities": (ENTITY_GRAMMAR, 320),
+    "title_scores": (TITLE_SCORES_GRAMMAR, 512),   # 20 items of ~20 tokens (title ~6)
+    "chunk_scores": (CHUNK_SCORES_GRAMMAR, 256),   # 15 items of ~13 tokens
+    "string_list": (STRING_LIST_GRAMMAR, 256),
+    "indirect": (INDIRECT_GRAMMAR, 96),
+    "resolved_entity": (RESOLVED_ENTITY_GRAMMAR, 48),
+}
+
+
+def get_grammar(schema: str = "json"):
     """
-    Get a LlamaGrammar object that enforces JSON object output only.
-    
-    This is useful when you specifically expect an object response,
-    like entity extraction results.
-    
+    Get the compiled LlamaGrammar for a schema in SCHEMAS.
+
     Returns:
-        LlamaGrammar: A compiled grammar object, or None if compilation fails.
+        LlamaGrammar, or None if llama_cpp is unavailable or compilation fails
+        (callers fall back to unconstrained decoding + extract_json_from_text).
     """
-    object_only_grammar = r'''
-root ::= object
-
-value ::= object | array | string | number | boolean | null
-
-object ::= "{" ws ( pair ( "," ws pair )* )? ws "}"
-
-pair ::= string ws ":" ws value
-
-array ::= "[" ws ( value ( "," ws value )* )? ws "]"
-
-string ::= "\"" chars "\""
+    with _grammar_lock:
+        if schema in _grammar_cache:
+            return _grammar_cache[schema]
+        grammar = None
+        try:
+            from llama_cpp import LlamaGrammar
+            grammar = LlamaGrammar.from_string(SCHEMAS[schema][0], verbose=False)
+        except ImportError:
+            pass
+        except Exception as e:
+            print(f"[WARN] Failed to compile '{schema}' grammar: {e}", file=sys.stderr)
+        _grammar_cache[schema] = grammar
+        return grammar
+
+
+def max_tokens_for(schema: str = "json") -> int:
+    """Output token budget for a schema."""
+    return SCHEMAS[schema][1]
 
-chars ::= char*
-
-char ::= [^"\\] | "\\" escape
-
-escape ::= "\"" | "\\" | "/" | "b" | "f" | "n" | "r" | "t" | unicode
 
-unicode ::= "u" hex hex hex hex
-
-hex ::= [0-9a-fA-F]
-
-number ::= integer fraction? exponent?
-
-integer ::= "-"? ( "0" | [1-9] [0-9]* )
-
-fraction ::= "." [0-9]+
-
-exponent ::= [eE] [+-]? [0-9]+
-
-boolean ::= "true" | "false"
-
-null ::= "null"
-
-ws ::= [ \t\n\r]*
-'''
-    try:
-        from llama_cpp import LlamaGrammar
-        return LlamaGrammar.from_string(object_only_grammar)
-    except (ImportError, Exception):
-        return None
\ No newline at end of file
+def get_json_grammar():
+    """Grammar that enforces a JSON object or array (cached)."""
+    return get_grammar("json")
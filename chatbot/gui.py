@@ -1293,6 +1293,9 @@ class ChatbotGUI:
                 return
 
             from chatbot.rag import TextProcessor
+            from chatbot.title_hash_index import TitleHashIndex
+            from chatbot.article_cache import get_article_cache, article_key, RENDER
+            from chatbot.zim_utils import archive_fingerprint, follow_redirects
             import os
             
             # === MULTI-ZIM SUPPORT ===
@@ -1320,6 +1323,10 @@ class ChatbotGUI:
                 except:
                     return None
 
+            # Title indexes the RAG system already holds (not created here just for that)
+            from chatbot import chat
+            loaded_indexes = chat._rag_system.title_hash_indexes if chat._rag_system else None
+
             # Try each ZIM file until we find the article
             for zim_file in zim_files_to_try:
                 try:
@@ -1330,6 +1337,15 @@ class ChatbotGUI:
                 
                 print(f"[GUI] Searching in: {os.path.basename(zim_file)}")
                 
+                # Strategy 0: Normalized title hash index (one lookup covers every spelling)
+                title_index = TitleHashIndex.load_cached(zim_file, zim, loaded_indexes)
+                if title_index is not None:
+                    entry = follow_redirects(title_index.find_entry(zim, path))
+                    if entry:
+                        used_zim = zim_file
+                        break
+                    continue  # Index is authoritative for this archive
+                
                 # Strategy 1: Direct path
                 entry = try_find(zim, path)
                 
@@ -1385,7 +1401,8 @@ class ChatbotGUI:
                 return
             
             # Extract and display content (Formatted)
-            content = TextProcessor.extract_renderable_text(item.content)
+            key = article_key(archive_fingerprint(zim), entry, RENDER)
+            content = get_article_cache().get_or_load(key, lambda: TextProcessor.extract_renderable_text(item.content))
             
             # Create article viewer window
             article_window = self.tk.Toplevel(self.root)
@@ -1879,6 +1896,9 @@ Keyboard Shortcuts:
              backend_detail = "Engine: llama-cpp-python"
 
         model_status = f"Model: {self.model}"
+        from chatbot.speculative import throughput_report
+        for mode, t in sorted(throughput_report().items()):
+            model_status += f"\nAnswer speed ({mode}): {t['tok_per_s']:.1f} tok/s over {t['streams']} stream(s)"
         
         # RAG Status
         # We need to peek into chat module to get global rag
@@ -1894,8 +1914,21 @@ Keyboard Shortcuts:
             count_chunks = len(rag.doc_chunks) if rag.doc_chunks else 0
             rag_detail = f"JIT Index: {count_docs} articles ({count_chunks} chunks)\n" \
                          f"Encoder: {rag.model_name}"
+            enc = rag.encoder_stats()
+            if enc:
+                rag_detail += f" ({enc['batches']} batches, {enc['mean_ms']:.1f} ms avg, {enc['hits']} cache hits)"
             if rag.faiss_index:
                  rag_detail += f"\nVectors: {rag.faiss_index.ntotal}"
+            pool = rag.archive_pool.status()
+            readiness = "ready" if pool['ready'] else f"opening {pool['preopened']}/{pool['preopen_total']}..."
+            rag_detail += f"\nArchives: {pool['open']}/{len(rag.zim_paths)} open ({readiness})"
+            if pool['failed']:
+                rag_detail += f", {pool['failed']} failed"
+            titles = rag.title_index_status()
+            if not titles['ready']:
+                rag_detail += "\nTitle index: loading..."
+            elif titles['shards']:
+                rag_detail += f"\nTitle index: {titles['titles']} titles ({titles['shards']} shard(s))"
 
         msg = (
             f"=== SYSTEM STATUS ===\n\n"
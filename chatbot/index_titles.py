@@ -0,0 +1,77 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Offline Title Indexing (`hermit index-titles`).
+Builds the per-archive lookup sidecars that the zero-index retrieval path
+mmaps at query time. Run once after adding or updating ZIM files.
+"""
+
+import os
+import time
+from typing import List
+
+from chatbot.zim_utils import sidecar_path
+
+
+def _sidecar_builders():
+    """(label, sidecar kind, loader, builder) for every per-archive sidecar, in build order."""
+    from chatbot.title_hash_index import TitleHashIndex, build_title_hash_index
+    from chatbot.redirect_table import RedirectTable, build_redirect_table
+    from chatbot.title_bloom import TitleBloomFilter, build_title_bloom
+    from chatbot.lexical_index import LexicalIndex, build_lexical_index
+
+    return [
+        ("Title hash index", "titles", TitleHashIndex.load, build_title_hash_index),
+        ("Redirect table", "redirects", RedirectTable.load, build_redirect_table),
+        ("Title bloom filter", "bloom", TitleBloomFilter.load, build_title_bloom),
+        ("Lexical index", "lexical", LexicalIndex.load, build_lexical_index),
+    ]
+
+
+def run_index_titles(zim_paths: List[str], force: bool = False) -> int:
+    """
+    Build lookup sidecars for each archive.
+
+    Args:
+        zim_paths: Archives to index
+        force: Rebuild even if an up-to-date sidecar exists
+
+    Returns:
+        Process exit code (0 on success, 1 if any archive failed)
+    """
+    import libzim
+
+    if not zim_paths:
+        print("Error: No ZIM files to index.")
+        return 1
+
+    builders = _sidecar_builders()
+    failures = 0
+    for zim_path in zim_paths:
+        zim_path = os.path.abspath(zim_path)
+        zim_name = os.path.basename(zim_path)
+        try:
+            archive = libzim.Archive(zim_path)
+        except Exception as e:
+            print(f"  ERROR: Failed to open {zim_name}: {e}")
+            failures += 1
+            continue
+
+        print(f"\nIndexing titles: {zim_name} ({archive.entry_count} entries)")
+
+        for label, kind, loader, builder in builders:
+            if not force and loader(zim_path, archive) is not None:
+                print(f"  {label} up to date: {os.path.basename(sidecar_path(zim_path, kind))}")
+                continue
+            start = time.time()
+            try:
+                out_path = builder(zim_path, archive)
+                print(f"  Wrote {os.path.basename(out_path)} in {time.time() - start:.1f}s")
+            except Exception as e:
+                print(f"  ERROR: {label} failed for {zim_name}: {e}")
+                failures += 1
+
+    return 1 if failures else 0
@@ -1,5 +1,5 @@
 
-from .base import debug_print, extract_json_from_text, local_inference
+from .base import debug_print, extract_json_from_text, local_inference, batch_inference
 from .entity_extractor import EntityExtractorJoint
 from .article_scorer import ArticleScorerJoint
 from .coverage_verifier import CoverageVerifierJoint
@@ -12,6 +12,7 @@ __all__ = [
     'debug_print',
     'extract_json_from_text',
     'local_inference',
+    'batch_inference',
     'EntityExtractorJoint',
     'ArticleScorerJoint',
     'CoverageVerifierJoint',
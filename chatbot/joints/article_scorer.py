@@ -5,6 +5,28 @@ from typing import Dict, List, Tuple, Optional
 from chatbot import config
 from .base import debug_print, local_inference, extract_json_from_text
 
+SCORE_PREFIX = """I will give you the user's question and a list of Article Titles.
+Select articles relevant to answering this question.
+
+RULES:
+1. ONLY select titles from the provided INPUT LIST.
+2. DO NOT output example titles.
+3. Output valid JSON only.
+4. Prioritize articles that directly answer the user's question.
+
+Rate each article 0-10 where:
+- 10 = Directly relevant to answering the user's question
+- 7-9 = Highly relevant to the entities or topic
+- 1-6 = Partially relevant or containing related background information
+- 0 = Not relevant
+
+Return ONLY a JSON array:
+[
+  {"title": "Actual Title From List", "score": 10}
+]
+
+"""
+
 class ArticleScorerJoint:
     """
     Joint 2: Article Scoring
@@ -61,35 +83,16 @@ class ArticleScorerJoint:
         articles_formatted = "\n".join([f"{i+1}. {title}" for i, title in enumerate(article_titles[:20])])
         entities_str = ", ".join([f"'{e.get('name', '')}'" for e in entity_info.get('entities', [])])
         
-        prompt = f"""I will give you a list of Article Titles.
-        
-USER'S ORIGINAL QUESTION: "{query}"
-
-Select articles relevant to answering this question.
+        prompt = f"""USER'S ORIGINAL QUESTION: "{query}"
 Entities mentioned: {entities_str}
-        
-RULES:
-1. ONLY select titles from the provided INPUT LIST below.
-2. DO NOT output example titles.
-3. Output valid JSON only.
-4. Prioritize articles that directly answer the user's question.
-        
+
 INPUT LIST:
 {articles_formatted}
-        
-Rate each article 0-10 where:
-- 10 = Directly relevant to answering the user's question
-- 7-9 = Highly relevant to the entities or topic
-- 1-6 = Partially relevant or containing related background information
-- 0 = Not relevant
-        
-Return ONLY a JSON array:
-[
-  {{"title": "Actual Title From List", "score": 10}}
-]"""
+"""
 
         try:
-            response = local_inference(self.model, prompt, self.temperature, config.JOINT_TIMEOUT, use_json_grammar=True)
+            response = local_inference(self.model, prompt, self.temperature, config.JOINT_TIMEOUT, use_json_grammar=True,
+                                       prefix=SCORE_PREFIX, joint="article_score", schema="title_scores")
             debug_print("JOINT2:SCORER", f"Raw response: {response[:200]}...")
             
             scores = extract_json_from_text(response)
@@ -1,9 +1,12 @@
 
 import json
 import re
+import time
 from typing import Dict, List, Optional, Any
 from chatbot import config
 from chatbot.model_manager import ModelManager
+from chatbot.prefix_cache import get_prefix_cache
+from chatbot.grammar_utils import SCHEMAS, get_grammar, max_tokens_for
 
 def debug_print(joint_name: str, msg: str):
     """Print debug message for a specific joint."""
@@ -68,29 +71,95 @@ def extract_json_from_text(text: str) -> Optional[Any]:
         
     return None
 
-def local_inference(model: str, prompt: str, temperature: float = 0.0, timeout: int = 5, use_json_grammar: bool = False):
+SYSTEM_PROMPT = "You are a precise JSON extraction system. Output only valid JSON."
+
+def local_inference(model: str, prompt: str, temperature: float = 0.0, timeout: int = 5, use_json_grammar: bool = False,
+                    prefix: str = "", joint: Optional[str] = None, schema: str = "json"):
     """
     Run local inference using ModelManager.
     Uses chat completion to avoid KV cache contamination.
+
+    Joints pass their static instructions as `prefix` and the query-specific part as
+    `prompt`. With a `joint` name, the model state after the prefix is saved once
+    (see chatbot/prefix_cache.py) and restored before each call, so only `prompt`
+    is evaluated.
+
+    With use_json_grammar, decoding is constrained to the GBNF grammar of `schema`
+    (see chatbot/grammar_utils.py SCHEMAS) and max_tokens is sized to that schema.
     """
     # Use larger context size for joints to handle retrieved content
     n_ctx = 4096  # Increased from 2048 to prevent overflow
+    grammar = get_grammar(schema) if use_json_grammar and not config.API_MODE else None
+    max_tokens = max_tokens_for(schema) if use_json_grammar else 512
     try:
-        llm = ModelManager.get_model(model, n_ctx=n_ctx)
-        
         # Use chat completion to avoid KV cache issues
         messages = [
-            {"role": "system", "content": "You are a precise JSON extraction system. Output only valid JSON."},
-            {"role": "user", "content": prompt}
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prefix + prompt}
         ]
         
-        response = llm.create_chat_completion(
-            messages=messages,
-            max_tokens=512,
-            temperature=temperature
-        )
+        with ModelManager.inference_lock:
+            llm = ModelManager.get_model(model, n_ctx=n_ctx)
+            if prefix and joint and config.JOINT_PREFIX_CACHE:
+                try:
+                    get_prefix_cache().restore(llm, model, joint, [messages[0], {"role": "user", "content": prefix}])
+                except Exception as e:
+                    debug_print("BASE:INFERENCE", f"Prefix state unavailable for {joint}: {e}")
+            response = llm.create_chat_completion(
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                grammar=grammar
+            )
         return response['choices'][0]['message']['content']
     except Exception as e:
         debug_print("BASE:INFERENCE", f"Inference failed: {e}")
         raise e
 
+
+def _xllamacpp_installed() -> bool:
+    # Checked lazily: importing the wrapper warns when xllamacpp is missing
+    import importlib.util
+    return importlib.util.find_spec("xllamacpp") is not None
+
+def batch_inference(model: str, prompts: List[str], temperature: float = 0.0, use_json_grammar: bool = False,
+                    prefix: str = "", joint: Optional[str] = None, schema: str = "json") -> List[Optional[str]]:
+    """
+    Run several independent prompts for the same joint and return their completions in order.
+
+    With xllamacpp installed and JOINT_BATCH_SLOTS > 1, the prompts are decoded together
+    as parallel sequences of one JOINT_BATCH_SLOTS-slot server, so the call takes about
+    as long as the longest prompt. Otherwise (or in API mode) they run one by one
+    through local_inference.
+    A prompt that fails yields None.
+    """
+    n_ctx = 4096
+    if len(prompts) > 1 and config.JOINT_BATCH_SLOTS > 1 and not config.API_MODE and _xllamacpp_installed():
+        try:
+            requests = [{
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prefix + prompt}
+                ],
+                "max_tokens": max_tokens_for(schema) if use_json_grammar else 512,
+                "temperature": temperature,
+                "grammar": SCHEMAS[schema][0] if use_json_grammar else None,
+            } for prompt in prompts]
+            start = time.time()
+            # Like local_inference: nothing else decodes while the batch runs
+            with ModelManager.inference_lock:
+                server = ModelManager.get_model(model, n_ctx=n_ctx, parallel=config.JOINT_BATCH_SLOTS)
+                responses = server.create_chat_completions(requests)
+            debug_print("BASE:BATCH", f"{len(prompts)} {joint or 'joint'} sequences in {time.time() - start:.2f}s")
+            return [r['choices'][0]['message']['content'] if r else None for r in responses]
+        except Exception as e:
+            debug_print("BASE:BATCH", f"Batched inference failed, running sequentially: {e}")
+
+    results = []
+    for prompt in prompts:
+        try:
+            results.append(local_inference(model, prompt, temperature, use_json_grammar=use_json_grammar,
+                                           prefix=prefix, joint=joint, schema=schema))
+        except Exception:
+            results.append(None)
+    return results
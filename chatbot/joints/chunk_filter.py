@@ -5,6 +5,13 @@ from typing import Dict, List
 from chatbot import config
 from .base import debug_print, local_inference
 
+FILTER_PREFIX = """Rate the text chunks below for how well they answer the query.
+
+Return ONLY a JSON list of objects:
+[{"id": 1, "score": 10}]
+
+"""
+
 class ChunkFilterJoint:
     """
     Joint 3: Chunk Filtering
@@ -39,17 +46,14 @@ class ChunkFilterJoint:
         
         chunks_text = "\n\n".join(chunks_formatted)
         
-        # Simple prompt for brevity
-        prompt = f"""Rate these text chunks for how well they answer this query.
-Query: {query}
+        prompt = f"""Query: {query}
 Chunks:
 {chunks_text}
-
-Return ONLY a JSON list of objects:
-[{{"id": 1, "score": 10}}]"""
+"""
 
         try:
-            response = local_inference(self.model, prompt, self.temperature, config.JOINT_TIMEOUT, use_json_grammar=True)
+            response = local_inference(self.model, prompt, self.temperature, config.JOINT_TIMEOUT, use_json_grammar=True,
+                                       prefix=FILTER_PREFIX, joint="chunk_filter", schema="chunk_scores")
             # Simplified parsing for brevity here, in reality we'd use the robust extractor
             from .base import extract_json_from_text
             scores = extract_json_from_text(response)
@@ -4,34 +4,8 @@ from typing import Dict, List, Any
 from chatbot import config
 from .base import debug_print, local_inference, extract_json_from_text
 
-class EntityExtractorJoint:
-    """
-    Joint 1: Entity Extraction
-    
-    Extracts the main entity, type, action, and aliases from a user query.
-    Uses llama3.2:1b for fast, focused entity recognition.
-    """
-    
-    def __init__(self, model: str = None):
-        self.model = model or config.ENTITY_JOINT_MODEL
-        self.temperature = config.ENTITY_JOINT_TEMP
-        debug_print("JOINT1:INIT", f"EntityExtractor initialized with {self.model}")
-    
-    def extract(self, query: str) -> Dict[str, Any]:
-        """
-        Extract ALL entities from query, with comparison detection.
-        
-        Args:
-            query: User query string
-            
-        Returns:
-            Dict with keys: is_comparison, entities (list), action
-            Each entity has: name, type, aliases
-        """
-        debug_print("JOINT1:ENTITY", f"Extracting entities from: '{query}'")
-        start_time = time.time()
-        
-        prompt = f"""You are a precise entity extraction system optimized for Wikipedia article matching.
+# Static part of the extraction prompt; its evaluated state is reused across queries
+EXTRACT_PREFIX = """You are a precise entity extraction system optimized for Wikipedia article matching.
 
 INSTRUCTIONS:
 1. Identify ALL distinct entities (people, places, things, events) in the query.
@@ -69,35 +43,35 @@ COMPARISON DIMENSION EXAMPLES:
 
 EXAMPLES:
 Query: "Who created Python?"
-Result: {{
+Result: {
   "is_comparison": false,
   "entities": [
-    {{"name": "Python (programming language)", "type": "technology", "aliases": ["Python"]}},
-    {{"name": "creator of Python", "type": "person", "aliases": []}}
+    {"name": "Python (programming language)", "type": "technology", "aliases": ["Python"]},
+    {"name": "creator of Python", "type": "person", "aliases": []}
   ],
   "action": "identify the creator"
-}}
+}
 
 Query: "Compare Tesla and Edison patents"
-Result: {{
+Result: {
   "is_comparison": true,
   "entities": [
-    {{"name": "Nikola Tesla", "type": "person", "aliases": ["Tesla"]}},
-    {{"name": "Thomas Edison", "type": "person", "aliases": ["Edison"]}}
+    {"name": "Nikola Tesla", "type": "person", "aliases": ["Tesla"]},
+    {"name": "Thomas Edison", "type": "person", "aliases": ["Edison"]}
   ],
   "action": "compare patent counts",
   "comparison_dimension": "quantity"
-}}
+}
 
 Query: "What university did the creator of Python attend?"
-Result: {{
+Result: {
   "is_comparison": false,
   "entities": [
-    {{"name": "Python (programming language)", "type": "technology", "aliases": ["Python"]}},
-    {{"name": "creator of Python", "type": "person", "aliases": []}}
+    {"name": "Python (programming language)", "type": "technology", "aliases": ["Python"]},
+    {"name": "creator of Python", "type": "person", "aliases": []}
   ],
   "action": "identify the university attended"
-}}
+}
 
 WIKIPEDIA TITLE CONVENTIONS:
 - Full names for people: "Albert Einstein" not "Einstein"
@@ -105,8 +79,6 @@ WIKIPEDIA TITLE CONVENTIONS:
 - Disambiguation when needed: "Java (programming language)" for the language
 - For indirect queries (e.g., "who created X"), extract BOTH the person AND the thing created. Do NOT guess the person's name yet.
 
-Query: "{query}"
-
 CRITICAL RULES:
 - Return ONLY valid JSON.
 - NO Markdown code blocks.
@@ -116,19 +88,63 @@ CRITICAL RULES:
 - Include short aliases that might also be article titles.
 
 Return this exact JSON structure:
-{{
+{
   "is_comparison": false,
   "entities": [
-    {{"name": "Exact Wikipedia Article Title", "type": "person|place|event|concept|technology|organization", "aliases": ["Alternative Title", "Short Form"]}}
+    {"name": "Exact Wikipedia Article Title", "type": "person|place|event|concept|technology|organization", "aliases": ["Alternative Title", "Short Form"]}
   ],
   "action": "what the user wants to know",
   "answer_type": "birthdate|birthplace|education|inventor|death_date|death_cause|language|measurement|cause|general",
   "comparison_dimension": "null or: creation_date|age|size|height|speed|quantity|success"
-}}
+}
+
+"""
+
+EXPAND_PREFIX = """Suggest alternative search terms for a question whose first searches found NOTHING relevant.
+
+INSTRUCTIONS:
+1. Suggest 3 alternative search queries.
+2. Focus on broader concepts, related events, or key figures.
+3. If the user used a nickname, try the real name.
+4. If the user asked a specific question, try searching for the general topic.
+
+Return ONLY a JSON list of strings:
+["Alternative 1", "Alternative 2", "Alternative 3"]
+
 """
 
+class EntityExtractorJoint:
+    """
+    Joint 1: Entity Extraction
+    
+    Extracts the main entity, type, action, and aliases from a user query.
+    Uses llama3.2:1b for fast, focused entity recognition.
+    """
+    
+    def __init__(self, model: str = None):
+        self.model = model or config.ENTITY_JOINT_MODEL
+        self.temperature = config.ENTITY_JOINT_TEMP
+        debug_print("JOINT1:INIT", f"EntityExtractor initialized with {self.model}")
+    
+    def extract(self, query: str) -> Dict[str, Any]:
+        """
+        Extract ALL entities from query, with comparison detection.
+        
+        Args:
+            query: User query string
+            
+        Returns:
+            Dict with keys: is_comparison, entities (list), action
+            Each entity has: name, type, aliases
+        """
+        debug_print("JOINT1:ENTITY", f"Extracting entities from: '{query}'")
+        start_time = time.time()
+        
+        prompt = f'Query: "{query}"\nResult:'
+
         try:
-            response = local_inference(self.model, prompt, self.temperature, config.JOINT_TIMEOUT, use_json_grammar=True)
+            response = local_inference(self.model, prompt, self.temperature, config.JOINT_TIMEOUT, use_json_grammar=True,
+                                       prefix=EXTRACT_PREFIX, joint="entity_extract", schema="entities")
             debug_print("JOINT1:ENTITY", f"Raw response: {response[:300]}...")
             
             # Use robust extractor
@@ -208,21 +224,12 @@ Return this exact JSON structure:
         start_time = time.time()
         
         prompt = f"""The user asked about: "{query}"
-        
-        We searched for these terms but found NOTHING relevant: {failed_terms}
-        
-        INSTRUCTIONS:
-        1. Suggest 3 alternative search queries.
-        2. Focus on broader concepts, related events, or key figures.
-        3. If the user used a nickname, try the real name.
-        4. If the user asked a specific question, try searching for the general topic.
-        
-        Return ONLY a JSON list of strings:
-        ["Alternative 1", "Alternative 2", "Alternative 3"]
-        """
+We searched for these terms but found nothing: {failed_terms}
+"""
         
         try:
-            response = local_inference(self.model, prompt, temperature=0.3, timeout=config.JOINT_TIMEOUT, use_json_grammar=True)
+            response = local_inference(self.model, prompt, temperature=0.3, timeout=config.JOINT_TIMEOUT, use_json_grammar=True,
+                                       prefix=EXPAND_PREFIX, joint="entity_expand", schema="string_list")
             debug_print("JOINT1:EXPAND", f"Raw response: {response[:200]}...")
             
             suggestions = extract_json_from_text(response)
@@ -2,7 +2,12 @@
 import time
 from typing import Dict, List
 from chatbot import config
-from .base import debug_print, local_inference, extract_json_from_text
+from .base import debug_print, local_inference, batch_inference, extract_json_from_text
+
+REFINE_PREFIX = """Extract 3-5 key facts from the text that help answer the query.
+Return ONLY a JSON list of strings.
+
+"""
 
 class FactRefinementJoint:
     """
@@ -19,14 +24,12 @@ class FactRefinementJoint:
         """
         Extract specific facts from text relevant to query.
         """
-        prompt = f"""Extract 3-5 key facts from the text that help answer the query.
-Query: {query}
+        prompt = f"""Query: {query}
 Text: {text_content[:2000]}
-
-Return ONLY a JSON list of strings.
 """
         try:
-            response = local_inference(self.model, prompt, temperature=0.1, use_json_grammar=True)
+            response = local_inference(self.model, prompt, temperature=0.1, use_json_grammar=True,
+                                       prefix=REFINE_PREFIX, joint="fact_refine", schema="string_list")
             facts = extract_json_from_text(response)
             if isinstance(facts, list):
                 return facts
@@ -34,6 +37,21 @@ Return ONLY a JSON list of strings.
         except:
             return []
 
+    def refine_facts_batch(self, query: str, texts: List[str]) -> List[List[str]]:
+        """
+        refine_facts for several texts at once; the prompts run as parallel sequences.
+        """
+        prompts = [f"""Query: {query}
+Text: {text_content[:2000]}
+""" for text_content in texts]
+        responses = batch_inference(self.model, prompts, temperature=0.1, use_json_grammar=True,
+                                    prefix=REFINE_PREFIX, joint="fact_refine", schema="string_list")
+        results = []
+        for response in responses:
+            facts = extract_json_from_text(response) if response else None
+            results.append(facts if isinstance(facts, list) else [])
+        return results
+
     def verify_premise(self, query: str, text_content: str) -> Dict:
         """
         Check if the text actually supports the user's premise.
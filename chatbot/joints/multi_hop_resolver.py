@@ -2,8 +2,76 @@
 import time
 from typing import Dict, List, Any, Optional
 from chatbot import config
+from chatbot.article_cache import get_article_cache
 from .base import debug_print, local_inference, extract_json_from_text
 
+DETECT_PREFIX = """Analyze the query below for indirect entity references (e.g., "the creator of X", "capital of Y").
+
+INSTRUCTIONS:
+1. Determine if the query asks about a relationship to an entity (has_indirect).
+2. If yes, identify:
+   - base_entity: The entity we need to look up first (e.g., "Python")
+   - relationship: What relationship we're looking for (e.g., "creator", "capital", "inventor")
+   - target_type: What type of entity we want to find (person, place, organization, etc.)
+
+EXAMPLES:
+Query: "What university did the creator of Python attend?"
+Result: {
+  "has_indirect": true,
+  "base_entity": "Python (programming language)",
+  "relationship": "creator",
+  "target_type": "person"
+}
+
+Query: "What is the capital of France?"
+Result: {
+  "has_indirect": true,
+  "base_entity": "France",
+  "relationship": "capital",
+  "target_type": "city"
+}
+
+Query: "Who invented the telephone?"
+Result: {
+  "has_indirect": false,
+  "reason": "Direct question, no indirect reference"
+}
+
+Query: "Compare Python and Java"
+Result: {
+  "has_indirect": false,
+  "reason": "Comparison query, entities are direct"
+}
+
+Return ONLY valid JSON. No markdown code blocks.
+
+"""
+
+RESOLVE_PREFIX = """Extract the entity we are looking for from the Wikipedia article excerpt below.
+
+INSTRUCTIONS:
+1. Find the relationship we are looking for in the article.
+2. Return ONLY the person/entity name, formatted as a Wikipedia article title.
+3. If multiple people are mentioned, return the primary/first one.
+4. If not found, return null.
+
+EXAMPLES:
+Looking for: creator of Python
+Content: "Python was created by Guido van Rossum in 1991..."
+Result: {"entity": "Guido van Rossum"}
+
+Looking for: capital of France
+Content: "France is a country whose capital is Paris..."
+Result: {"entity": "Paris"}
+
+Looking for: inventor of telephone
+Content: "The telephone was invented by Alexander Graham Bell..."
+Result: {"entity": "Alexander Graham Bell"}
+
+Return ONLY valid JSON: {"entity": "Name"} or {"entity": null}
+
+"""
+
 class MultiHopResolverJoint:
     """
     Joint 0.5: Multi-Hop Resolver
@@ -56,53 +124,13 @@ class MultiHopResolverJoint:
             return None
         
         # Use LLM for precise pattern analysis
-        prompt = f"""Analyze this query for indirect entity references (e.g., "the creator of X", "capital of Y").
-
-Query: "{query}"
-
+        prompt = f"""Query: "{query}"
 Extracted entities: {[e.get('name', '') for e in entities]}
-
-INSTRUCTIONS:
-1. Determine if the query asks about a relationship to an entity (has_indirect).
-2. If yes, identify:
-   - base_entity: The entity we need to look up first (e.g., "Python")
-   - relationship: What relationship we're looking for (e.g., "creator", "capital", "inventor")
-   - target_type: What type of entity we want to find (person, place, organization, etc.)
-
-EXAMPLES:
-Query: "What university did the creator of Python attend?"
-Result: {{
-  "has_indirect": true,
-  "base_entity": "Python (programming language)",
-  "relationship": "creator",
-  "target_type": "person"
-}}
-
-Query: "What is the capital of France?"
-Result: {{
-  "has_indirect": true,
-  "base_entity": "France",
-  "relationship": "capital",
-  "target_type": "city"
-}}
-
-Query: "Who invented the telephone?"
-Result: {{
-  "has_indirect": false,
-  "reason": "Direct question, no indirect reference"
-}}
-
-Query: "Compare Python and Java"
-Result: {{
-  "has_indirect": false,
-  "reason": "Comparison query, entities are direct"
-}}
-
-Return ONLY valid JSON. No markdown code blocks.
-"""
+Result:"""
         
         try:
-            response = local_inference(self.model, prompt, self.temperature, config.JOINT_TIMEOUT, use_json_grammar=True)
+            response = local_inference(self.model, prompt, self.temperature, config.JOINT_TIMEOUT, use_json_grammar=True,
+                                       prefix=DETECT_PREFIX, joint="multi_hop_detect", schema="indirect")
             result = extract_json_from_text(response)
             
             if result and result.get('has_indirect'):
@@ -136,37 +164,15 @@ Return ONLY valid JSON. No markdown code blocks.
         # Truncate article to first 2000 chars to fit in context
         content_excerpt = article_content[:2000]
         
-        prompt = f"""Extract the {relationship} of {base_entity} from this Wikipedia article excerpt.
-
-Article: {base_entity}
-Looking for: {relationship}
+        prompt = f"""Article: {base_entity}
+Looking for: {relationship} of {base_entity}
 Content:
 {content_excerpt}
-
-INSTRUCTIONS:
-1. Find the {relationship} mentioned in the article.
-2. Return ONLY the person/entity name, formatted as a Wikipedia article title.
-3. If multiple people are mentioned, return the primary/first one.
-4. If not found, return null.
-
-EXAMPLES:
-Looking for: creator of Python
-Content: "Python was created by Guido van Rossum in 1991..."
-Result: {{"entity": "Guido van Rossum"}}
-
-Looking for: capital of France
-Content: "France is a country whose capital is Paris..."
-Result: {{"entity": "Paris"}}
-
-Looking for: inventor of telephone
-Content: "The telephone was invented by Alexander Graham Bell..."
-Result: {{"entity": "Alexander Graham Bell"}}
-
-Return ONLY valid JSON: {{"entity": "Name"}} or {{"entity": null}}
-"""
+Result:"""
         
         try:
-            response = local_inference(self.model, prompt, self.temperature, config.JOINT_TIMEOUT, use_json_grammar=True)
+            response = local_inference(self.model, prompt, self.temperature, config.JOINT_TIMEOUT, use_json_grammar=True,
+                                       prefix=RESOLVE_PREFIX, joint="multi_hop_resolve", schema="resolved_entity")
             result = extract_json_from_text(response)
             
             if result and result.get('entity'):
@@ -230,7 +236,13 @@ Return ONLY valid JSON: {{"entity": "Name"}} or {{"entity": null}}
             return None
         
         # Step 3: Extract referenced entity from article
-        article_text = base_article.get('text', '')
+        # Prefer the clean cached text (doc['text'] may carry prepended refined facts)
+        article_text = None
+        key = base_article.get('metadata', {}).get('article_key')
+        if key:
+            article_text = get_article_cache().get(key)
+        if article_text is None:
+            article_text = base_article.get('text', '')
         resolved_entity = self.resolve_entity(base_entity, relationship, article_text)
         
         if not resolved_entity:
@@ -0,0 +1,288 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Per-Archive Lexical Index.
+A memory-mapped BM25 inverted index over every article's title and lead
+paragraph, built by `hermit index-titles`. Postings are stored per term in
+doc-id order and cut into fixed-size blocks, each with the highest BM25
+contribution any of its postings can make. Queries walk terms rarest-first
+and skip every block whose upper bound cannot lift a document into the
+current top-k (block-max MaxScore), so a query touches a few pages of the
+postings instead of scoring the whole corpus.
+
+File layout (little-endian, every array naturally aligned):
+    magic        8 bytes   b"HRMTLEX1"
+    uuid        16 bytes   archive UUID (stale sidecars are ignored)
+    num_docs     4 bytes
+    num_terms    4 bytes
+    num_blocks   8 bytes
+    num_posts    8 bytes
+    avg_len      8 bytes   float64, mean weighted document length
+    k1, b        2 x 4     float32 BM25 parameters the block bounds were computed with
+    term_hashes  num_terms * uint64, sorted
+    term_block   (num_terms + 1) * uint64, first block of each term
+    block_post   (num_blocks + 1) * uint64, first posting of each block
+    block_max    num_blocks * float32
+    term_df      num_terms * uint32
+    post_doc     num_posts * uint32, doc ids ascending within a term
+    doc_entry    num_docs * uint32, archive entry index of each doc
+    post_tf      num_posts * uint16, weighted term frequency
+    doc_len      num_docs * uint16
+"""
+
+import os
+import re
+import math
+import hashlib
+import struct
+from collections import Counter
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from chatbot import config
+from chatbot.debug_utils import debug_print
+from chatbot.text_processing import TextProcessor
+from chatbot.zim_utils import iter_article_entries, sidecar_path
+
+MAGIC = b"HRMTLEX1"
+HEADER = struct.Struct("<8s16sIIQQdff")
+BLOCK_SIZE = 128
+
+_TOKEN = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his how in is it its of on or she that the their "
+    "there they this to was were what when where which who whom why will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Case-folded word tokens, minus single characters and stopwords."""
+    return [tok for tok in _TOKEN.findall(text.casefold()) if len(tok) > 1 and tok not in _STOPWORDS]
+
+
+def _term_hash(term: str) -> int:
+    digest = hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _idf(num_docs: int, df):
+    return np.log1p((num_docs - df + 0.5) / (df + 0.5))
+
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(s, e) for each (s, e) pair, without a Python loop."""
+    lens = (ends - starts).astype(np.int64)
+    total = int(lens.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    shifts = np.repeat(starts.astype(np.int64) - np.cumsum(lens) + lens, lens)
+    return shifts + np.arange(total, dtype=np.int64)
+
+
+def build_lexical_index(zim_path: str, archive=None) -> str:
+    """
+    Tokenize every article's title (weighted LEXICAL_TITLE_WEIGHT) and lead
+    paragraph (first LEXICAL_LEAD_CHARS of cleaned text) and write the sidecar.
+    Returns the sidecar path.
+    """
+    if archive is None:
+        import libzim
+        archive = libzim.Archive(zim_path)
+
+    k1, b = config.LEXICAL_BM25_K1, config.LEXICAL_BM25_B
+    title_weight = config.LEXICAL_TITLE_WEIGHT
+    term_parts, doc_parts, tf_parts = [], [], []
+    terms, docs, tfs = [], [], []
+    doc_entries, doc_lens = [], []
+
+    def flush():
+        term_parts.append(np.array(terms, dtype='<u8'))
+        doc_parts.append(np.array(docs, dtype='<u4'))
+        tf_parts.append(np.array(tfs, dtype='<u2'))
+        terms.clear(); docs.clear(); tfs.clear()
+
+    for i, entry in iter_article_entries(archive):
+        if entry.is_redirect:
+            continue
+        try:
+            item = entry.get_item()
+            if item.mimetype != 'text/html':
+                continue
+            lead = TextProcessor.extract_lead_text(item.content, config.LEXICAL_LEAD_CHARS)
+        except Exception:
+            continue
+        title_tokens = tokenize(entry.title)
+        lead_tokens = tokenize(lead)
+        counts = Counter(lead_tokens)
+        for tok in title_tokens:
+            counts[tok] += title_weight
+        if not counts:
+            continue
+        doc = len(doc_entries)
+        doc_entries.append(i)
+        doc_lens.append(min(65535, title_weight * len(title_tokens) + len(lead_tokens)))
+        for tok, tf in counts.items():
+            terms.append(_term_hash(tok))
+            docs.append(doc)
+            tfs.append(min(tf, 65535))
+        if len(terms) >= 1_000_000:
+            flush()
+    flush()
+
+    term_arr = np.concatenate(term_parts)
+    doc_arr = np.concatenate(doc_parts)
+    tf_arr = np.concatenate(tf_parts)
+    order = np.lexsort((doc_arr, term_arr))
+    term_arr, doc_arr, tf_arr = term_arr[order], doc_arr[order], tf_arr[order]
+
+    doc_len_arr = np.array(doc_lens, dtype='<u2')
+    num_docs = len(doc_entries)
+    avg_len = float(doc_len_arr.mean()) if num_docs else 1.0
+
+    term_hashes, term_starts, term_df = np.unique(term_arr, return_index=True, return_counts=True)
+    blocks_per_term = (term_df + BLOCK_SIZE - 1) // BLOCK_SIZE
+    term_block = np.concatenate([[0], np.cumsum(blocks_per_term)]).astype('<u8')
+    num_blocks = int(term_block[-1])
+    block_starts = np.repeat(term_starts, blocks_per_term) + \
+        (np.arange(num_blocks) - np.repeat(term_block[:-1].astype(np.int64), blocks_per_term)) * BLOCK_SIZE
+    block_post = np.concatenate([block_starts, [len(doc_arr)]]).astype('<u8')
+
+    if len(doc_arr):
+        idf = np.repeat(_idf(num_docs, term_df.astype(np.float64)), term_df)
+        tf = tf_arr.astype(np.float64)
+        dl = doc_len_arr[doc_arr].astype(np.float64)
+        scores = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avg_len))
+        block_max = np.maximum.reduceat(scores, block_starts).astype('<f4')
+    else:
+        block_max = np.zeros(0, dtype='<f4')
+
+    out_path = sidecar_path(zim_path, "lexical")
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, archive.uuid.bytes, num_docs, len(term_hashes), num_blocks, len(doc_arr), avg_len, k1, b))
+        for arr, dtype in ((term_hashes, '<u8'), (term_block, '<u8'), (block_post, '<u8'), (block_max, '<f4'),
+                           (term_df, '<u4'), (doc_arr, '<u4'), (doc_entries, '<u4'), (tf_arr, '<u2'), (doc_len_arr, '<u2')):
+            f.write(np.asarray(arr, dtype=dtype).tobytes())
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class LexicalIndex:
+    """Read-only, mmap'd view of a lexical sidecar."""
+
+    def __init__(self, path: str, header: tuple, arrays: dict):
+        self.path = path
+        _, _, self.num_docs, self.num_terms, _, _, self.avg_len, self.k1, self.b = header
+        self.__dict__.update(arrays)
+
+    def __len__(self) -> int:
+        return self.num_docs
+
+    @classmethod
+    def load(cls, zim_path: str, archive=None) -> Optional['LexicalIndex']:
+        """
+        Map the sidecar for an archive. Returns None if it is missing, corrupt,
+        or was built for a different archive UUID.
+        """
+        path = sidecar_path(zim_path, "lexical")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                header = HEADER.unpack(f.read(HEADER.size))
+            magic, uuid_bytes, num_docs, num_terms, num_blocks, num_posts = header[:6]
+            if magic != MAGIC:
+                debug_print(f"Ignoring lexical index with bad header: {path}")
+                return None
+            if archive is not None and uuid_bytes != archive.uuid.bytes:
+                debug_print(f"Ignoring stale lexical index (UUID mismatch): {path}")
+                return None
+            layout = (
+                ('term_hashes', '<u8', num_terms), ('term_block', '<u8', num_terms + 1),
+                ('block_post', '<u8', num_blocks + 1), ('block_max', '<f4', num_blocks),
+                ('term_df', '<u4', num_terms), ('post_doc', '<u4', num_posts),
+                ('doc_entry', '<u4', num_docs), ('post_tf', '<u2', num_posts), ('doc_len', '<u2', num_docs),
+            )
+            arrays = {}
+            offset = HEADER.size
+            for name, dtype, count in layout:
+                # np.memmap rejects zero-length maps
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,)) if count else np.zeros(0, dtype=dtype)
+                offset += np.dtype(dtype).itemsize * count
+            return cls(path, header, arrays)
+        except Exception as e:
+            debug_print(f"Failed to load lexical index {path}: {e}")
+            return None
+
+    def _score(self, idf: float, tf: np.ndarray, docs: np.ndarray) -> np.ndarray:
+        tf = tf.astype(np.float64)
+        dl = self.doc_len[docs].astype(np.float64)
+        return idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * dl / self.avg_len))
+
+    def _terms(self, query: str):
+        """(posting count, term id, first block, end block, idf, upper bound) per known query term, rarest first."""
+        found = []
+        for tok in set(tokenize(query)):
+            h = np.uint64(_term_hash(tok))
+            t = int(np.searchsorted(self.term_hashes, h))
+            if t >= self.num_terms or self.term_hashes[t] != h:
+                continue
+            b0, b1 = int(self.term_block[t]), int(self.term_block[t + 1])
+            idf = float(_idf(self.num_docs, float(self.term_df[t])))
+            found.append((int(self.term_df[t]), t, b0, b1, idf, float(self.block_max[b0:b1].max())))
+        return sorted(found)
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Top-k (entry index, BM25 score), best first."""
+        terms = self._terms(query)
+        if not terms or k <= 0:
+            return []
+        remaining = sum(term[5] for term in terms)
+        cand_docs = np.zeros(0, dtype=np.int64)
+        cand_scores = np.zeros(0, dtype=np.float64)
+
+        def kth_score():
+            return float(np.partition(cand_scores, -k)[-k]) if len(cand_scores) >= k else 0.0
+
+        for _, _, b0, b1, idf, ub in terms:
+            p0, p1 = int(self.block_post[b0]), int(self.block_post[b1])
+            term_docs = self.post_doc[p0:p1]
+
+            # Exact contribution to documents already in the running
+            if len(cand_docs):
+                pos = np.minimum(np.searchsorted(term_docs, cand_docs), len(term_docs) - 1)
+                hit = term_docs[pos] == cand_docs
+                if hit.any():
+                    cand_scores[hit] += self._score(idf, self.post_tf[p0 + pos[hit]], cand_docs[hit])
+
+            # New documents, only from blocks that could still reach the top-k
+            rest = remaining - ub
+            known = cand_docs
+            bmax = self.block_max[b0:b1]
+            live = np.nonzero(bmax + rest > kth_score())[0]
+            live = live[np.argsort(-bmax[live], kind='stable')]
+            for n in range(0, len(live), config.LEXICAL_BLOCK_BATCH):
+                batch = live[n:n + config.LEXICAL_BLOCK_BATCH]
+                batch = batch[bmax[batch] + rest > kth_score()]
+                if not len(batch):
+                    break  # Blocks are in descending bound order
+                idx = _ranges(self.block_post[b0 + batch], self.block_post[b0 + batch + 1])
+                docs = self.post_doc[idx].astype(np.int64)
+                fresh = ~np.isin(docs, known, assume_unique=True)
+                cand_docs = np.concatenate([cand_docs, docs[fresh]])
+                cand_scores = np.concatenate([cand_scores, self._score(idf, self.post_tf[idx[fresh]], docs[fresh])])
+
+            remaining = rest
+            order = np.argsort(cand_docs, kind='stable')
+            cand_docs, cand_scores = cand_docs[order], cand_scores[order]
+            # Drop documents that can no longer reach the top-k
+            if len(cand_scores) > k:
+                keep = cand_scores + remaining >= kth_score()
+                cand_docs, cand_scores = cand_docs[keep], cand_scores[keep]
+
+        top = np.argsort(-cand_scores, kind='stable')[:k]
+        return [(int(self.doc_entry[cand_docs[i]]), float(cand_scores[i])) for i in top]
@@ -25,6 +25,9 @@ Handles downloading GGUF models from Hugging Face and loading them via llama-cpp
 import os
 import sys
 import glob
+import time
+import threading
+from collections import OrderedDict, deque
 from typing import Optional, Dict, List, Callable
 from huggingface_hub import hf_hub_download, list_repo_files, try_to_load_from_cache
 try:
@@ -117,9 +120,35 @@ class ProgressTqdm:
         self.close()
 
 class ModelManager:
-    """Singleton manager for local LLM models."""
+    """
+    Singleton manager for local LLM models.
+
+    Several models can be resident at once. Each load is charged an estimated
+    footprint (GGUF size + KV cache) against MODEL_MEMORY_BUDGET_GB. When a
+    new model does not fit, the least recently used unpinned models are
+    unloaded first. The chat model is pinned, and models left idle for
+    MODEL_IDLE_UNLOAD_SECONDS are unloaded in the background.
+
+    One instance serves every context size up to the one it was loaded with,
+    so joints (4096) share the chat model's instance (DEFAULT_CONTEXT_SIZE).
+    A model is only reloaded when a caller needs a larger window; that resize
+    is counted and kept in resize_log.
+    """
     
-    _instances: Dict[str, 'Llama'] = {}
+    _instances: "OrderedDict[str, Llama]" = OrderedDict()  # LRU order, most recent last
+    _contexts: Dict[str, int] = {}     # n_ctx each resident instance was loaded with
+    _peak_ctx: Dict[str, int] = {}     # Largest n_ctx ever requested per model (used for every load)
+    _footprints: Dict[str, int] = {}   # Estimated bytes per resident model
+    _last_used: Dict[str, float] = {}
+    _pinned: set = set()
+    _chat_model: Optional[str] = None
+    _registry_lock = threading.RLock()
+    _reaper: Optional[threading.Thread] = None
+    metrics: Dict[str, int] = {"loads": 0, "hits": 0, "evictions": 0, "idle_unloads": 0, "resizes": 0}
+    resize_log: "deque[Dict]" = deque(maxlen=32)  # Recent context-growing reloads
+    # llama.cpp contexts are not thread-safe: hold this while loading a model and
+    # generating with it (concurrent aretrieve() queries). Unloads also take it.
+    inference_lock = threading.RLock()
     
     @staticmethod
     def ensure_model_path(repo_id: str) -> str:
@@ -326,40 +355,243 @@ class ModelManager:
             raise
 
     @classmethod
-    def get_model(cls, repo_id: str, n_ctx: int = 8192, n_gpu_layers: int = -1) -> 'Llama':
+    def get_model(cls, repo_id: str, n_ctx: int = 8192, n_gpu_layers: int = -1, chat_model: bool = False,
+                  parallel: int = 1, draft_model: Optional[str] = None) -> 'Llama':
         """
         Get or load a Llama model instance.
-        Enforces single-model policy to prevent VRAM OOM.
+        Other resident models are kept while everything fits in the memory budget;
+        least recently used unpinned models are unloaded to make room.
         Uses 8192 context by default to accommodate RAG content.
+        The instance may have a larger context than n_ctx (never a smaller one).
+
+        Args:
+            chat_model: This is the chat model; pin it (replacing the previous chat model's pin)
+            parallel: > 1 loads a separate multi-sequence xllamacpp server with that many
+                      slots of n_ctx tokens each (see joints.base.batch_inference)
+            draft_model: Load a separate instance that decodes speculatively with this
+                         smaller model drafting tokens (see chatbot/speculative.py). It
+                         replaces the plain instance, and plain requests are served by it
+                         while it is resident and its pair is enabled
         """
-        if repo_id in cls._instances:
-            return cls._instances[repo_id]
-            
-        # Unload ALL other models to free VRAM before loading new one
-        if cls._instances:
-            print(f"Unloading {len(cls._instances)} active models to free VRAM for {repo_id}...")
-            import gc
-            for key in list(cls._instances.keys()):
-                print(f"Unloading model: {key}")
-                # Explicitly delete the Llama object
-                model_instance = cls._instances[key]
-                del model_instance
-                del cls._instances[key]
-            
-            # Force garbage collection to ensure VRAM is released
-            cls._instances.clear()
-            gc.collect()
-            
-            # Force CUDA to release memory (critical for OOM prevention)
-            try:
-                import torch
-                if torch.cuda.is_available():
-                    torch.cuda.empty_cache()
-                    torch.cuda.synchronize()
-                    print("CUDA memory cache cleared.")
-            except Exception:
-                pass  # torch might not be available
-            
+        key = cls._registry_key(repo_id, parallel, draft_model)
+        with cls._registry_lock:
+            served = cls._serving_key(key, repo_id, n_ctx, parallel, draft_model)
+            if chat_model and cls._chat_model != served:
+                if cls._chat_model is not None:
+                    cls._pinned.discard(cls._chat_model)
+                cls._chat_model = served
+                cls._pinned.add(served)
+            cls._peak_ctx[key] = max(n_ctx, cls._peak_ctx.get(key, 0))
+            if cls._contexts.get(served, 0) >= n_ctx and served in cls._instances:
+                cls._instances.move_to_end(served)
+                cls._last_used[served] = time.time()
+                cls.metrics["hits"] += 1
+                return cls._instances[served]
+
+        # Loads are serialized by inference_lock. The registry lock is only taken around
+        # registry changes, so lookups of resident models and stats() never wait for a
+        # download or a model initialization
+        with cls.inference_lock:
+            with cls._registry_lock:
+                served = cls._serving_key(key, repo_id, n_ctx, parallel, draft_model)
+                if cls._contexts.get(served, 0) >= n_ctx and served in cls._instances:
+                    # Loaded (or resized) by another thread while we waited
+                    return cls.get_model(repo_id, n_ctx, n_gpu_layers, parallel=parallel, draft_model=draft_model)
+                load_ctx = cls._peak_ctx[key]
+                if key in cls._instances:
+                    old_ctx = cls._contexts[key]
+                    print(f"Resizing {key} context: {old_ctx} -> {load_ctx} tokens (reloading)")
+                    cls._unload(key)
+                    cls.metrics["resizes"] += 1
+                    cls.resize_log.append({"repo_id": key, "from": old_ctx, "to": load_ctx, "at": time.time()})
+                if draft_model and repo_id in cls._instances:
+                    # The drafting instance takes over the plain one's requests
+                    cls._unload(repo_id)
+            llm = cls._load_model(repo_id, load_ctx, n_gpu_layers, parallel, draft_model)
+            with cls._registry_lock:
+                cls._instances[key] = llm
+                cls._contexts[key] = load_ctx
+                cls._last_used[key] = time.time()
+                cls.metrics["loads"] += 1
+                cls._start_reaper()
+            return llm
+
+    @staticmethod
+    def _registry_key(repo_id: str, parallel: int = 1, draft_model: Optional[str] = None) -> str:
+        if parallel > 1:
+            return f"{repo_id}#x{parallel}"
+        return f"{repo_id}+draft:{draft_model}" if draft_model else repo_id
+
+    @classmethod
+    def _serving_key(cls, key: str, repo_id: str, n_ctx: int, parallel: int, draft_model: Optional[str]) -> str:
+        """
+        Registry key that serves a request for `key` (caller holds the registry lock).
+        Plain requests go to a resident speculative instance of the same model when it
+        has the context and its pair is enabled, so the target is not resident twice.
+        """
+        if parallel > 1 or draft_model:
+            return key
+        from chatbot.speculative import pair_enabled
+        for resident in cls._instances:
+            target, drafting, draft = resident.partition("+draft:")
+            if drafting and target == repo_id and cls._contexts.get(resident, 0) >= n_ctx and pair_enabled(target, draft):
+                return resident
+        return key
+
+    @classmethod
+    def pin(cls, repo_id: str) -> None:
+        with cls._registry_lock:
+            cls._pinned.add(repo_id)
+
+    @classmethod
+    def unpin(cls, repo_id: str) -> None:
+        with cls._registry_lock:
+            cls._pinned.discard(repo_id)
+
+    @classmethod
+    def stats(cls) -> Dict:
+        """Residency metrics: counters plus resident models with footprint (GB) and idle time (s)."""
+        with cls._registry_lock:
+            now = time.time()
+            return {
+                **cls.metrics,
+                "budget_gb": cls._memory_budget() / 1024 ** 3,
+                "resident": [
+                    {
+                        "repo_id": repo_id,
+                        "gb": cls._footprints.get(repo_id, 0) / 1024 ** 3,
+                        "n_ctx": cls._contexts.get(repo_id, 0),
+                        "idle_s": now - cls._last_used.get(repo_id, now),
+                        "pinned": repo_id in cls._pinned,
+                    }
+                    for repo_id in cls._instances
+                ],
+                "recent_resizes": list(cls.resize_log),
+            }
+
+    # --- residency policy ---
+
+    @staticmethod
+    def _memory_budget() -> int:
+        """Bytes available for resident models: MODEL_MEMORY_BUDGET_GB, else VRAM (GPU) or half of RAM."""
+        if config.MODEL_MEMORY_BUDGET_GB > 0:
+            return int(config.MODEL_MEMORY_BUDGET_GB * 1024 ** 3)
+        try:
+            import torch
+            if torch.cuda.is_available():
+                return int(0.9 * sum(torch.cuda.get_device_properties(i).total_memory
+                                     for i in range(torch.cuda.device_count())))
+        except Exception:
+            pass
+        try:
+            return int(0.5 * os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES'))
+        except (AttributeError, ValueError, OSError):
+            return 8 * 1024 ** 3
+
+    @staticmethod
+    def _estimate_footprint(model_path: str, n_ctx: int) -> int:
+        """Weights (all shards of a split GGUF) plus KV cache for n_ctx tokens."""
+        import re
+        split = re.search(r'(.*)-00001-of-(\d{5})\.gguf$', model_path)
+        if split:
+            paths = [f"{split.group(1)}-{i:05d}-of-{split.group(2)}.gguf" for i in range(1, int(split.group(2)) + 1)]
+        else:
+            paths = [model_path]
+        weights = sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+        return int(weights * config.MODEL_MEMORY_OVERHEAD) + n_ctx * config.MODEL_KV_BYTES_PER_TOKEN
+
+    @classmethod
+    def _make_room(cls, repo_id: str, needed: int) -> None:
+        """Unload LRU models until `needed` more bytes fit (pinned ones only as a last resort)."""
+        budget = cls._memory_budget()
+        for allow_pinned in (False, True):
+            for key in list(cls._instances):
+                if sum(cls._footprints.values()) + needed <= budget:
+                    return
+                if key in cls._pinned and not allow_pinned:
+                    continue
+                if key in cls._pinned:
+                    print(f"⚠️ {repo_id} does not fit next to pinned model {key}; unloading it")
+                cls._unload(key)
+                cls.metrics["evictions"] += 1
+        if sum(cls._footprints.values()) + needed > budget:
+            print(f"⚠️ {repo_id} (~{needed / 1024 ** 3:.1f} GB) exceeds the model memory budget "
+                  f"({budget / 1024 ** 3:.1f} GB); loading anyway")
+
+    @classmethod
+    def _unload(cls, repo_id: str) -> None:
+        """Drop a resident model and release its memory (caller holds both locks)."""
+        import gc
+        print(f"Unloading model: {repo_id}")
+        cls._instances.pop(repo_id, None)
+        cls._footprints.pop(repo_id, None)
+        cls._contexts.pop(repo_id, None)
+        cls._last_used.pop(repo_id, None)
+        gc.collect()
+        
+        # Force CUDA to release memory (critical for OOM prevention)
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+                torch.cuda.synchronize()
+        except Exception:
+            pass  # torch might not be available
+
+    @classmethod
+    def _start_reaper(cls) -> None:
+        """Background thread that unloads unpinned models idle for MODEL_IDLE_UNLOAD_SECONDS."""
+        if cls._reaper is not None or config.MODEL_IDLE_UNLOAD_SECONDS <= 0:
+            return
+
+        def run():
+            interval = max(1.0, min(60.0, config.MODEL_IDLE_UNLOAD_SECONDS / 2))
+            while True:
+                time.sleep(interval)
+                cls.unload_idle()
+
+        cls._reaper = threading.Thread(target=run, name="model-reaper", daemon=True)
+        cls._reaper.start()
+
+    @classmethod
+    def unload_idle(cls, max_idle: float = None) -> List[str]:
+        """Unload unpinned models idle longer than max_idle seconds. Skipped while inference runs."""
+        max_idle = config.MODEL_IDLE_UNLOAD_SECONDS if max_idle is None else max_idle
+        if not cls.inference_lock.acquire(blocking=False):
+            return []
+        try:
+            with cls._registry_lock:
+                now = time.time()
+                idle = [key for key in cls._instances
+                        if key not in cls._pinned and now - cls._last_used.get(key, now) > max_idle]
+                for key in idle:
+                    cls._unload(key)
+                    cls.metrics["idle_unloads"] += 1
+                return idle
+        finally:
+            cls.inference_lock.release()
+
+    @classmethod
+    def _load_model(cls, repo_id: str, n_ctx: int, n_gpu_layers: int, parallel: int = 1,
+                    draft_model: Optional[str] = None) -> 'Llama':
+        """
+        Load a model, first unloading whatever is needed to stay within the budget.
+        Caller holds inference_lock; the registry lock is taken only to make room
+        and to record the footprint.
+        """
+        key = cls._registry_key(repo_id, parallel, draft_model)
+        if parallel > 1:
+            from chatbot.xllamacpp_wrapper import XLlamaCPPWrapper
+            model_path = cls.ensure_model_path(repo_id)
+            # Weights are charged again (exact on GPU; on CPU the mmap'd pages are shared)
+            footprint = cls._estimate_footprint(model_path, n_ctx * parallel)
+            with cls._registry_lock:
+                cls._make_room(key, footprint)
+            server = XLlamaCPPWrapper(model_path, n_ctx=n_ctx, n_gpu_layers=n_gpu_layers, n_parallel=parallel)
+            with cls._registry_lock:
+                cls._footprints[key] = footprint
+            return server
+
         if Llama is None:
             raise ImportError("llama-cpp-python is missing")
         
@@ -380,12 +612,27 @@ class ModelManager:
                     model_name=config.API_MODEL_NAME
                 )
                 
-                # Cache it so we don't re-init (though it's cheap)
-                cls._instances[repo_id] = client
+                # Cached by get_model so we don't re-init (though it's cheap); costs no local memory
+                with cls._registry_lock:
+                    cls._footprints[key] = 0
                 _notify_progress("ready", 1.0, f"API: {config.API_MODEL_NAME}")
                 return client
 
             model_path = cls.ensure_model_path(repo_id)
+            footprint = cls._estimate_footprint(model_path, n_ctx)
+            drafter = None
+            if draft_model:
+                draft_path = cls.ensure_model_path(draft_model)
+                footprint += cls._estimate_footprint(draft_path, n_ctx)
+            with cls._registry_lock:
+                cls._make_room(key, footprint)
+            if draft_model:
+                from chatbot.speculative import DraftModelDecoding
+                print(f"Loading draft model {draft_model} for speculative decoding...")
+                drafter = DraftModelDecoding(
+                    Llama(model_path=draft_path, n_gpu_layers=n_gpu_layers, n_ctx=n_ctx, verbose=False),
+                    target=repo_id, draft=draft_model,
+                )
             
             # Load with GPU offload
             # n_gpu_layers = -1 means 'all layers' (good for 3060 12GB)
@@ -432,10 +679,12 @@ class ModelManager:
                 split_mode=split_mode,
                 tensor_split=tensor_split,
                 use_mmap=True, # [OPTIMIZATION] Try MMAP first for speed
+                draft_model=drafter,
                 verbose=True 
             )
             
-            cls._instances[repo_id] = llm
+            with cls._registry_lock:
+                cls._footprints[key] = footprint + cls._draft_logits_bytes(llm, drafter, n_ctx)
             _notify_progress("ready", 1.0, f"{model_name} ready")
             print(f"Model {repo_id} loaded successfully (MMAP Enabled).")
             return llm
@@ -453,9 +702,11 @@ class ModelManager:
                         split_mode=split_mode,
                         tensor_split=tensor_split,
                         use_mmap=False, # Fallback
+                        draft_model=drafter,
                         verbose=True 
                     )
-                    cls._instances[repo_id] = llm
+                    with cls._registry_lock:
+                        cls._footprints[key] = footprint + cls._draft_logits_bytes(llm, drafter, n_ctx)
                     _notify_progress("ready", 1.0, f"{model_name} ready (No MMAP)")
                     print(f"Model {repo_id} loaded successfully (No MMAP).")
                     return llm
@@ -467,8 +718,14 @@ class ModelManager:
             print(f"Failed to load model {repo_id}: {e}")
             raise
 
+    @staticmethod
+    def _draft_logits_bytes(llm, drafter, n_ctx: int) -> int:
+        """With a draft model llama-cpp keeps logits for every position (n_ctx x n_vocab float32)."""
+        return n_ctx * llm.n_vocab() * 4 if drafter is not None else 0
+
     @classmethod
     def close_all(cls):
         """Free memory."""
-        cls._instances.clear()
-        # Python GC should handle the rest if no refs remain
\ No newline at end of file
+        with cls.inference_lock, cls._registry_lock:
+            for key in list(cls._instances):
+                cls._unload(key)
\ No newline at end of file
@@ -0,0 +1,167 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Joint Prompt-Prefix States.
+Joints send a long static instruction block (rules, few-shot examples) ahead
+of a short query-specific suffix. The first time a (model, joint) pair runs,
+its static prefix is evaluated once and the llama context state is saved,
+both in an in-process LRU and under JOINT_PREFIX_CACHE_DIR. Every later call
+restores that state before the completion; llama-cpp matches the restored
+tokens against the new prompt and only evaluates what follows the prefix.
+
+States are keyed by model file, context size and the exact prefix messages,
+so editing a prompt or swapping a GGUF never restores a stale state.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from chatbot import config
+from chatbot.debug_utils import debug_print
+
+
+class PrefixStateCache:
+    """RAM + disk store of llama states evaluated up to a joint's static prefix."""
+
+    def __init__(self, cache_dir: Optional[str] = None, ram_entries: Optional[int] = None):
+        """
+        Args:
+            cache_dir: Directory for persisted states (None disables the disk tier)
+            ram_entries: LRU capacity in states
+        """
+        self.cache_dir = cache_dir
+        self.ram_entries = config.JOINT_PREFIX_CACHE_RAM_ENTRIES if ram_entries is None else ram_entries
+        self._states: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics: Dict[str, int] = {"ram_hits": 0, "disk_hits": 0, "builds": 0}
+
+    def restore(self, llm, model: str, joint: str, messages: List[Dict[str, str]]) -> bool:
+        """
+        Put llm's context at the end of the prefix messages, evaluating and saving them on first use.
+        The caller must hold ModelManager.inference_lock.
+
+        Args:
+            llm: Loaded Llama instance
+            model: Repo ID the instance was loaded from
+            joint: Joint name (one saved prefix per model and joint)
+            messages: Chat messages whose last user turn is the static prefix
+
+        Returns:
+            False if the backend cannot save/restore state (e.g. API mode)
+        """
+        if not (hasattr(llm, 'save_state') and hasattr(llm, 'load_state')):
+            return False
+
+        key = self._key(llm, model, joint, messages)
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+                self.metrics["ram_hits"] += 1
+        if state is None:
+            state = self._read(model, joint, key)
+            if state is not None:
+                self.metrics["disk_hits"] += 1
+            else:
+                state = self._evaluate(llm, messages)
+                self.metrics["builds"] += 1
+                self._write(model, joint, key, state)
+                debug_print(f"Saved prompt prefix state for {joint} ({state.n_tokens} tokens)")
+            self._remember(key, state)
+
+        llm.load_state(state)
+        return True
+
+    @staticmethod
+    def _key(llm, model: str, joint: str, messages: List[Dict[str, str]]) -> str:
+        model_path = getattr(llm, 'model_path', '') or ''
+        try:
+            mtime = os.path.getmtime(model_path)
+        except OSError:
+            mtime = 0
+        n_ctx = llm.n_ctx() if callable(getattr(llm, 'n_ctx', None)) else 0
+        blob = json.dumps([model, model_path, mtime, n_ctx, joint, messages], sort_keys=True)
+        return hashlib.sha1(blob.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def _evaluate(llm, messages: List[Dict[str, str]]):
+        """Run the prefix through the chat template once and snapshot the context."""
+        llm.reset()
+        llm.create_chat_completion(messages=messages, max_tokens=1, temperature=0.0)
+        state = llm.save_state()
+        # Calls always evaluate a suffix on top of the prefix, so the saved logits are never
+        # sampled from. Keep one row (load_state broadcasts it) instead of n_batch x n_vocab.
+        state.scores = state.scores[-1:].copy()
+        return state
+
+    def _remember(self, key: str, state) -> None:
+        with self._lock:
+            self._states[key] = state
+            self._states.move_to_end(key)
+            while len(self._states) > self.ram_entries:
+                self._states.popitem(last=False)
+
+    def _path(self, model: str, joint: str, key: str = "*") -> str:
+        slug = model.replace('/', '--')
+        return os.path.join(self.cache_dir, f"{slug}.{joint}.{key}.kvstate")
+
+    def _read(self, model: str, joint: str, key: str):
+        if not self.cache_dir:
+            return None
+        path = self._path(model, joint, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            debug_print(f"Discarding unreadable prefix state {path}: {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def _write(self, model: str, joint: str, key: str, state) -> None:
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # A joint keeps one state per model: drop states of earlier prompt versions
+            for stale in glob.glob(self._path(model, joint)):
+                os.remove(stale)
+            path = self._path(model, joint, key)
+            with open(path + ".tmp", 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + ".tmp", path)
+        except Exception as e:
+            debug_print(f"Failed to persist prefix state for {joint}: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+_shared_cache: Optional[PrefixStateCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_prefix_cache() -> PrefixStateCache:
+    """Process-wide instance, configured from config."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = PrefixStateCache(
+                cache_dir=config.JOINT_PREFIX_CACHE_DIR if config.JOINT_PREFIX_CACHE_DISK else None,
+                ram_entries=config.JOINT_PREFIX_CACHE_RAM_ENTRIES,
+            )
+        return _shared_cache
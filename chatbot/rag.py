@@ -11,27 +11,45 @@ Handles indexing, retrieval, and context generation for the chatbot.
 
 import os
 import sys
-import pickle
 import numpy as np
 import time
-from typing import List, Dict, Optional, Tuple, Set
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, List, Dict, Optional, Tuple, Set
 
 try:
     import faiss
     from sentence_transformers import SentenceTransformer
-    from rank_bm25 import BM25Okapi
 except ImportError:
     # Zero-Index mode doesn't strictly require these if we aren't using them
     # but we keep imports for compatibility or future re-enablement
     faiss = None
     SentenceTransformer = None
-    BM25Okapi = None
 
 import libzim
 
 from chatbot import config
 from chatbot.debug_utils import debug_print
 from chatbot.text_processing import TextProcessor
+from chatbot.archive_pool import ArchivePool
+from chatbot.encoder_service import EncoderService
+from chatbot.article_cache import get_article_cache, article_key, LEAD
+from chatbot.fulltext_search import search_archive
+from chatbot.title_cache import TitleResolutionCache, MISS
+from chatbot.title_bloom import TitleBloomFilter
+from chatbot.title_hash_index import TitleHashIndex
+from chatbot.title_index_builder import TitleIndexBuilder
+from chatbot.title_shards import TitleShardStore, TitleShardSet
+from chatbot.title_ann import INDEX_TYPES
+from chatbot.redirect_table import RedirectTable
+from chatbot.lexical_index import LexicalIndex
+from chatbot.zim_utils import archive_fingerprint, entry_by_index, follow_redirects
+
+# How often _fan_out_resolve looks for queued probes that have started (and so have a deadline)
+PROBE_START_POLL_S = 0.05
+
 
 class RAGSystem:
     def __init__(self, index_dir: str = "data/indices", zim_path: str = None, zim_paths: List[str] = None, load_existing: bool = True):
@@ -43,8 +61,17 @@ class RAGSystem:
         # Discover all ZIM files and maintain lazy-loaded archive cache
         import glob
         self.zim_paths: List[str] = []
-        self.zim_archives: Dict[str, any] = {}  # Lazy cache: {path: Archive}
-        
+        self.archive_pool = ArchivePool(config.ZIM_MAX_OPEN_ARCHIVES, on_open=self._on_archive_open, on_evict=self._on_archive_evict)
+        self.zim_fingerprints: Dict[str, str] = {}  # {path: "uuid:checksum"}
+        self.title_hash_indexes: Dict[str, Optional[TitleHashIndex]] = {}  # mmap'd sidecars from `hermit index-titles`
+        self.redirect_tables: Dict[str, Optional[RedirectTable]] = {}       # Flattened redirect chains (same step)
+        self.lexical_indexes: Dict[str, Optional[LexicalIndex]] = {}        # BM25 over titles + leads (same step)
+        self._probe_executor = None  # Shared pool for parallel archive probes
+        self._async_executor = None  # Bounded pool behind aretrieve()
+        self._encoder_service = None  # Batched, cached query embeddings over self.encoder
+        self._executor_lock = threading.Lock()
+        self.last_probe_timings: Dict[str, Dict[str, float]] = {}
+
         # Priority: explicit zim_paths > explicit zim_path > auto-discover
         if zim_paths:
             self.zim_paths = [os.path.abspath(p) for p in zim_paths]
@@ -61,7 +88,14 @@ class RAGSystem:
                 print(f"  - {os.path.basename(zp)}")
         else:
             print("Warning: No ZIM files found.")
-        
+
+        # Title bloom filters route candidates without opening archives (see `hermit index-titles`)
+        self.title_blooms: Dict[str, Optional[TitleBloomFilter]] = {zp: TitleBloomFilter.load(zp) for zp in self.zim_paths}
+        bloom_count = sum(1 for bloom in self.title_blooms.values() if bloom is not None)
+        if bloom_count:
+            bloom_mb = sum(bloom.nbytes for bloom in self.title_blooms.values() if bloom is not None) / 1e6
+            debug_print(f"Title bloom filters: {bloom_count}/{len(self.zim_paths)} archives ({bloom_mb:.1f} MB)")
+
         # Legacy compatibility
         self.zim_path = self.zim_paths[0] if self.zim_paths else None
         self.zim_archive = None  # Deprecated, use get_zim_archive()
@@ -76,21 +110,32 @@ class RAGSystem:
         self._next_doc_id = 0
         self._chunk_id = 0     # Global chunk ID counter
         
-        self.bm25 = None
-        self.tokenized_corpus = [] # For BM25
-        
-        # Title Indices (Pre-computed, UNIFIED across all ZIMs)
-        self.title_faiss_index = None
-        self.title_metadata = None  # List[{title, path, source_zim}]
+        # Semantic title index: one shard per archive, merged at query time.
+        # Loaded in the background; search_by_title uses it once title_index_ready is set.
+        self.title_shards: Optional[TitleShardSet] = None
+        self.title_index_ready = threading.Event()
         
         # Paths
         os.makedirs(index_dir, exist_ok=True)
         self.faiss_path = os.path.join(index_dir, "content_index.faiss")
         self.meta_path = os.path.join(index_dir, "content_meta.pkl")
-        self.bm25_path = os.path.join(index_dir, "content_bm25.pkl")
-        
-        self.title_faiss_path = os.path.join(index_dir, "title_index.faiss")
-        self.title_meta_path = os.path.join(index_dir, "title_meta.pkl")
+        self.title_shard_store = TitleShardStore(index_dir)
+
+        # Persistent title -> entry resolution cache (hits and misses)
+        self.title_cache = None
+        if config.TITLE_CACHE_ENABLED:
+            try:
+                self.title_cache = TitleResolutionCache(os.path.join(index_dir, "title_cache.sqlite"))
+            except Exception as e:
+                print(f"Title cache unavailable: {e}")
+
+        # Open archives in the background so the first query doesn't pay for it,
+        # then drop cached resolutions of archives that were removed or replaced
+        if config.ZIM_PREOPEN and self.zim_paths:
+            self.archive_pool.preopen(self.zim_paths, then=self._prune_title_cache)
+
+        # Cleaned article text shared with the multi-hop resolver and article viewers
+        self.article_cache = get_article_cache()
 
         # Initialize SentenceTransformer early (lazy load usually, but we need it for everything)
         try:
@@ -112,9 +157,12 @@ class RAGSystem:
         self.use_joints = config.USE_JOINTS
         # We will reuse the EntityExtractor logic but specifically prompt for TITLES
         
-        # Load Existing Content Indices - DEPRECATED / DISABLED for Zero-Index Mode
-        # The whole point is to NOT need these.
-        print("Zero-Index Mode: Skipping index loading.")
+        # Content indices stay disabled (Zero-Index Mode). Title shards, if any were
+        # built, are mmap'd on a background thread; queries fall back until they're ready.
+        if load_existing and config.TITLE_INDEX_BACKGROUND_LOAD and self.zim_paths:
+            self.load_title_index_async()
+        else:
+            self.title_index_ready.set()
         
         # Initialize Joint System (if enabled)
         if self.use_joints:
@@ -137,7 +185,8 @@ class RAGSystem:
     def _generate_candidate_titles(self, query: str) -> List[str]:
         """
         [ZERO-INDEX CORE]
-        Asks the LLM to generate valid Wikipedia/ZIM article titles.
+        Generates valid Wikipedia/ZIM article titles: nearest titles from the title
+        index when one is loaded and close enough, otherwise asks the LLM.
         Tries smart model first, falls back to fast model if loading fails.
         """
         from chatbot import config
@@ -169,8 +218,50 @@ class RAGSystem:
         for q in quotes:
             proper_nouns.append(q.replace(' ', '_'))
 
-        # 2. LLM GENERATION
+        # 2. SEMANTIC FAST PATH
+        # Nearest titles from the title index; the LLM is only asked when none is close enough
+        semantic = self._semantic_candidate_titles(query)
+        if semantic:
+            heuristic = [query.replace(" ", "_"), query.title().replace(" ", "_")] + proper_nouns
+            final_titles = list(dict.fromkeys(t for t in semantic + heuristic if t and len(t) >= 3))
+            debug_print(f"Title Candidates (semantic): {final_titles}")
+            return final_titles
+
+        # 3. LLM GENERATION
         # Try smart model first, fall back to fast model
+        with ModelManager.inference_lock:
+            return self._llm_candidate_titles(query, proper_nouns)
+
+    def _semantic_candidate_titles(self, query: str) -> List[str]:
+        """
+        Title index neighbours of the query scoring at least SEMANTIC_CANDIDATE_MIN_SCORE,
+        best first. Empty when the index is missing, still loading, or nothing is close.
+        """
+        if not config.SEMANTIC_CANDIDATES_ENABLED or not self.title_shards or not self.encoder:
+            return []
+        try:
+            hits = self.title_shards.search(self._embed_query(query), config.SEMANTIC_CANDIDATE_COUNT)
+        except Exception as e:
+            debug_print(f"Semantic candidate search failed: {e}")
+            return []
+        best = hits[0][0] if hits else 0.0
+        if best < config.SEMANTIC_CANDIDATE_MIN_SCORE:
+            debug_print(f"Semantic candidates below threshold ({best:.2f}), asking the LLM")
+            return []
+        titles = []
+        for score, _, meta in hits:
+            if score < config.SEMANTIC_CANDIDATE_MIN_SCORE:
+                break
+            path = meta['path']
+            titles.append(path[2:] if path.startswith("A/") else path)
+        return titles
+
+    def _llm_candidate_titles(self, query: str, proper_nouns: List[str]) -> List[str]:
+        """LLM half of _generate_candidate_titles (caller holds ModelManager.inference_lock)."""
+        import string
+        import re
+        from chatbot.model_manager import ModelManager
+
         llm = None
         for model_name in [config.DEFAULT_MODEL, config.ENTITY_JOINT_MODEL]:
             try:
@@ -279,29 +370,441 @@ class RAGSystem:
 
     def get_zim_archive(self, zim_path: str):
         """
-        Get ZIM archive handle with lazy loading and caching.
-        This prevents repeated archive opens which are expensive (~100-500ms each).
+        Get ZIM archive handle from the pool (opened on first use, LRU-evicted
+        beyond ZIM_MAX_OPEN_ARCHIVES). Opens are expensive (~100-500ms each).
         """
         if not zim_path:
             return None
-        
-        abs_path = os.path.abspath(zim_path)
-        
-        if abs_path not in self.zim_archives:
-            debug_print(f"Opening ZIM archive (cached): {os.path.basename(abs_path)}")
+        return self.archive_pool.get(os.path.abspath(zim_path))
+
+    def _on_archive_open(self, abs_path: str, archive) -> None:
+        """Load per-archive lookup state when the pool opens an archive."""
+        self.zim_fingerprints[abs_path] = archive_fingerprint(archive)
+        self.title_hash_indexes[abs_path] = TitleHashIndex.load(abs_path, archive)
+        self.redirect_tables[abs_path] = RedirectTable.load(abs_path, archive)
+        self.lexical_indexes[abs_path] = LexicalIndex.load(abs_path, archive)
+
+    def _prune_title_cache(self) -> None:
+        """Delete title cache rows whose archive fingerprint matches none of zim_paths."""
+        if self.title_cache is None:
+            return
+        live = []
+        for zim_path in self.zim_paths:
+            fingerprint = self.zim_fingerprints.get(zim_path)
+            if fingerprint is None:
+                # Beyond the pre-open limit: read the fingerprint without taking a pool slot
+                try:
+                    fingerprint = archive_fingerprint(libzim.Archive(zim_path))
+                except Exception as e:
+                    debug_print(f"Title cache prune skipped, cannot fingerprint {os.path.basename(zim_path)}: {e}")
+                    return
+            live.append(fingerprint)
+        self.title_cache.prune(live)
+
+    def _on_archive_evict(self, abs_path: str) -> None:
+        """Release mmap'd sidecars with the evicted handle (fingerprints are kept, they're tiny)."""
+        if abs_path in self.archive_pool:
+            return  # Re-opened by another worker in the meantime
+        self.title_hash_indexes.pop(abs_path, None)
+        self.redirect_tables.pop(abs_path, None)
+        self.lexical_indexes.pop(abs_path, None)
+
+    def _fan_out_resolve(self, title_guess: str, probe_timings: Dict[str, Dict[str, float]]) -> Optional[Tuple[any, str, str]]:
+        """
+        Probe every archive for a candidate title in parallel.
+        The first archive to report a hit wins and the remaining probes are
+        cancelled; a probe still running ZIM_PROBE_BUDGET_MS after it started
+        is abandoned (time queued behind other candidates' probes is free).
+        Returns (resolved_entry, matched_path, zim_path) or None.
+        """
+        zim_paths = self._route_candidate(title_guess, probe_timings)
+        if len(zim_paths) <= 1 or config.ZIM_PROBE_WORKERS <= 1:
+            # Nothing to parallelize, probe in order
+            for zim_path in zim_paths:
+                start = time.time()
+                hit = self._probe_zim_path(zim_path, title_guess, None)
+                self._record_probe_timing(probe_timings, zim_path, time.time() - start)
+                if hit:
+                    return hit[0], hit[1], zim_path
+            return None
+
+        executor = self._get_probe_executor()
+        cancel = threading.Event()
+        budget = config.ZIM_PROBE_BUDGET_MS / 1000.0
+        started: Dict[str, float] = {}
+
+        def timed_probe(zim_path: str):
+            start = started[zim_path] = time.time()
+            hit = self._probe_zim_path(zim_path, title_guess, cancel)
+            return zim_path, hit, time.time() - start
+
+        futures = {executor.submit(timed_probe, zp): zp for zp in zim_paths}
+        pending = set(futures)
+        winner = None
+
+        while pending and winner is None:
+            # Budgets run from when a worker picks the probe up: concurrent candidates share
+            # the pool, and time spent queued behind their probes must not count as slowness
+            now = time.time()
+            for future in [f for f in pending if now - started.get(futures[f], now) >= budget]:
+                pending.discard(future)
+                debug_print(f"    Probe budget exceeded in {os.path.basename(futures[future])}")
+                self._record_probe_timing(probe_timings, futures[future], budget, timed_out=True)
+            if not pending:
+                break
+            deadlines = [started[futures[f]] + budget for f in pending if futures[f] in started]
+            if len(deadlines) < len(pending):
+                # Queued probes get their deadline once they start; check back shortly
+                deadlines.append(now + min(budget, PROBE_START_POLL_S))
+            done, pending = wait(pending, timeout=max(0.0, min(deadlines) - now), return_when=FIRST_COMPLETED)
+            # Ties within one wakeup go to the archive listed first
+            for future in sorted(done, key=lambda f: zim_paths.index(futures[f])):
+                try:
+                    zim_path, hit, elapsed = future.result()
+                except Exception as e:
+                    debug_print(f"    Probe failed in {os.path.basename(futures[future])}: {e}")
+                    continue
+                self._record_probe_timing(probe_timings, zim_path, elapsed)
+                if hit and winner is None:
+                    winner = (hit[0], hit[1], zim_path)
+
+        # First hit wins (or every probe finished or ran out of budget): stop everything still in flight
+        cancel.set()
+        for future in pending:
+            future.cancel()
+
+        return winner
+
+    def _get_probe_executor(self) -> ThreadPoolExecutor:
+        """Shared worker pool for per-archive probes and searches."""
+        with self._executor_lock:
+            if self._probe_executor is None:
+                self._probe_executor = ThreadPoolExecutor(
+                    max_workers=config.ZIM_PROBE_WORKERS, thread_name_prefix="zim-probe"
+                )
+            return self._probe_executor
+
+    def _get_encoder_service(self) -> EncoderService:
+        """Shared batching/caching front end for query embeddings."""
+        with self._executor_lock:
+            if self._encoder_service is None or self._encoder_service.encoder is not self.encoder:
+                self._encoder_service = EncoderService(self.encoder)
+            return self._encoder_service
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """L2-normalized 1 x dim embedding of a query (cached, batched with concurrent queries)."""
+        return self._get_encoder_service().embed([query])
+
+    def encoder_stats(self) -> Optional[Dict]:
+        """Query encoder cache/batch summary for status displays (None before the first query)."""
+        service = self._encoder_service
+        return service.stats() if service is not None else None
+
+    def fulltext_search(self, query: str, max_results: int = None) -> List[Dict]:
+        """
+        Query every archive's embedded full-text (or title suggestion) index in
+        parallel and return up to max_results articles. Per-archive rankings are
+        interleaved in zim_paths order; archives slower than FULLTEXT_BUDGET_MS
+        are skipped.
+        """
+        max_results = max_results or config.FULLTEXT_MAX_RESULTS
+        debug_print(f"FULL-TEXT SEARCH: '{query}' (cap {max_results})")
+
+        def search(zim_path: str) -> List[str]:
+            zim = self.get_zim_archive(zim_path)
+            if not zim:
+                return []
+            return search_archive(zim, query, max_results)
+
+        executor = self._get_probe_executor()
+        futures = {executor.submit(search, zp): zp for zp in self.zim_paths}
+        done, pending = wait(futures, timeout=config.FULLTEXT_BUDGET_MS / 1000.0)
+        for future in pending:
+            future.cancel()
+            debug_print(f"  Full-text budget exceeded in {os.path.basename(futures[future])}")
+
+        ranked: Dict[str, List[str]] = {}
+        for future in done:
             try:
-                self.zim_archives[abs_path] = libzim.Archive(abs_path)
+                ranked[futures[future]] = future.result()
             except Exception as e:
-                print(f"Failed to open ZIM: {abs_path}: {e}")
+                debug_print(f"  Full-text search failed in {os.path.basename(futures[future])}: {e}")
+
+        results = []
+        seen_entries = set()
+        depth = max((len(paths) for paths in ranked.values()), default=0)
+        for rank in range(depth):
+            for zim_path in self.zim_paths:
+                paths = ranked.get(zim_path, [])
+                if rank >= len(paths) or len(results) >= max_results:
+                    continue
+                zim = self.get_zim_archive(zim_path)
+                try:
+                    entry = self._resolve_redirect(zim_path, zim, zim.get_entry_by_path(paths[rank]))
+                    if not entry or entry.get_item().mimetype != 'text/html':
+                        continue
+                except Exception:
+                    continue
+                if (zim_path, entry.path) in seen_entries:
+                    continue
+                seen_entries.add((zim_path, entry.path))
+                result = self._build_hit_result(entry, entry.path, zim_path, [query])
+                result['score'] = config.FULLTEXT_RESULT_SCORE
+                result['metadata']['retrieval'] = 'fulltext'
+                results.append(result)
+
+        debug_print(f"Full-text search found {len(results)} articles.")
+        return results
+
+    def lexical_search(self, query: str, max_results: int = None) -> List[Dict]:
+        """
+        BM25 search over the archives' lexical sidecars (titles + lead paragraphs),
+        in parallel. Hits from all archives are merged by BM25 score. Archives
+        without a sidecar are skipped.
+        """
+        max_results = max_results or config.LEXICAL_MAX_RESULTS
+        start = time.time()
+
+        def search(zim_path: str) -> List[Tuple[float, str, int]]:
+            if self.get_zim_archive(zim_path) is None:
+                return []
+            lexical = self.lexical_indexes.get(zim_path)
+            if lexical is None:
+                return []
+            return [(score, zim_path, entry_idx) for entry_idx, score in lexical.search(query, max_results)]
+
+        executor = self._get_probe_executor()
+        hits = []
+        for ranked in executor.map(search, self.zim_paths):
+            hits.extend(ranked)
+        hits.sort(key=lambda hit: -hit[0])
+
+        results = []
+        seen_entries = set()
+        for bm25, zim_path, entry_idx in hits:
+            if len(results) >= max_results:
+                break
+            zim = self.get_zim_archive(zim_path)
+            try:
+                entry = entry_by_index(zim, entry_idx)
+            except Exception:
+                continue
+            if (zim_path, entry.path) in seen_entries:
+                continue
+            seen_entries.add((zim_path, entry.path))
+            result = self._build_hit_result(entry, entry.path, zim_path, [query])
+            result['score'] = config.LEXICAL_RESULT_SCORE
+            result['metadata']['retrieval'] = 'lexical'
+            result['metadata']['bm25'] = bm25
+            results.append(result)
+
+        debug_print(f"Lexical search found {len(results)} articles ({(time.time() - start) * 1000:.1f} ms)")
+        return results
+
+    def _probe_zim_path(self, zim_path: str, title_guess: str, cancel: Optional[threading.Event]) -> Optional[Tuple[any, str]]:
+        """Open (if needed) and resolve a title in a single archive."""
+        if cancel is not None and cancel.is_set():
+            return None
+        zim = self.get_zim_archive(zim_path)
+        if not zim:
+            return None
+        return self._resolve_title(zim_path, zim, title_guess, cancel)
+
+    def _route_candidate(self, title_guess: str, probe_timings: Dict[str, Dict[str, float]]) -> List[str]:
+        """Archives that may contain a title; bloom filter negatives are skipped without opening them."""
+        routed = []
+        for zim_path in self.zim_paths:
+            bloom = self.title_blooms.get(zim_path)
+            if bloom is not None and not bloom.may_contain(title_guess):
+                stats = probe_timings.setdefault(zim_path, {"probes": 0, "total_ms": 0.0, "max_ms": 0.0, "timeouts": 0})
+                stats["skipped"] = stats.get("skipped", 0) + 1
+                continue
+            routed.append(zim_path)
+        return routed
+
+    @staticmethod
+    def _record_probe_timing(probe_timings: Dict[str, Dict[str, float]], zim_path: str, elapsed: float, timed_out: bool = False) -> None:
+        stats = probe_timings.setdefault(zim_path, {"probes": 0, "total_ms": 0.0, "max_ms": 0.0, "timeouts": 0})
+        stats["probes"] += 1
+        stats["total_ms"] += elapsed * 1000
+        stats["max_ms"] = max(stats["max_ms"], elapsed * 1000)
+        if timed_out:
+            stats["timeouts"] += 1
+
+    def _report_probe_timings(self, probe_timings: Dict[str, Dict[str, float]]) -> None:
+        """Log per-archive probe latency for the last retrieval."""
+        self.last_probe_timings = probe_timings
+        if not probe_timings:
+            return
+        debug_print("Per-archive probe timings:")
+        for zim_path, stats in sorted(probe_timings.items(), key=lambda kv: -kv[1]["total_ms"]):
+            debug_print(
+                f"  {os.path.basename(zim_path)}: {stats['probes']} probes, "
+                f"total {stats['total_ms']:.1f}ms, max {stats['max_ms']:.1f}ms, "
+                f"{stats['timeouts']} over budget, {stats.get('skipped', 0)} skipped by bloom filter"
+            )
+
+    def _resolve_title(self, zim_path: str, zim, title_guess: str, cancel: Optional[threading.Event] = None) -> Optional[Tuple[any, str]]:
+        """
+        Resolve a candidate title in one archive, consulting the persistent
+        title cache first. Returns (resolved_entry, matched_path) or None.
+        """
+        archive_key = self.zim_fingerprints.get(zim_path)
+        use_cache = self.title_cache is not None and archive_key is not None
+
+        if use_cache:
+            cached = self.title_cache.get(archive_key, title_guess)
+            if cached is MISS:
                 return None
-        
-        return self.zim_archives[abs_path]
+            if cached:
+                matched_path, resolved_path = cached
+                try:
+                    entry = zim.get_entry_by_path(resolved_path)
+                    debug_print(f"  CACHED: '{title_guess}' -> {resolved_path}")
+                    return entry, matched_path
+                except Exception:
+                    pass  # Stale row, re-probe below
+
+        hit = self._probe_archive(zim_path, zim, title_guess, cancel)
+
+        # A cancelled probe is inconclusive, don't record it as a miss
+        if use_cache and not (cancel is not None and cancel.is_set()):
+            if hit:
+                self.title_cache.put_hit(archive_key, title_guess, hit[1], hit[0].path)
+            else:
+                self.title_cache.put_miss(archive_key, title_guess)
+        return hit
+
+    def _probe_archive(self, zim_path: str, zim, title_guess: str, cancel: Optional[threading.Event] = None) -> Optional[Tuple[any, str]]:
+        """
+        Probe one archive for a candidate title using path variations, then
+        title lookup for Wikipedia ZIMs. Returns (resolved_entry, matched_path)
+        for the first HTML article found, or None. Stops early once cancel is set.
+        """
+        # Fast path: normalized title hash index resolves every spelling in one lookup
+        title_index = self.title_hash_indexes.get(zim_path)
+        if title_index is not None:
+            entry = title_index.find_entry(zim, title_guess)
+            if entry is None:
+                return None
+            matched_path = entry.path
+            entry = self._resolve_redirect(zim_path, zim, entry)
+            if entry is not None and entry.get_item().mimetype == 'text/html':
+                return entry, matched_path
+            return None
+
+        # Try variations to find a hit (modern ZIMs often omit A/ prefix)
+        base_title = title_guess.replace(' ', '_')
+        variations = [
+            base_title,                             # As-is: photosynthesis
+            base_title.capitalize(),                # Cap: Photosynthesis
+            base_title.title(),                     # Title: Photosynthesis
+            f"A/{base_title}",
+            f"A/{base_title.capitalize()}",
+            title_guess,
+            f"A/{title_guess}",
+        ]
+
+        for path_var in variations:
+            if cancel is not None and cancel.is_set():
+                return None
+            try:
+                entry = zim.get_entry_by_path(path_var)
+                if entry:
+                    # Resolve Redirects
+                    if entry.is_redirect:
+                        try:
+                            entry = self._resolve_redirect(zim_path, zim, entry)
+                            if not entry:
+                                continue
+                            debug_print(f"    Resolved redirect to: {entry.path}")
+                        except Exception as e:
+                            debug_print(f"    Failed to resolve redirect: {e}")
+                            continue
+
+                    # Process Resolved Entry
+                    if not entry.is_redirect:
+                        item = entry.get_item()
+                        debug_print(f"    Mimetype: {item.mimetype}")
+                        if item.mimetype == 'text/html':
+                            return entry, path_var
+            except Exception:
+                # Misses raise KeyError; expected for most variations
+                pass
+
+        # Fallback: Try get_entry_by_title if path lookup failed
+        if 'wikipedia' in os.path.basename(zim_path).lower() and not (cancel is not None and cancel.is_set()):
+            try:
+                entry = zim.get_entry_by_title(title_guess)
+
+                # Resolve Redirects (Title lookup)
+                if entry and entry.is_redirect:
+                     try:
+                         entry = self._resolve_redirect(zim_path, zim, entry)
+                     except:
+                         pass
+
+                if entry and not entry.is_redirect:
+                    item = entry.get_item()
+                    if item.mimetype == 'text/html':
+                        return entry, entry.path
+            except:
+                pass
+
+        return None
+
+    def _resolve_redirect(self, zim_path: str, zim, entry):
+        """
+        Resolve a redirect to its final entry. Uses the precomputed redirect
+        table (one lookup) when available, otherwise follows the chain.
+        Returns None for dangling or looping redirects.
+        """
+        redirect_table = self.redirect_tables.get(zim_path)
+        if redirect_table is not None:
+            return redirect_table.resolve(zim, entry)
+        return follow_redirects(entry)
+
+    def _article_text(self, zim_path: str, entry) -> Tuple[str, Optional[Tuple]]:
+        """
+        Cleaned lead text for an entry, served from the shared article cache.
+        Returns (text, cache key); the key is None if the archive has no fingerprint.
+        """
+        def load() -> str:
+            # Bounded, lead-first extraction straight off the item's buffer (no copy/decode of the whole article)
+            return TextProcessor.extract_lead_text(entry.get_item().content, config.ARTICLE_TEXT_CHARS)
+
+        archive_id = self.zim_fingerprints.get(zim_path)
+        if archive_id is None:
+            return load(), None
+        key = article_key(archive_id, entry, LEAD)
+        return self.article_cache.get_or_load(key, load), key
+
+    def _build_hit_result(self, entry, matched_path: str, zim_path: str, candidates: List[str]) -> Dict:
+        """Extract and clean article text for a resolved entry."""
+        text_content, key = self._article_text(zim_path, entry)
+
+        debug_print(f"  HIT: '{entry.title}' in {os.path.basename(zim_path)}")
+        return {
+            'text': text_content,
+            'metadata': {
+                'title': entry.title,
+                'path': matched_path,
+                'source_zim': zim_path,
+                'article_key': key
+            },
+            'score': 10.0,
+            'search_context': {'entities': candidates}
+        }
 
     # ===================================================================
     # DYNAMIC ORCHESTRATION METHODS
     # ===================================================================
     
     def retrieve_with_orchestration(self, query: str, top_k: int = 5) -> List[Dict]:
+        """Synchronous wrapper around aretrieve_with_orchestration()."""
+        return self._run_sync(self.aretrieve_with_orchestration(query, top_k))
+
+    async def aretrieve_with_orchestration(self, query: str, top_k: int = 5) -> List[Dict]:
         """
         Dynamic orchestration-based retrieval with signal-driven decision making.
         Uses HermitContext to track state and apply gear-shifting logic.
@@ -328,20 +831,9 @@ class RAGSystem:
             ctx.log(f"▶ Executing step: {step}")
             
             # Dispatch to appropriate handler
-            if step == "extract":
-                self._orchestrate_extract(ctx)
-            elif step == "resolve":
-                self._orchestrate_resolve(ctx)
-            elif step == "search":
-                self._orchestrate_search(ctx)
-            elif step == "score":
-                self._orchestrate_score(ctx)
-            elif step == "verify":
-                self._orchestrate_verify(ctx)
-            elif step == "expand":
-                self._orchestrate_expand(ctx)
-            elif step == "targeted_search":
-                 self._orchestrate_targeted(ctx)
+            handler = self._orchestration_steps().get(step)
+            if handler:
+                await handler(ctx)
             else:
                 ctx.log(f"⚠ Unknown step '{step}', skipping")
                 
@@ -370,6 +862,33 @@ class RAGSystem:
         
         return ctx.retrieved_data[:top_k]
     
+    def _orchestration_steps(self) -> Dict[str, Callable]:
+        """Async handler for each orchestration step name."""
+        return {
+            "extract": self._aorchestrate_extract,
+            "resolve": self._aorchestrate_resolve,
+            "search": self._aorchestrate_search,
+            "fulltext": self._aorchestrate_fulltext,
+            "score": self._aorchestrate_score,
+            "verify": self._aorchestrate_verify,
+            "expand": self._aorchestrate_expand,
+            "targeted_search": self._aorchestrate_targeted,
+        }
+
+    # Steps without nested retrieval run their blocking body on the bounded executor
+
+    async def _aorchestrate_extract(self, ctx) -> None:
+        await self._run_blocking(self._orchestrate_extract, ctx)
+
+    async def _aorchestrate_fulltext(self, ctx) -> None:
+        await self._run_blocking(self._orchestrate_fulltext, ctx)
+
+    async def _aorchestrate_score(self, ctx) -> None:
+        await self._run_blocking(self._orchestrate_score, ctx)
+
+    async def _aorchestrate_verify(self, ctx) -> None:
+        await self._run_blocking(self._orchestrate_verify, ctx)
+
     def _orchestrate_extract(self, ctx) -> None:
         """Extract entities from query andupdate ambiguity score."""
         if not self.use_joints or not hasattr(self, 'entity_joint'):
@@ -398,7 +917,7 @@ class RAGSystem:
             ctx.log(f"  ⚠ Entity extraction failed: {e}")
             ctx.signals["ambiguity_score"] = 0.5
 
-    def _orchestrate_resolve(self, ctx) -> None:
+    async def _aorchestrate_resolve(self, ctx) -> None:
         """Resolve indirect entity references using multi-hop resolution."""
         if not self.use_joints or not hasattr(self, 'resolver_joint'):
             ctx.log("⚠ Multi-hop resolver not available")
@@ -410,7 +929,8 @@ class RAGSystem:
             
         try:
             entities = ctx.extracted_entities.get('entities', [])
-            resolution = self.resolver_joint.process(
+            resolution = await self._run_blocking(
+                self.resolver_joint.process,
                 ctx.original_query,
                 entities,
                 ctx.retrieved_data
@@ -428,46 +948,64 @@ class RAGSystem:
                 ctx.iteration_results['multi_hop_searches'] = search_terms
                 
                 # Inject search for resolved entity
-                old_flag = config.USE_ORCHESTRATION
-                config.USE_ORCHESTRATION = False
-                
                 for term in search_terms[:2]:  # Try top 2 variations
-                    results = self.retrieve(term, top_k=3)
+                    results = await self._aretrieve_direct(term, top_k=3)
                     if results:
                         ctx.retrieved_data.extend(results)
                         ctx.log(f"  Retrieved {len(results)} articles for '{term}'")
                         break
-                
-                config.USE_ORCHESTRATION = old_flag
             else:
                 ctx.log("  No indirect references detected")
                 
         except Exception as e:
             ctx.log(f"  ⚠ Multi-hop resolution failed: {e}")
 
-    def _orchestrate_search(self, ctx) -> None:
-        """Execute title-based search using existing retrieval."""
+    async def _aorchestrate_search(self, ctx) -> None:
+        """Execute title-based search using existing retrieval, with lexical search alongside."""
         try:
-            # Use existing retrieve() but with orchestration disabled to avoid recursion
-            old_flag = config.USE_ORCHESTRATION
-            config.USE_ORCHESTRATION = False
-            
-            results = self.retrieve(ctx.original_query, top_k=10)
-            
-            config.USE_ORCHESTRATION = old_flag
+            title_search = self._aretrieve_direct(ctx.original_query, top_k=10)
+            if config.ENABLE_LEXICAL_SEARCH:
+                results, lexical = await asyncio.gather(
+                    title_search, self._run_blocking(self.lexical_search, ctx.original_query),
+                    return_exceptions=True
+                )
+                if isinstance(results, BaseException):
+                    raise results
+                # Lexical hits are a supplement: a failed lexical search must not cost the title hits
+                if isinstance(lexical, BaseException):
+                    ctx.log(f"  ⚠ Lexical search failed: {lexical}")
+                    lexical = []
+            else:
+                results, lexical = await title_search, []
+            ctx.iteration_results['title_search_hits'] = len(results)
             
-            # Merge new results with existing (avoid duplicates)
+            # Merge new results with existing (avoid duplicates); title hits rank ahead of lexical ones
             existing_titles = {r.get('metadata', {}).get('title') for r in ctx.retrieved_data}
-            for result in results:
+            for result in results + lexical:
                 title = result.get('metadata', {}).get('title')
                 if title not in existing_titles:
                     ctx.retrieved_data.append(result)
+                    existing_titles.add(title)
                     
-            ctx.log(f"  Retrieved {len(results)} articles")
+            ctx.log(f"  Retrieved {len(results)} articles ({len(lexical)} lexical)")
             
         except Exception as e:
             ctx.log(f"  ⚠ Search failed: {e}")
 
+    def _orchestrate_fulltext(self, ctx) -> None:
+        """Search the archives' embedded full-text indexes (no model calls)."""
+        try:
+            results = self.fulltext_search(ctx.original_query)
+            existing_titles = {r.get('metadata', {}).get('title') for r in ctx.retrieved_data}
+            added = 0
+            for result in results:
+                if result['metadata']['title'] not in existing_titles:
+                    ctx.retrieved_data.append(result)
+                    added += 1
+            ctx.log(f"  Full-text search added {added} articles")
+        except Exception as e:
+            ctx.log(f"  ⚠ Full-text search failed: {e}")
+
     def _orchestrate_score(self, ctx) -> None:
         """Score retrieved articles and update highest_source_score signal."""
         if not self.use_joints or not hasattr(self, 'scorer_joint'):
@@ -548,7 +1086,7 @@ class RAGSystem:
             ctx.log(f"  ⚠ Coverage verification failed: {e}")
             ctx.signals["coverage_ratio"] = 0.5
 
-    def _orchestrate_expand(self, ctx) -> None:
+    async def _aorchestrate_expand(self, ctx) -> None:
         """Generate query expansions when initial results are poor."""
         if not hasattr(self, 'entity_joint'):
             ctx.log("  ⚠ Query expansion not available")
@@ -556,26 +1094,22 @@ class RAGSystem:
             
         try:
             failed_terms = [ctx.original_query]
-            expansions = self.entity_joint.suggest_expansion(ctx.original_query, failed_terms)
+            expansions = await self._run_blocking(self.entity_joint.suggest_expansion, ctx.original_query, failed_terms)
             
             if expansions:
-                # Search for each expansion
-                old_flag = config.USE_ORCHESTRATION
-                config.USE_ORCHESTRATION = False
-                
-                for term in expansions[:3]:  # Limit to 3 expansions
-                    results = self.retrieve(term, top_k=3)
+                # Search for each expansion concurrently, merge in suggestion order
+                terms = expansions[:3]  # Limit to 3 expansions
+                for results in await asyncio.gather(*(self._aretrieve_direct(term, top_k=3) for term in terms)):
                     ctx.retrieved_data.extend(results)
                     
-                config.USE_ORCHESTRATION = old_flag
-                ctx.log(f"  Expanded search with {len(expansions[:3])} alternative queries")
+                ctx.log(f"  Expanded search with {len(terms)} alternative queries")
             else:
                 ctx.log("  No expansions generated")
                 
         except Exception as e:
             ctx.log(f"  ⚠ Query expansion failed: {e}")
 
-    def _orchestrate_targeted(self, ctx) -> None:
+    async def _aorchestrate_targeted(self, ctx) -> None:
         """Search for specific missing entities."""
         missing = ctx.iteration_results.get('missing_entities', [])
         suggested = ctx.iteration_results.get('suggested_searches', [])
@@ -585,17 +1119,12 @@ class RAGSystem:
             return
             
         try:
-            old_flag = config.USE_ORCHESTRATION
-            config.USE_ORCHESTRATION = False
-            
             # Use suggested searches if available, otherwise use entity names
             search_terms = suggested[:5] if suggested else missing[:3]
             
-            for term in search_terms:
-                results = self.retrieve(term, top_k=2)
+            for results in await asyncio.gather(*(self._aretrieve_direct(term, top_k=2) for term in search_terms)):
                 ctx.retrieved_data.extend(results)
                 
-            config.USE_ORCHESTRATION = old_flag
             ctx.log(f"  Targeted search for {len(search_terms)} missing entities")
             
         except Exception as e:
@@ -617,6 +1146,15 @@ class RAGSystem:
             ctx.iteration_results['multi_hop_attempted'] = True
             ctx.log(f"  🔄 GEAR 1.5: High ambiguity ({ctx.signals['ambiguity_score']:.2f}), adding multi-hop resolution")
 
+        # Gear 1.75: Every title candidate missed → archive full-text search,
+        # which is cheap and runs before any LLM-driven expansion
+        if (config.ENABLE_FULLTEXT_FALLBACK
+            and ctx.iteration_results.get('title_search_hits') == 0
+            and not ctx.iteration_results.get('fulltext_attempted')):
+            ctx.add_step("fulltext", priority="high")
+            ctx.iteration_results['fulltext_attempted'] = True
+            ctx.log("  🔄 GEAR 1.75: No title matches, adding full-text search")
+
         # Gear 2: Low source scores → expand query
         if (ctx.signals.get("highest_source_score", 0) < config.MIN_SOURCE_SCORE_THRESHOLD 
             and "expand" not in ctx.current_plan 
@@ -638,16 +1176,19 @@ class RAGSystem:
     # ===================================================================
 
 
-    def build_index(self, zim_path: str = None, zim_paths: List[str] = None, limit: int = None, batch_size: int = 1000):
+    def build_index(self, zim_path: str = None, zim_paths: List[str] = None, limit: int = None, batch_size: int = 1000, rebuild: bool = False, index_type: str = None):
         """
-        Build UNIFIED Semantic Title Index from one or more ZIM files.
-        Each title entry stores its source_zim for retrieval routing.
+        Build the Semantic Title Index shards for one or more ZIM files.
+        Each archive gets its own shard (keyed by ZIM UUID); archives that
+        already have one are skipped, so adding a ZIM only indexes that ZIM.
         
         Args:
             zim_path: Single ZIM path (legacy, for backwards compat)
             zim_paths: List of ZIM paths (preferred for multi-ZIM)
             limit: Max titles per ZIM (None = all)
             batch_size: Embedding batch size
+            rebuild: Re-index archives that already have a shard
+            index_type: Shard index type (flat, sq8, hnsw, ivfpq); defaults to config.TITLE_INDEX_TYPE
         """
         import torch
         device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -668,99 +1209,105 @@ class RAGSystem:
         if not paths_to_index:
             print("Error: No ZIM files to index.")
             return
+
+        zim_uuids = self._zim_uuids(paths_to_index)
+        if paths_to_index is self.zim_paths:
+            # Indexing the whole library: shards of removed/replaced archives go too
+            for uuid in self.title_shard_store.prune(zim_uuids.values()):
+                print(f"Removed title shard of missing archive: {uuid}")
+        pending = [zp for zp in paths_to_index if rebuild or not self.title_shard_store.has_shard(zim_uuids.get(zp, ""))]
+        for zp in paths_to_index:
+            if zp not in pending:
+                print(f"Title shard up to date: {os.path.basename(zp)}")
         
         print(f"\n{'='*60}")
-        print(f"BUILDING UNIFIED TITLE INDEX FOR {len(paths_to_index)} ZIM FILE(S)")
+        print(f"BUILDING TITLE INDEX SHARDS FOR {len(pending)} OF {len(paths_to_index)} ZIM FILE(S)")
         print(f"{'='*60}")
-            
-        # Initialize UNIFIED Title FAISS
-        self.title_faiss_index = faiss.IndexFlatIP(384)
-        self.title_metadata = []
-        
+
+        # Scan/encode/checkpoint pipeline; re-running after an interruption resumes
+        builder = TitleIndexBuilder(self.encoder, self.index_dir, batch_size=batch_size, index_type=index_type)
         total_indexed = 0
-        
-        for zim_file in paths_to_index:
-            zim_name = os.path.basename(zim_file)
-            print(f"\nScanning: {zim_name}")
-            
-            try:
-                zim = libzim.Archive(zim_file)
-            except Exception as e:
-                print(f"  ERROR: Failed to open {zim_name}: {e}")
-                continue
-            
-            total_entries = zim.entry_count
-            print(f"  Total entries: {total_entries}")
-            
-            zim_limit = limit if limit else total_entries
-            
-            titles = []
-            paths = []
-            source_zims = []
-            
-            count = 0
-            for i in range(total_entries):
-                if count >= zim_limit:
-                    break
-                    
-                entry = zim.get_entry_by_index(i)
-                # Filter for articles in namespace 'A'
-                if entry.path.startswith("A/"):
-                    titles.append(entry.title)
-                    paths.append(entry.path)
-                    source_zims.append(zim_file)  # Tag with source!
-                    
-                    # Batch processing
-                    if len(titles) >= batch_size:
-                        embeddings = self.encoder.encode(titles)
-                        faiss.normalize_L2(embeddings)
-                        self.title_faiss_index.add(embeddings)
-                        
-                        # Store meta WITH source_zim
-                        for j, title in enumerate(titles):
-                             self.title_metadata.append({
-                                 'title': title,
-                                 'path': paths[j],
-                                 'source_zim': source_zims[j]  # Critical for multi-ZIM!
-                             })
-                             
-                        titles = []
-                        paths = []
-                        source_zims = []
-                        print(f"  Indexed {len(self.title_metadata)} titles...")
-                        
-                    count += 1
-            
-            # Final batch for this ZIM
-            if titles:
-                embeddings = self.encoder.encode(titles)
-                faiss.normalize_L2(embeddings)
-                self.title_faiss_index.add(embeddings)
-                for j, title in enumerate(titles):
-                     self.title_metadata.append({
-                         'title': title,
-                         'path': paths[j],
-                         'source_zim': source_zims[j]
-                     })
-            
-            zim_count = count
-            total_indexed += zim_count
-            print(f"  Completed: {zim_count} titles from {zim_name}")
-        
+        for source_zim, uuid, index, rows in builder.build_shards(pending, limit=limit):
+            count = self.title_shard_store.save(uuid, index, rows)
+            total_indexed += count
+            print(f"  Saved title shard {uuid} ({count} titles)")
+
         print(f"\n{'='*60}")
-        print(f"UNIFIED INDEX COMPLETE: {total_indexed} titles from {len(paths_to_index)} ZIM(s)")
+        print(f"TITLE INDEX COMPLETE: {total_indexed} new titles, {len(self.title_shard_store.shard_ids())} shard(s) on disk")
         print(f"{'='*60}")
-        
-        # Save unified indices
-        print("Saving unified indices...")
-        faiss.write_index(self.title_faiss_index, self.title_faiss_path)
-        with open(self.title_meta_path, 'wb') as f:
-            pickle.dump(self.title_metadata, f)
+
+        self.title_shards = self.title_shard_store.load(self._zim_uuids(self.zim_paths))
         print("Done.")
 
+    def load_title_index_async(self) -> threading.Thread:
+        """
+        Load the title shards of all archives on a daemon thread.
+        title_shards is swapped in whole when done, so search_by_title switches
+        from the heuristic fallback to the semantic path without locking.
+        """
+        self.title_index_ready.clear()
+
+        def run():
+            start = time.time()
+            try:
+                if self.title_shard_store.shard_ids():
+                    shards = self.title_shard_store.load(self._zim_uuids(self.zim_paths))
+                    if shards.shards:
+                        self.title_shards = shards
+                        print(f"Title index ready: {len(shards)} titles in {len(shards.shards)} shard(s) ({time.time() - start:.1f}s)")
+            except Exception as e:
+                print(f"Title index unavailable: {e}")
+            finally:
+                self.title_index_ready.set()
+
+        thread = threading.Thread(target=run, name="title-index-load", daemon=True)
+        thread.start()
+        return thread
+
+    def title_index_status(self) -> Dict:
+        """Readiness summary for status displays."""
+        shards = self.title_shards
+        return {
+            'ready': self.title_index_ready.is_set(),
+            'shards': len(shards.shards) if shards else 0,
+            'titles': len(shards) if shards else 0,
+        }
+
+    def report_index_types(self, zim_paths: List[str] = None, kinds: List[str] = None, limit: int = None, k: int = 10):
+        """
+        Print recall@k / latency / size of each title index type against exact
+        (flat) search, per archive. Encoded titles are checkpointed and reused by
+        the next build_index, so running the report first costs no extra encoding.
+        """
+        if not self.encoder:
+            self.encoder = SentenceTransformer(self.model_name, device="cpu")
+        paths = [os.path.abspath(p) for p in zim_paths] if zim_paths else self.zim_paths
+        builder = TitleIndexBuilder(self.encoder, self.index_dir)
+        builder.report(paths, kinds or list(INDEX_TYPES), limit=limit, k=k)
+
+    def remove_index(self, zim_path: str) -> bool:
+        """Delete one archive's title shard and drop it from the loaded set. Returns True if a shard existed."""
+        zim_path = os.path.abspath(zim_path)
+        uuid = self._zim_uuids([zim_path]).get(zim_path)
+        if not uuid or not self.title_shard_store.has_shard(uuid):
+            return False
+        self.title_shard_store.remove(uuid)
+        if self.title_shards is not None:
+            self.title_shards = TitleShardSet([shard for shard in self.title_shards.shards if shard[0] != zim_path])
+        return True
+
+    def _zim_uuids(self, zim_paths: List[str]) -> Dict[str, str]:
+        """{zim_path: archive UUID} for the archives that can be opened."""
+        uuids = {}
+        for zp in zim_paths:
+            zim = self.get_zim_archive(zp)
+            if zim is not None:
+                uuids[zp] = str(zim.uuid)
+        return uuids
+
     def retrieve(self, query: str, top_k: int = 5, mode: str = "FACTUAL", rebound_depth: int = 0, extra_terms: List[str] = None) -> List[Dict]:
         """
-        Main retrieval entry point.
+        Main retrieval entry point (synchronous wrapper around aretrieve()).
         
         If USE_ORCHESTRATION is enabled, delegates to retrieve_with_orchestration()
         for signal-based dynamic processing. Otherwise uses traditional linear pipeline.
@@ -775,128 +1322,69 @@ class RAGSystem:
         Returns:
             List of retrieved documents
         """
+        return self._run_sync(self.aretrieve(query, top_k, mode, rebound_depth, extra_terms))
+
+    async def aretrieve(self, query: str, top_k: int = 5, mode: str = "FACTUAL", rebound_depth: int = 0, extra_terms: List[str] = None) -> List[Dict]:
+        """
+        Async retrieval entry point; same arguments and results as retrieve().
+        Blocking work (LLM calls, archive probes, article extraction) runs on a
+        bounded executor, so many queries can be in flight on one event loop and
+        cancelling the task abandons the remaining steps.
+        """
         # Check if orchestration is enabled
         if config.USE_ORCHESTRATION and not extra_terms and rebound_depth == 0:
             debug_print("🧠 Using ORCHESTRATED retrieval")
-            return self.retrieve_with_orchestration(query, top_k)
+            return await self.aretrieve_with_orchestration(query, top_k)
         
         # Otherwise, use traditional zero-index retrieval
         debug_print("📚 Using TRADITIONAL retrieval")
-        
-        # [Original implementation continues below...]
+        return await self._aretrieve_direct(query, top_k, extra_terms)
+
+    async def _aretrieve_direct(self, query: str, top_k: int = 5, extra_terms: List[str] = None) -> List[Dict]:
+        """Zero-index retrieval: LLM title candidates, shotgun probe, fact refinement."""
         debug_print("-" * 70)
         debug_print(f"ZERO-INDEX RETRIEVAL: '{query}'")
         
         # 1. Generate Candidates
-        candidates = self._generate_candidate_titles(query)
+        candidates = await self._run_blocking(self._generate_candidate_titles, query)
         if extra_terms:
             candidates.extend(extra_terms)
             
-        final_results = []
-        seen_titles = set()
-        
         # 2. Shotgun Search across all ZIMs
+        # Normalize title for display check (simple dedup, first spelling wins), then probe every guess concurrently
+        guesses = []
+        seen_titles = set()
         for title_guess in candidates:
-            # Normalize title for display check (simple dedup)
-            simple_title = title_guess.replace('_', ' ')
-            if simple_title in seen_titles:
-                continue
-            
-            # Try variations to find a hit (modern ZIMs often omit A/ prefix)
-            base_title = title_guess.replace(' ', '_')
-            variations = [
-                base_title,                             # As-is: photosynthesis
-                base_title.capitalize(),                # Cap: Photosynthesis
-                base_title.title(),                     # Title: Photosynthesis
-                f"A/{base_title}",                      
-                f"A/{base_title.capitalize()}",
-                title_guess,
-                f"A/{title_guess}",
-            ]
-            
-            found_hit = False
-            for zim_path in self.zim_paths:
-                zim = self.get_zim_archive(zim_path)
-                if not zim: continue
-                
-                for path_var in variations:
-                    try:
-                        entry = zim.get_entry_by_path(path_var)
-                        if entry:
-                            # Resolve Redirects
-                            if entry.is_redirect:
-                                try:
-                                    entry = entry.get_redirect_entry()
-                                    if not entry:
-                                        continue
-                                    debug_print(f"    Resolved redirect to: {entry.path}")
-                                except Exception as e:
-                                    debug_print(f"    Failed to resolve redirect: {e}")
-                                    continue
-
-                            # Process Resolved Entry
-                            if not entry.is_redirect:
-                                item = entry.get_item()
-                                debug_print(f"    Mimetype: {item.mimetype}")
-                                if item.mimetype == 'text/html':
-                                    content = item.content.tobytes().decode('utf-8', errors='ignore')
-                                    text_content = TextProcessor.clean_text(content)
-                                    
-                                    final_results.append({
-                                        'text': text_content[:6000],
-                                        'metadata': {
-                                            'title': entry.title,
-                                            'path': path_var,
-                                            'source_zim': zim_path
-                                        },
-                                        'score': 10.0,
-                                        'search_context': {'entities': candidates}
-                                    })
-                                    
-                                    seen_titles.add(simple_title)
-                                    debug_print(f"  HIT: '{entry.title}' in {os.path.basename(zim_path)}")
-                                    found_hit = True
-                                    break
-                    except Exception as e:
-                        # Only log for the first few ZIMs to avoid spam
-                        pass
-                
-                # Fallback: Try get_entry_by_title if path lookup failed
-                if not found_hit and 'wikipedia' in os.path.basename(zim_path).lower():
-                    try:
-                        entry = zim.get_entry_by_title(title_guess)
-                        
-                        # Resolve Redirects (Title lookup)
-                        if entry and entry.is_redirect:
-                             try:
-                                 entry = entry.get_redirect_entry()
-                             except:
-                                 pass
-
-                        if entry and not entry.is_redirect:
-                            item = entry.get_item()
-                            if item.mimetype == 'text/html':
-                                content = item.content.tobytes().decode('utf-8', errors='ignore')
-                                text_content = TextProcessor.clean_text(content)
-                                
-                                final_results.append({
-                                    'text': text_content[:6000],
-                                    'metadata': {
-                                        'title': entry.title,
-                                        'path': entry.path,
-                                        'source_zim': zim_path
-                                    },
-                                    'score': 10.0,
-                                    'search_context': {'entities': candidates}
-                                })
-                                
-                                seen_titles.add(simple_title)
-                                debug_print(f"  HIT (by title): '{entry.title}' in {os.path.basename(zim_path)}")
-                                found_hit = True
-                    except:
-                        pass
-                        
-                if found_hit: break
+            normalized = title_guess.replace('_', ' ')
+            if normalized not in seen_titles:
+                seen_titles.add(normalized)
+                guesses.append(title_guess)
+        timings = [{} for _ in guesses]
+        hits = await asyncio.gather(*(
+            self._run_blocking(self._fan_out_resolve, title_guess, timings[n])
+            for n, title_guess in enumerate(guesses)
+        ))
+        
+        # Merge in candidate order; different spellings often land on the same article
+        unique_hits = []
+        seen_entries = set()
+        for hit in hits:
+            if hit:
+                entry, matched_path, zim_path = hit
+                if (zim_path, entry.path) in seen_entries:
+                    continue
+                seen_entries.add((zim_path, entry.path))
+                unique_hits.append(hit)
+        final_results = list(await asyncio.gather(*(
+            self._run_blocking(self._build_hit_result, entry, matched_path, zim_path, candidates)
+            for entry, matched_path, zim_path in unique_hits
+        )))
+        
+        if self.title_cache:
+            self.title_cache.flush()
+            debug_print(f"Title cache: {self.title_cache.stats()}")
+        self._report_probe_timings(self._merge_probe_timings(timings))
+        debug_print(f"Article cache: {self.article_cache.stats()}")
         
         # 3. Sort by relevance order (LLM order + heuristic order) is implicit
         # We assume the first LLM guesses are best.
@@ -907,70 +1395,112 @@ class RAGSystem:
         # If we have joints enabled, run FactRefinement on the top results
         if self.use_joints and self.fact_joint and final_results:
              debug_print(f"[JOINT 4 INPUT] Refining facts for {len(final_results)} results...")
-             for res in final_results[:3]: # Only refine top 3 to save time
-                 try:
-                     facts = self.fact_joint.refine_facts(query, res['text'])
-                     if facts:
-                         res['extracted_facts'] = facts
-                         debug_print(f"[JOINT 4 OUTPUT] Extracted {len(facts)} facts from {res['metadata']['title']}")
-                         # Append facts to text for visibility
-                         facts_str = "\n".join([f"- {f}" for f in facts])
-                         res['text'] = f"*** VERIFIED FACTS ***\n{facts_str}\n\n*** SOURCE CONTENT ***\n{res['text']}"
-                 except Exception as e:
-                     debug_print(f"Joint 4 failed: {e}")
+             # Only refine top 3 to save time; the three prompts are decoded as one batch
+             await self._run_blocking(self._refine_results, query, final_results[:3])
 
         return final_results[:top_k]
 
+    def _refine_results(self, query: str, results: List[Dict]) -> None:
+        """Run FactRefinement on several results at once and prepend the extracted facts to their text."""
+        try:
+            all_facts = self.fact_joint.refine_facts_batch(query, [res['text'] for res in results])
+        except Exception as e:
+            debug_print(f"Joint 4 failed: {e}")
+            return
+        for res, facts in zip(results, all_facts):
+            if facts:
+                res['extracted_facts'] = facts
+                debug_print(f"[JOINT 4 OUTPUT] Extracted {len(facts)} facts from {res['metadata']['title']}")
+                # Append facts to text for visibility
+                facts_str = "\n".join([f"- {f}" for f in facts])
+                res['text'] = f"*** VERIFIED FACTS ***\n{facts_str}\n\n*** SOURCE CONTENT ***\n{res['text']}"
+
+    @staticmethod
+    def _merge_probe_timings(timings: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+        """Combine per-candidate probe timings into per-archive totals."""
+        merged: Dict[str, Dict[str, float]] = {}
+        for probe_timings in timings:
+            for zim_path, stats in probe_timings.items():
+                total = merged.setdefault(zim_path, {"probes": 0, "total_ms": 0.0, "max_ms": 0.0, "timeouts": 0})
+                total["probes"] += stats["probes"]
+                total["total_ms"] += stats["total_ms"]
+                total["max_ms"] = max(total["max_ms"], stats["max_ms"])
+                total["timeouts"] += stats["timeouts"]
+                total["skipped"] = total.get("skipped", 0) + stats.get("skipped", 0)
+        return merged
+
+    # ===================================================================
+    # ASYNC PLUMBING
+    # ===================================================================
+
+    def _get_async_executor(self) -> ThreadPoolExecutor:
+        """Bounded pool that runs the blocking parts of async retrieval."""
+        with self._executor_lock:
+            if self._async_executor is None:
+                self._async_executor = ThreadPoolExecutor(
+                    max_workers=config.ASYNC_RETRIEVAL_WORKERS, thread_name_prefix="rag-async"
+                )
+            return self._async_executor
+
+    async def _run_blocking(self, fn: Callable, *args):
+        """Await a blocking call on the bounded executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_async_executor(), functools.partial(fn, *args))
+
+    @staticmethod
+    def _run_sync(coro):
+        """
+        Drive a coroutine to completion from synchronous code. If this thread
+        already runs an event loop, the coroutine gets its own loop on a helper
+        thread instead of failing with 'asyncio.run() cannot be called from a
+        running event loop'.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-sync") as helper:
+            return helper.submit(asyncio.run, coro).result()
+
     def search_by_title(self, query: str, zim_path: str = None, full_text: bool = False) -> List[Dict]:
         """
-        Search for articles by title using UNIFIED Semantic Title Index.
+        Search for articles by title using the per-archive Semantic Title Index shards.
         Multi-ZIM aware: fetches content from the correct source ZIM.
         """
         results = []
         
         try:
             # 1. Semantic Title Search (Preferred - uses UNIFIED index)
-            if self.title_faiss_index and self.title_metadata and self.encoder:
-                 q_emb = self.encoder.encode([query])
-                 faiss.normalize_L2(q_emb)
-                 D, I = self.title_faiss_index.search(q_emb, 20)
-                 
-                 for i, idx in enumerate(I[0]):
-                     if idx != -1 and idx < len(self.title_metadata):
-                         meta = self.title_metadata[int(idx)]
-                         
-                         # Get the correct ZIM archive for this result
-                         source_zim = meta.get('source_zim')
-                         if not source_zim:
-                             # Legacy index without source_zim, fall back
-                             source_zim = self.zim_path or (self.zim_paths[0] if self.zim_paths else None)
-                         
-                         if not source_zim:
-                             continue
-                         
-                         zim = self.get_zim_archive(source_zim)
-                         if not zim:
-                             continue
-                         
-                         try:
-                             entry = zim.get_entry_by_path(meta['path'])
-                             item = entry.get_item()
-                             content = item.content.tobytes().decode('utf-8', errors='ignore')
-                             results.append({
-                                 'text': content,
-                                 'metadata': {
-                                     'title': meta['title'],
-                                     'path': meta['path'],
-                                     'source_zim': source_zim
-                                 },
-                                 'score': float(D[0][i])
-                             })
-                         except Exception:
-                             continue
+            if self.title_shards and self.encoder:
+                 for score, source_zim, meta in self.title_shards.search(self._embed_query(query), 20):
+                     zim = self.get_zim_archive(source_zim)
+                     if not zim:
+                         continue
+                     
+                     try:
+                         entry = self._resolve_redirect(source_zim, zim, zim.get_entry_by_path(meta['path']))
+                         if entry is None:
+                             continue  # Dangling or looping redirect
+                         content, key = self._article_text(source_zim, entry)
+                         results.append({
+                             'text': content,
+                             'metadata': {
+                                 'title': meta['title'],
+                                 'path': meta['path'],
+                                 'source_zim': source_zim,
+                                 'article_key': key
+                             },
+                             'score': score
+                         })
+                     except Exception:
+                         continue
                  return results
             
             # 2. Heuristic Path Fallback (searches ALL ZIMs)
-            debug_print(f"No title index, using heuristic fallback across {len(self.zim_paths)} ZIM(s)")
+            if not self.title_index_ready.is_set():
+                debug_print(f"Title index still loading, using heuristic fallback across {len(self.zim_paths)} ZIM(s)")
+            else:
+                debug_print(f"No title index, using heuristic fallback across {len(self.zim_paths)} ZIM(s)")
             guess_title = query.replace(" ", "_")
             paths_to_try = [
                 f"A/{guess_title}", 
@@ -983,18 +1513,38 @@ class RAGSystem:
                 if not zim:
                     continue
                 
+                title_index = self.title_hash_indexes.get(search_zim)
+                if title_index is not None:
+                    entry = self._resolve_redirect(search_zim, zim, title_index.find_entry(zim, query))
+                    if entry:
+                        content, key = self._article_text(search_zim, entry)
+                        results.append({
+                             'text': content,
+                             'metadata': {
+                                 'title': entry.title,
+                                 'path': entry.path,
+                                 'source_zim': search_zim,
+                                 'article_key': key
+                             },
+                             'score': 100.0
+                        })
+                    continue
+                
                 for p in paths_to_try:
                     try:
                         entry = zim.get_entry_by_path(p)
                         if entry:
-                            item = entry.get_item()
-                            content = item.content.tobytes().decode('utf-8', errors='ignore')
+                            entry = self._resolve_redirect(search_zim, zim, entry)
+                            if entry is None:
+                                continue  # Dangling or looping redirect
+                            content, key = self._article_text(search_zim, entry)
                             results.append({
                                  'text': content,
                                  'metadata': {
                                      'title': entry.title,
                                      'path': p,
-                                     'source_zim': search_zim
+                                     'source_zim': search_zim,
+                                     'article_key': key
                                  },
                                  'score': 100.0
                             })
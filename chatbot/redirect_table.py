@@ -0,0 +1,147 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Precomputed Redirect Table.
+Wikipedia ZIMs carry millions of redirects, and chains (A -> B -> C) are
+common. This sidecar flattens every chain offline into a sorted
+(redirect entry index -> final entry index) table, so retrieval resolves a
+redirect with one binary search and never walks a chain at query time.
+
+File layout (little-endian):
+    magic   8 bytes   b"HRMTRDR1"
+    uuid   16 bytes   archive UUID (stale sidecars are ignored)
+    count   8 bytes   number of redirects
+    sources count * uint32, redirect entry indices, sorted
+    targets count * uint32, final entry index (DANGLING for loops/broken chains)
+"""
+
+import os
+import struct
+from typing import Dict, Optional
+
+import numpy as np
+
+from chatbot.debug_utils import debug_print
+from chatbot.zim_utils import entry_by_index, entry_index, follow_redirects, iter_article_entries, sidecar_path
+
+MAGIC = b"HRMTRDR1"
+HEADER = struct.Struct("<8s16sQ")
+DANGLING = 0xFFFFFFFF
+MAX_CHAIN = 16
+
+
+def build_redirect_table(zim_path: str, archive=None) -> str:
+    """
+    Flatten all redirect chains of an archive into its redirect sidecar.
+    Returns the sidecar path.
+    """
+    if archive is None:
+        import libzim
+        archive = libzim.Archive(zim_path)
+
+    # Memo of already-flattened redirects, so shared chain tails are walked once
+    final_of: Dict[int, int] = {}
+
+    for idx, entry in iter_article_entries(archive):
+        if not entry.is_redirect or idx in final_of:
+            continue
+
+        chain = [idx]
+        current = entry
+        final = DANGLING
+        while len(chain) <= MAX_CHAIN:
+            try:
+                current = current.get_redirect_entry()
+            except Exception:
+                break  # Dangling redirect
+            current_idx = entry_index(current)
+            if current_idx in final_of:
+                final = final_of[current_idx]
+                break
+            if not current.is_redirect:
+                final = current_idx
+                break
+            if current_idx in chain:
+                break  # Loop
+            chain.append(current_idx)
+
+        for link in chain:
+            final_of[link] = final
+
+    sources = np.array(sorted(final_of), dtype='<u4')
+    targets = np.array([final_of[s] for s in sources.tolist()], dtype='<u4')
+
+    out_path = sidecar_path(zim_path, "redirects")
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, archive.uuid.bytes, len(sources)))
+        f.write(sources.tobytes())
+        f.write(targets.tobytes())
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class RedirectTable:
+    """Read-only, mmap'd view of a redirect sidecar."""
+
+    def __init__(self, path: str, sources: np.ndarray, targets: np.ndarray):
+        self.path = path
+        self.sources = sources
+        self.targets = targets
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    @classmethod
+    def load(cls, zim_path: str, archive=None) -> Optional['RedirectTable']:
+        """
+        Map the redirect sidecar for an archive. Returns None if it is missing,
+        corrupt, or was built for a different archive UUID.
+        """
+        path = sidecar_path(zim_path, "redirects")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                magic, uuid_bytes, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                debug_print(f"Ignoring redirect table with bad header: {path}")
+                return None
+            if archive is not None and uuid_bytes != archive.uuid.bytes:
+                debug_print(f"Ignoring stale redirect table (UUID mismatch): {path}")
+                return None
+            if count == 0:
+                return cls(path, np.zeros(0, dtype='<u4'), np.zeros(0, dtype='<u4'))
+            sources = np.memmap(path, dtype='<u4', mode='r', offset=HEADER.size, shape=(count,))
+            targets = np.memmap(path, dtype='<u4', mode='r', offset=HEADER.size + 4 * count, shape=(count,))
+            return cls(path, sources, targets)
+        except Exception as e:
+            debug_print(f"Failed to load redirect table {path}: {e}")
+            return None
+
+    def final_index(self, redirect_index: int) -> Optional[int]:
+        """
+        Final entry index for a redirect. Returns None if the redirect is not in
+        the table, DANGLING if its chain is broken or loops.
+        """
+        pos = int(np.searchsorted(self.sources, redirect_index))
+        if pos < len(self.sources) and int(self.sources[pos]) == redirect_index:
+            return int(self.targets[pos])
+        return None
+
+    def resolve(self, archive, entry):
+        """
+        Return the final (non-redirect) entry for any entry, or None for broken chains.
+        Redirects missing from the table fall back to walking the chain.
+        """
+        if entry is None or not entry.is_redirect:
+            return entry
+        final = self.final_index(entry_index(entry))
+        if final is None:
+            return follow_redirects(entry)
+        if final == DANGLING:
+            return None
+        return entry_by_index(archive, final)
@@ -0,0 +1,165 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Speculative Decoding for the Answer Stream.
+A small draft model (SPECULATIVE_DRAFT_MODEL, same tokenizer as the target)
+greedily proposes SPECULATIVE_DRAFT_TOKENS tokens; llama-cpp evaluates them in
+one target batch and keeps the prefix the target would have sampled anyway.
+
+The drafter tracks how many proposed tokens survive. When acceptance over a
+window falls below SPECULATIVE_MIN_ACCEPTANCE it stops proposing for the rest
+of the stream, and the (target, draft) pair is marked unprofitable, so later
+answers load the plain target instead. Tokens/sec of drafted and plain streams
+are recorded for comparison (throughput_report()).
+
+The drafting instance also serves plain requests for the target (joints, see
+ModelManager.get_model), so the target is not resident twice. Drafting only
+runs between a stream's reset_stats() and pause().
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from chatbot import config
+from chatbot.debug_utils import debug_print
+
+try:
+    from llama_cpp.llama_speculative import LlamaDraftModel
+except ImportError:
+    LlamaDraftModel = object
+
+_EMPTY = np.array([], dtype=np.intc)
+
+# (target, draft) pairs whose acceptance rate was too low to pay off
+_disabled_pairs: Set[Tuple[str, str]] = set()
+# mode ("draft" / "plain") -> [tokens, seconds, streams]
+_throughput: Dict[str, list] = {}
+_lock = threading.Lock()
+
+
+class DraftModelDecoding(LlamaDraftModel):
+    """LlamaDraftModel backed by a second, smaller Llama instance."""
+
+    def __init__(self, draft_llm, target: str = "", draft: str = "",
+                 num_pred_tokens: int = None, min_acceptance: float = None, window: int = None):
+        """
+        Args:
+            draft_llm: Loaded Llama for the draft model (shares the target's vocabulary)
+            target, draft: Repo IDs, used to mark the pair when drafting does not pay off
+            num_pred_tokens: Tokens proposed per step
+            min_acceptance: Accepted/proposed ratio below which drafting stops
+            window: Proposed tokens observed before the ratio is judged
+        """
+        self.draft_llm = draft_llm
+        self.target = target
+        self.draft = draft
+        self.num_pred_tokens = num_pred_tokens or config.SPECULATIVE_DRAFT_TOKENS
+        self.min_acceptance = config.SPECULATIVE_MIN_ACCEPTANCE if min_acceptance is None else min_acceptance
+        self.window = window or config.SPECULATIVE_ACCEPTANCE_WINDOW
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Start a new stream: clear acceptance counters and re-enable drafting."""
+        self.proposed = 0
+        self.accepted = 0
+        self.active = pair_enabled(self.target, self.draft)
+        self._last_len = 0
+        self._last_draft = _EMPTY
+
+    def pause(self) -> None:
+        """End of stream: propose nothing until the next reset_stats()."""
+        self.active = False
+        self._last_draft = _EMPTY
+
+    @property
+    def acceptance(self) -> float:
+        return self.accepted / self.proposed if self.proposed else 0.0
+
+    def __call__(self, input_ids, /, **kwargs):
+        self._account(input_ids)
+        if not self.active:
+            return _EMPTY
+
+        draft = []
+        for token in self.draft_llm.generate(list(input_ids), temp=0.0, reset=True):
+            draft.append(token)
+            if len(draft) >= self.num_pred_tokens:
+                break
+        self._last_len = len(input_ids)
+        self._last_draft = np.array(draft, dtype=np.intc)
+        return self._last_draft
+
+    def _account(self, input_ids) -> None:
+        """Count how much of the previous proposal the target kept."""
+        if not len(self._last_draft) or len(input_ids) <= self._last_len:
+            return
+        # The target appends one token of its own after the accepted run
+        kept = input_ids[self._last_len:len(input_ids) - 1]
+        n = min(len(kept), len(self._last_draft))
+        matches = np.asarray(kept[:n]) == self._last_draft[:n]
+        accepted = n if matches.all() else int(np.argmin(matches))
+        self.proposed += len(self._last_draft)
+        self.accepted += accepted
+        self._last_draft = _EMPTY
+
+        if self.active and self.proposed >= self.window and self.acceptance < self.min_acceptance:
+            self.active = False
+            disable_pair(self.target, self.draft)
+            debug_print(f"Speculative decoding off for {self.target}: {self.acceptance:.0%} of drafted "
+                        f"tokens accepted (< {self.min_acceptance:.0%}); falling back to plain decoding")
+
+
+def pair_enabled(target: str, draft: str) -> bool:
+    with _lock:
+        return (target, draft) not in _disabled_pairs
+
+
+def disable_pair(target: str, draft: str) -> None:
+    with _lock:
+        _disabled_pairs.add((target, draft))
+
+
+def record_stream(mode: str, tokens: int, seconds: float) -> None:
+    """Add one finished stream to the tokens/sec totals of its mode."""
+    if tokens <= 0 or seconds <= 0:
+        return
+    with _lock:
+        totals = _throughput.setdefault(mode, [0, 0.0, 0])
+        totals[0] += tokens
+        totals[1] += seconds
+        totals[2] += 1
+    debug_print(f"Answer stream ({mode}): {tokens} tokens in {seconds:.1f}s = {tokens / seconds:.1f} tok/s")
+
+
+def throughput_report() -> Dict[str, Dict[str, float]]:
+    """Per decoding mode: streams, tokens and mean tokens/sec."""
+    with _lock:
+        return {
+            mode: {"streams": streams, "tokens": tokens, "tok_per_s": tokens / seconds if seconds else 0.0}
+            for mode, (tokens, seconds, streams) in _throughput.items()
+        }
+
+
+class StreamTimer:
+    """Times one answer stream from its first token (prompt processing excluded)."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.tokens = 0
+        self._first: Optional[float] = None
+
+    def tick(self) -> None:
+        if self._first is None:
+            self._first = time.perf_counter()
+        else:
+            self.tokens += 1
+
+    def finish(self) -> None:
+        if self._first is not None:
+            record_stream(self.mode, self.tokens, time.perf_counter() - self._first)
@@ -9,9 +9,41 @@ Text Processing Utilities.
 Handles text chunking, cleaning, and normalization.
 """
 
-from typing import List
+from typing import List, Union
 import re
 
+# Page furniture that never belongs in retrieval text: hatnotes ("For other uses..."),
+# navboxes, the table of contents, maintenance banners, edit links and citation markers
+_BOILERPLATE_CLASSES = ('hatnote', 'navbox', 'vertical-navbox', 'toc', 'ambox', 'mw-editsection', 'reference', 'reflist')
+
+# Markup skipped by the streaming extractor: script/style/head blocks, comments,
+# opening tags of boilerplate elements (the element is skipped up to its closing tag), tags
+_MARKUP_TOKEN = re.compile(
+    r'<(script|style|head)\b[^>]*>.*?</\1\s*>|<!--.*?-->'
+    r'|<(?P<skip>div|table|span|sup|ol|ul|nav)\b[^>]*?\b(?:class|id)\s*=\s*["\'][^"\']*?'
+    r'(?<![\w-])(?:' + '|'.join(_BOILERPLATE_CLASSES) + r')(?![\w-])[^>]*>'
+    r'|<[^>]+>',
+    re.DOTALL | re.IGNORECASE
+)
+# Same scanner over raw ZIM content buffers
+_MARKUP_TOKEN_BYTES = re.compile(_MARKUP_TOKEN.pattern.encode('ascii'), _MARKUP_TOKEN.flags & ~re.UNICODE)
+# Opening/closing tags of one element name, for finding the end of a skipped element
+_ELEMENT_TAGS = {}
+
+# Markup rewritten by the article viewer formatter (see TextProcessor._render_markup)
+_RENDER_TOKEN = re.compile(
+    rb'<(?P<drop>script|style|head)\b[^>]*>.*?</(?P=drop)\s*>|<!--.*?-->'
+    rb'|<h(?P<heading>[1-3])\b[^>]*>'
+    rb'|(?P<item><li\b[^>]*>)'
+    rb'|(?P<block></?(?:p|div|br|tr|table|ul|ol|dl|dd|dt|section|blockquote|h[1-6])\b[^>]*>)'
+    rb'|<[^>]+>',
+    re.DOTALL | re.IGNORECASE
+)
+
+# Entities decoded by TextProcessor._decode_entities; any other entity is dropped
+_ENTITY = re.compile(r'&#?\w+;')
+_ENTITY_TEXT = {'&nbsp;': ' ', '&amp;': '&', '&lt;': '<', '&gt;': '>', '&quot;': '"'}
+
 class TextProcessor:
     @staticmethod
     def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
@@ -61,13 +93,132 @@ class TextProcessor:
         text = re.sub(r'@media[^{]+\{[^}]+\}', '', text)
         # Strip all remaining HTML tags
         text = re.sub(r'<[^>]+>', ' ', text)
-        # Remove common HTML entities
-        text = re.sub(r'&nbsp;', ' ', text)
-        text = re.sub(r'&amp;', '&', text)
-        text = re.sub(r'&lt;', '<', text)
-        text = re.sub(r'&gt;', '>', text)
-        text = re.sub(r'&quot;', '"', text)
-        text = re.sub(r'&#?\w+;', '', text)  # Any remaining entities
+        text = TextProcessor._decode_entities(text)
         # Normalize whitespace
         text = re.sub(r'\s+', ' ', text)
         return text.strip()
+
+    @staticmethod
+    def _decode_entities(text: str) -> str:
+        """Decode common HTML entities and drop the rest (single pass)."""
+        return _ENTITY.sub(lambda m: _ENTITY_TEXT.get(m.group(), ''), text)
+
+    @staticmethod
+    def extract_lead_text(html: Union[str, bytes, memoryview], max_chars: int = 6000) -> str:
+        """
+        Extract cleaned text lead-first: page furniture (hatnotes, navboxes, the
+        table of contents, banners, citation markers) is skipped whole, so the
+        budget goes to the infobox and lead section, which precede the first
+        section heading, and then to later sections. Stops as soon as max_chars
+        is filled.
+        Otherwise cleans the same way as clean_text() (minus <head> boilerplate),
+        but markup is scanned lazily, so the cost is proportional to what is
+        kept rather than to the article size.
+
+        Raw ZIM content (bytes or item.content's memoryview) is scanned in place:
+        only the kept text runs are decoded, the buffer is never copied whole.
+        """
+        if not html:
+            return ""
+
+        if isinstance(html, str):
+            pattern = _MARKUP_TOKEN
+        else:
+            pattern = _MARKUP_TOKEN_BYTES
+            html = memoryview(html)
+
+        parts = []
+        total = 0
+        pos = 0
+
+        while total < max_chars:
+            match = pattern.search(html, pos)
+            if match is None:
+                if pos < len(html):
+                    TextProcessor._append_segment(parts, html[pos:])
+                break
+            if match.start() > pos:
+                total += TextProcessor._append_segment(parts, html[pos:match.start()])
+            pos = match.end()
+            if match.group('skip'):
+                pos = TextProcessor._element_end(html, match.group('skip'), pos)
+
+        return " ".join(parts)[:max_chars]
+
+    @staticmethod
+    def _element_end(html: Union[str, memoryview], tag: Union[str, bytes], pos: int) -> int:
+        """
+        Position just after the tag that closes an element opened before pos
+        (nested elements of the same name are counted). If it is never closed,
+        only the opening tag is skipped.
+        """
+        tag = tag.lower()
+        tags = _ELEMENT_TAGS.get(tag)
+        if tags is None:
+            if isinstance(tag, str):
+                tags = re.compile(r'<(/?)' + tag + r'\b[^>]*>', re.IGNORECASE)
+            else:
+                tags = re.compile(rb'<(/?)' + tag + rb'\b[^>]*>', re.IGNORECASE)
+            _ELEMENT_TAGS[tag] = tags
+        depth = 1
+        for match in tags.finditer(html, pos):
+            depth += -1 if match.group(1) else 1
+            if depth == 0:
+                return match.end()
+        return pos
+
+    @staticmethod
+    def extract_renderable_text(html: Union[str, bytes, memoryview]) -> str:
+        """
+        Convert article HTML (str, bytes or memoryview) into lightly formatted text
+        for the article viewers: '# '/'## '/'### ' headings, '• ' list items and
+        blank lines between blocks.
+        Markup is rewritten in one bytes-level pass and the result decoded once.
+        """
+        if not html:
+            return ""
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+
+        text = _RENDER_TOKEN.sub(TextProcessor._render_markup, html).decode('utf-8', errors='ignore')
+        if '&' in text:
+            text = TextProcessor._decode_entities(text)
+
+        lines = []
+        gap = False
+        for line in text.split('\n'):
+            line = " ".join(line.split())
+            if line in ('', '•', '#', '##', '###'):
+                gap = True
+                continue
+            if gap and lines:
+                lines.append('')
+            lines.append(line)
+            gap = False
+        return "\n".join(lines)
+
+    @staticmethod
+    def _render_markup(match) -> bytes:
+        """Replacement for one _RENDER_TOKEN match."""
+        kind = match.lastgroup
+        if kind == 'heading':
+            return b'\n' + b'#' * int(match.group('heading')) + b' '
+        if kind == 'item':
+            return '\n• '.encode('utf-8')
+        if kind == 'block':
+            return b'\n'
+        return b''  # Dropped blocks, comments and inline tags
+
+    @staticmethod
+    def _append_segment(parts: List[str], segment: Union[str, memoryview]) -> int:
+        """Clean one text run between tags, append it, and return the characters added."""
+        if not isinstance(segment, str):
+            # Runs lie between ASCII '<'/'>' delimiters, so never split a UTF-8 sequence
+            segment = str(segment, 'utf-8', 'ignore')
+        if '&' in segment:
+            segment = TextProcessor._decode_entities(segment)
+        segment = " ".join(segment.split())
+        if not segment:
+            return 0
+        parts.append(segment)
+        return len(segment) + 1  # +1 for the joining space
@@ -0,0 +1,171 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Title Index Types.
+Builds, loads and benchmarks the FAISS index behind each title shard:
+
+  flat   - exact inner product, 4 bytes/dim (1.5 KB per title at 384 dims)
+  sq8    - 8-bit scalar quantized, exact scan, 4x smaller
+  hnsw   - graph search over full vectors, fastest queries, largest in RAM
+  ivfpq  - inverted lists + product quantization, ~TITLE_INDEX_PQ_M bytes per title
+
+Shards are read with FAISS mmap flags where the index type supports it, so
+large shards are paged in on demand instead of copied into RAM.
+recall_report() measures each type against exact search on the same vectors.
+"""
+
+import math
+import time
+from typing import Callable, Dict, Iterable, List
+
+import numpy as np
+
+from chatbot import config
+from chatbot.debug_utils import debug_print
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+INDEX_TYPES = ("flat", "sq8", "hnsw", "ivfpq")
+
+# Chunks of L2-normalized float32 embeddings, re-iterable (called once per pass)
+ChunkSource = Callable[[], Iterable[np.ndarray]]
+
+
+def _factory_string(kind: str, n: int) -> str:
+    if kind == "sq8":
+        return "SQ8"
+    if kind == "hnsw":
+        return f"HNSW{config.TITLE_INDEX_HNSW_M}"
+    if kind == "ivfpq":
+        nlist = config.TITLE_INDEX_IVF_NLIST or int(4 * math.sqrt(n))
+        nlist = max(1, min(nlist, n // 39))  # FAISS wants ~39 training points per centroid
+        return f"IVF{nlist},PQ{config.TITLE_INDEX_PQ_M}"
+    return "Flat"
+
+
+def effective_index_type(kind: str, n: int) -> str:
+    """Index type actually built for n titles (small shards always stay flat)."""
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown title index type '{kind}' (expected one of {', '.join(INDEX_TYPES)})")
+    if kind != "flat" and n < config.TITLE_INDEX_MIN_ANN_TITLES:
+        return "flat"
+    return kind
+
+
+def build_title_index(kind: str, dim: int, n: int, chunks: ChunkSource):
+    """Create, train (if needed) and fill an inner-product index of n vectors."""
+    kind = effective_index_type(kind, n)
+    index = faiss.index_factory(dim, _factory_string(kind, n), faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        index.train(_training_sample(chunks, n))
+    for embeddings in chunks():
+        if len(embeddings):
+            index.add(embeddings)
+    configure_search(index)
+    return index
+
+
+def _training_sample(chunks: ChunkSource, n: int) -> np.ndarray:
+    """An evenly strided sample of at most TITLE_INDEX_TRAIN_SAMPLES vectors."""
+    stride = max(1, math.ceil(n / config.TITLE_INDEX_TRAIN_SAMPLES))
+    sample = [embeddings[::stride] for embeddings in chunks() if len(embeddings)]
+    return np.ascontiguousarray(np.concatenate(sample), dtype='float32')
+
+
+def configure_search(index) -> None:
+    """Apply query-time parameters (nprobe for IVF, efSearch for HNSW)."""
+    if hasattr(index, 'nprobe'):
+        index.nprobe = config.TITLE_INDEX_NPROBE
+    hnsw = getattr(index, 'hnsw', None)
+    if hnsw is not None:
+        hnsw.efSearch = config.TITLE_INDEX_HNSW_EF_SEARCH
+
+
+def read_title_index(path: str):
+    """Read a shard index, memory-mapped when enabled and supported by its type."""
+    index = None
+    if config.TITLE_INDEX_MMAP:
+        try:
+            index = faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except Exception as e:
+            # HNSW graphs (and older FAISS builds for flat codes) can't be mmap'd
+            debug_print(f"mmap load unavailable for {path}, reading into RAM: {e}")
+    if index is None:
+        index = faiss.read_index(path)
+    configure_search(index)
+    return index
+
+
+def _exact_top_k(chunks: ChunkSource, queries: np.ndarray, k: int) -> np.ndarray:
+    """Exact inner-product top-k ids, streamed chunk by chunk (never holds all vectors)."""
+    best_scores = np.full((len(queries), 0), -np.inf, dtype='float32')
+    best_ids = np.zeros((len(queries), 0), dtype='int64')
+    offset = 0
+    for embeddings in chunks():
+        if not len(embeddings):
+            continue
+        scores = queries @ embeddings.T
+        ids = np.broadcast_to(np.arange(offset, offset + len(embeddings)), scores.shape)
+        best_scores = np.concatenate([best_scores, scores], axis=1)
+        best_ids = np.concatenate([best_ids, ids], axis=1)
+        if best_scores.shape[1] > k:
+            keep = np.argpartition(-best_scores, k, axis=1)[:, :k]
+            best_scores = np.take_along_axis(best_scores, keep, axis=1)
+            best_ids = np.take_along_axis(best_ids, keep, axis=1)
+        offset += len(embeddings)
+    return best_ids
+
+
+def recall_report(kinds: List[str], dim: int, n: int, chunks: ChunkSource,
+                  k: int = 10, num_queries: int = 200) -> List[Dict]:
+    """
+    Build each index type over the same vectors and compare it with exact search.
+    Queries are title vectors sampled across the shard.
+
+    Returns:
+        One row per type: {type, recall, mean_ms, p95_ms, size_mb, build_s}
+    """
+    stride = max(1, n // num_queries)
+    queries = np.concatenate([embeddings[::stride] for embeddings in chunks() if len(embeddings)])[:num_queries]
+    queries = np.ascontiguousarray(queries, dtype='float32')
+    k = min(k, n)
+    truth = _exact_top_k(chunks, queries, k)
+
+    rows = []
+    for kind in kinds:
+        start = time.perf_counter()
+        index = build_title_index(kind, dim, n, chunks)
+        build_s = time.perf_counter() - start
+
+        latencies = []
+        found = np.zeros((len(queries), k), dtype='int64')
+        for q in range(len(queries)):
+            start = time.perf_counter()
+            _, I = index.search(queries[q:q + 1], k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found[q] = I[0]
+
+        hits = sum(len(set(found[q]) & set(truth[q])) for q in range(len(queries)))
+        rows.append({
+            'type': effective_index_type(kind, n),
+            'recall': hits / float(len(queries) * k),
+            'mean_ms': float(np.mean(latencies)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'size_mb': faiss.serialize_index(index).nbytes / 1e6,
+            'build_s': build_s,
+        })
+    return rows
+
+
+def format_report(rows: List[Dict], k: int = 10) -> str:
+    lines = [f"  {'type':<8}{'recall@' + str(k):>10}{'mean ms':>10}{'p95 ms':>10}{'size MB':>10}{'build s':>10}"]
+    for row in rows:
+        lines.append(f"  {row['type']:<8}{row['recall']:>10.3f}{row['mean_ms']:>10.2f}{row['p95_ms']:>10.2f}"
+                     f"{row['size_mb']:>10.1f}{row['build_s']:>10.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,150 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Per-Archive Title Bloom Filter.
+A small, memory-mapped sidecar holding a bloom filter of every normalized
+title/path key in a ZIM. Retrieval checks candidate titles against it
+before touching the archive: a negative answer is definitive, so archives
+that cannot contain a title are never opened or probed for it.
+
+Unlike the other sidecars it is validated without opening the archive
+(the archive's size and mtime are recorded in the header), because the
+whole point is to avoid that open.
+
+File layout (little-endian):
+    magic      8 bytes   b"HRMTBLM1"
+    uuid      16 bytes   archive UUID
+    zim_size   8 bytes   archive file size when built
+    zim_mtime  8 bytes   archive mtime (ns) when built
+    num_bits   8 bytes   filter size in bits (multiple of 8)
+    num_hashes 4 bytes   probes per key
+    bits       num_bits / 8 bytes
+"""
+
+import os
+import math
+import hashlib
+import struct
+from typing import Optional
+
+import numpy as np
+
+from chatbot import config
+from chatbot.debug_utils import debug_print
+from chatbot.zim_utils import candidate_title_keys, entry_title_keys, iter_article_entries, sidecar_path
+
+MAGIC = b"HRMTBLM1"
+HEADER = struct.Struct("<8s16sQQQI")
+
+
+def _key_hashes(key: str):
+    """Two independent 64-bit hashes of a key, for double hashing."""
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+def _filter_shape(num_keys: int, false_positive_rate: float):
+    """Optimal (num_bits, num_hashes) for a key count and target error rate."""
+    num_keys = max(num_keys, 1)
+    num_bits = int(math.ceil(-num_keys * math.log(false_positive_rate) / (math.log(2) ** 2)))
+    num_bits = max(64, (num_bits + 7) // 8 * 8)
+    num_hashes = max(1, int(round(num_bits / num_keys * math.log(2))))
+    return num_bits, num_hashes
+
+
+def _zim_stat(zim_path: str):
+    stat = os.stat(zim_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def build_title_bloom(zim_path: str, archive=None) -> str:
+    """
+    Scan every article/redirect entry of an archive and write its bloom sidecar.
+    Returns the sidecar path.
+    """
+    if archive is None:
+        import libzim
+        archive = libzim.Archive(zim_path)
+
+    keys = set()
+    for _, entry in iter_article_entries(archive):
+        keys.update(entry_title_keys(entry))
+
+    num_bits, num_hashes = _filter_shape(len(keys), config.TITLE_BLOOM_FALSE_POSITIVE_RATE)
+    h1 = np.empty(len(keys), dtype=np.uint64)
+    h2 = np.empty(len(keys), dtype=np.uint64)
+    for n, key in enumerate(keys):
+        h1[n], h2[n] = _key_hashes(key)
+
+    bits = np.zeros(num_bits // 8, dtype=np.uint8)
+    modulus = np.uint64(num_bits)
+    for i in range(num_hashes):
+        # uint64 arithmetic wraps, which is fine for hashing
+        positions = (h1 + np.uint64(i) * h2) % modulus
+        np.bitwise_or.at(bits, positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+
+    zim_size, zim_mtime = _zim_stat(zim_path)
+    out_path = sidecar_path(zim_path, "bloom")
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, archive.uuid.bytes, zim_size, zim_mtime, num_bits, num_hashes))
+        f.write(bits.tobytes())
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class TitleBloomFilter:
+    """Read-only, mmap'd view of a title bloom sidecar."""
+
+    def __init__(self, path: str, bits: np.ndarray, num_bits: int, num_hashes: int):
+        self.path = path
+        self.bits = bits
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+
+    @property
+    def nbytes(self) -> int:
+        return self.num_bits // 8
+
+    @classmethod
+    def load(cls, zim_path: str, archive=None) -> Optional['TitleBloomFilter']:
+        """
+        Map the sidecar for an archive without opening the archive. Returns None
+        if it is missing, corrupt, or the archive file changed since it was built
+        (or, when an opened archive is passed, its UUID differs).
+        """
+        path = sidecar_path(zim_path, "bloom")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                magic, uuid_bytes, zim_size, zim_mtime, num_bits, num_hashes = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                debug_print(f"Ignoring title bloom with bad header: {path}")
+                return None
+            if (zim_size, zim_mtime) != _zim_stat(zim_path):
+                debug_print(f"Ignoring stale title bloom (archive changed): {path}")
+                return None
+            if archive is not None and uuid_bytes != archive.uuid.bytes:
+                debug_print(f"Ignoring stale title bloom (UUID mismatch): {path}")
+                return None
+            bits = np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER.size, shape=(num_bits // 8,))
+            return cls(path, bits, num_bits, num_hashes)
+        except Exception as e:
+            debug_print(f"Failed to load title bloom {path}: {e}")
+            return None
+
+    def _contains_key(self, key: str) -> bool:
+        h1, h2 = _key_hashes(key)
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % (1 << 64) % self.num_bits
+            if not self.bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def may_contain(self, title: str) -> bool:
+        """False only if no spelling variant of the title exists in the archive."""
+        return any(self._contains_key(key) for key in candidate_title_keys(title))
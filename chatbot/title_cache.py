@@ -0,0 +1,133 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Title Resolution Cache.
+Persists zero-index title lookups (hits AND misses) per archive, so warm
+queries skip the get_entry_by_path/get_entry_by_title probe storm.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from chatbot.debug_utils import debug_print
+from chatbot.zim_utils import normalize_title
+
+# Sentinel returned by get() for a cached negative lookup
+MISS = object()
+
+
+class TitleResolutionCache:
+    """
+    On-disk cache of title -> entry resolutions.
+
+    Rows are keyed by (archive fingerprint, normalized title). The fingerprint
+    is the archive UUID + checksum, so replacing a ZIM invalidates its rows
+    automatically; prune() drops rows for archives that are no longer present.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0           # Cached resolutions found
+        self.negative_hits = 0  # Cached "not in this archive" rows found
+        self.misses = 0         # Titles not cached yet
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS title_resolution ("
+            " archive TEXT NOT NULL,"
+            " title TEXT NOT NULL,"
+            " path TEXT,"           # Path that matched (NULL = cached miss)
+            " resolved_path TEXT,"  # Final entry path after redirects
+            " PRIMARY KEY (archive, title))"
+        )
+        self._conn.commit()
+
+    def get(self, archive_key: str, title: str):
+        """
+        Look up a cached resolution.
+
+        Returns:
+            None if unknown, MISS for a cached miss, else (path, resolved_path).
+        """
+        key = normalize_title(title)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, resolved_path FROM title_resolution WHERE archive = ? AND title = ?",
+                (archive_key, key)
+            ).fetchone()
+            # Counted under the lock: fan-out probe threads look titles up concurrently
+            if row is None:
+                self.misses += 1
+            elif row[0] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+        if row is None:
+            return None
+        if row[0] is None:
+            return MISS
+        return row[0], row[1]
+
+    def put_hit(self, archive_key: str, title: str, path: str, resolved_path: str) -> None:
+        """Record that title resolved to resolved_path (matched via path)."""
+        self._put(archive_key, title, path, resolved_path)
+
+    def put_miss(self, archive_key: str, title: str) -> None:
+        """Record that title does not exist in this archive."""
+        self._put(archive_key, title, None, None)
+
+    def _put(self, archive_key: str, title: str, path: Optional[str], resolved_path: Optional[str]) -> None:
+        key = normalize_title(title)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO title_resolution (archive, title, path, resolved_path) VALUES (?, ?, ?, ?)",
+                (archive_key, key, path, resolved_path)
+            )
+            self._dirty = True
+
+    def flush(self) -> None:
+        """Commit pending writes (called once per retrieval, not per probe)."""
+        with self._lock:
+            if self._dirty:
+                self._conn.commit()
+                self._dirty = False
+
+    def prune(self, live_archive_keys: Iterable[str]) -> int:
+        """Delete rows belonging to archives that are no longer loaded."""
+        live = list(live_archive_keys)
+        with self._lock:
+            if live:
+                placeholders = ",".join("?" * len(live))
+                cur = self._conn.execute(
+                    f"DELETE FROM title_resolution WHERE archive NOT IN ({placeholders})", live
+                )
+            else:
+                cur = self._conn.execute("DELETE FROM title_resolution")
+            self._conn.commit()
+            removed = cur.rowcount
+        if removed:
+            debug_print(f"Title cache: pruned {removed} stale rows")
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+            }
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.close()
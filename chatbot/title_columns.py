@@ -0,0 +1,135 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Columnar Title Metadata.
+Row metadata of a title shard ({title, path} per index row) stored as two
+UTF-8 string arenas plus offset arrays, memory-mapped at load time.
+Loading is O(1) regardless of row count, and a row is only decoded when a
+search actually returns it. The archive a row belongs to is never stored
+per row: each shard covers one archive (see title_shards.py).
+
+File layout (little-endian):
+    magic        8 bytes   b"HRMTCOL1"
+    count        8 bytes   number of rows
+    title_bytes  8 bytes   size of the title arena
+    path_bytes   8 bytes   size of the path arena
+    title_offs   (count + 1) * uint64, row i is title_arena[offs[i]:offs[i+1]]
+    path_offs    (count + 1) * uint64
+    title_arena  title_bytes of UTF-8
+    path_arena   path_bytes of UTF-8
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from chatbot.debug_utils import debug_print
+
+MAGIC = b"HRMTCOL1"
+HEADER = struct.Struct("<8sQQQ")
+
+
+def _encode_column(values: Sequence[str], out, base: int) -> np.ndarray:
+    """Append values to an arena file; returns their end offsets (relative to the arena start)."""
+    ends = np.empty(len(values), dtype='<u8')
+    pos = base
+    for n, value in enumerate(values):
+        data = str(value).encode('utf-8')
+        out.write(data)
+        pos += len(data)
+        ends[n] = pos
+    return ends
+
+
+def write_title_columns(path: str, rows: Iterable[Tuple[Sequence[str], Sequence[str]]]) -> int:
+    """
+    Stream (titles, paths) chunks into a columnar metadata file.
+    Arenas are spooled to temp files, so only the offsets are held in memory.
+    Returns the row count.
+    """
+    directory = os.path.dirname(path) or "."
+    title_ends, path_ends = [], []
+    title_pos = path_pos = 0
+    with tempfile.TemporaryFile(dir=directory) as titles_out, tempfile.TemporaryFile(dir=directory) as paths_out:
+        for titles, paths in rows:
+            ends = _encode_column(titles, titles_out, title_pos)
+            title_pos = int(ends[-1]) if len(ends) else title_pos
+            title_ends.append(ends)
+            ends = _encode_column(paths, paths_out, path_pos)
+            path_pos = int(ends[-1]) if len(ends) else path_pos
+            path_ends.append(ends)
+
+        zero = np.zeros(1, dtype='<u8')
+        title_offs = np.concatenate([zero] + title_ends)
+        path_offs = np.concatenate([zero] + path_ends)
+        count = len(title_offs) - 1
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, count, title_pos, path_pos))
+            f.write(title_offs.tobytes())
+            f.write(path_offs.tobytes())
+            for arena in (titles_out, paths_out):
+                arena.seek(0)
+                shutil.copyfileobj(arena, f)
+        os.replace(tmp_path, path)
+    return count
+
+
+class TitleColumns:
+    """Read-only, mmap'd view of a columnar metadata file. Rows decode lazily."""
+
+    def __init__(self, path: str, title_offs: np.ndarray, path_offs: np.ndarray,
+                 title_arena: np.ndarray, path_arena: np.ndarray):
+        self.path = path
+        self.title_offs = title_offs
+        self.path_offs = path_offs
+        self.title_arena = title_arena
+        self.path_arena = path_arena
+
+    def __len__(self) -> int:
+        return len(self.title_offs) - 1
+
+    @classmethod
+    def load(cls, path: str) -> Optional['TitleColumns']:
+        """Map a metadata file. Returns None if it is missing or corrupt."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                magic, count, title_bytes, path_bytes = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                debug_print(f"Ignoring title metadata with bad header: {path}")
+                return None
+            offset = HEADER.size
+            title_offs = np.memmap(path, dtype='<u8', mode='r', offset=offset, shape=(count + 1,))
+            offset += 8 * (count + 1)
+            path_offs = np.memmap(path, dtype='<u8', mode='r', offset=offset, shape=(count + 1,))
+            offset += 8 * (count + 1)
+            # np.memmap rejects zero-length maps; empty arenas never get sliced anyway
+            empty = np.zeros(0, dtype='u1')
+            title_arena = np.memmap(path, dtype='u1', mode='r', offset=offset, shape=(title_bytes,)) if title_bytes else empty
+            offset += title_bytes
+            path_arena = np.memmap(path, dtype='u1', mode='r', offset=offset, shape=(path_bytes,)) if path_bytes else empty
+            return cls(path, title_offs, path_offs, title_arena, path_arena)
+        except Exception as e:
+            debug_print(f"Failed to load title metadata {path}: {e}")
+            return None
+
+    def title(self, row: int) -> str:
+        return self.title_arena[int(self.title_offs[row]):int(self.title_offs[row + 1])].tobytes().decode('utf-8')
+
+    def entry_path(self, row: int) -> str:
+        return self.path_arena[int(self.path_offs[row]):int(self.path_offs[row + 1])].tobytes().decode('utf-8')
+
+    def __getitem__(self, row: int) -> Dict[str, str]:
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return {'title': self.title(row), 'path': self.entry_path(row)}
@@ -0,0 +1,180 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Normalized Title Hash Index.
+A compact, memory-mapped sidecar per ZIM that maps 64-bit hashes of
+case-folded, separator-normalized titles to entry indices. Any spelling
+variant ('python', 'Python_', 'PYTHON') resolves with one O(log n) lookup
+instead of a series of exception-raising get_entry_by_path trials.
+
+File layout (little-endian):
+    magic   8 bytes   b"HRMTTHX1"
+    uuid   16 bytes   archive UUID (stale sidecars are ignored)
+    count   8 bytes   number of keys
+    hashes  count * uint64, sorted
+    indices count * uint32, entry index for each hash
+"""
+
+import os
+import hashlib
+import struct
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from chatbot.debug_utils import debug_print
+from chatbot.zim_utils import title_key, entry_title_keys, entry_by_index, iter_article_entries, sidecar_path
+
+MAGIC = b"HRMTTHX1"
+HEADER = struct.Struct("<8s16sQ")
+
+# abs ZIM path -> (archive UUID, index or None), see TitleHashIndex.load_cached
+_loaded: Dict[str, Tuple[bytes, Optional['TitleHashIndex']]] = {}
+_loaded_lock = threading.Lock()
+
+
+def _key_hash(key: str) -> int:
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def title_hash(title: str) -> int:
+    """Stable 64-bit hash of a title's normalized key (Python's hash() is salted per process)."""
+    return _key_hash(title_key(title))
+
+
+def build_title_hash_index(zim_path: str, archive=None) -> str:
+    """
+    Scan every article/redirect entry of an archive and write its title hash sidecar.
+    Returns the sidecar path.
+    """
+    if archive is None:
+        import libzim
+        archive = libzim.Archive(zim_path)
+
+    hashes = []
+    indices = []
+    for i, entry in iter_article_entries(archive):
+        for key in entry_title_keys(entry):
+            hashes.append(_key_hash(key))
+            indices.append(i)
+
+    hash_arr = np.array(hashes, dtype='<u8')
+    index_arr = np.array(indices, dtype='<u4')
+    order = np.argsort(hash_arr, kind='stable')
+    hash_arr = hash_arr[order]
+    index_arr = index_arr[order]
+
+    out_path = sidecar_path(zim_path, "titles")
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, archive.uuid.bytes, len(hash_arr)))
+        f.write(hash_arr.tobytes())
+        f.write(index_arr.tobytes())
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class TitleHashIndex:
+    """Read-only, mmap'd view of a title hash sidecar."""
+
+    def __init__(self, path: str, hashes: np.ndarray, indices: np.ndarray):
+        self.path = path
+        self.hashes = hashes
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    @classmethod
+    def load(cls, zim_path: str, archive=None) -> Optional['TitleHashIndex']:
+        """
+        Map the sidecar for an archive. Returns None if it is missing, corrupt,
+        or was built for a different archive UUID.
+        """
+        path = sidecar_path(zim_path, "titles")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                magic, uuid_bytes, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                debug_print(f"Ignoring title index with bad header: {path}")
+                return None
+            if archive is not None and uuid_bytes != archive.uuid.bytes:
+                debug_print(f"Ignoring stale title index (UUID mismatch): {path}")
+                return None
+            if count == 0:
+                return cls(path, np.zeros(0, dtype='<u8'), np.zeros(0, dtype='<u4'))
+            hashes = np.memmap(path, dtype='<u8', mode='r', offset=HEADER.size, shape=(count,))
+            indices = np.memmap(path, dtype='<u4', mode='r', offset=HEADER.size + 8 * count, shape=(count,))
+            return cls(path, hashes, indices)
+        except Exception as e:
+            debug_print(f"Failed to load title index {path}: {e}")
+            return None
+
+    @classmethod
+    def load_cached(cls, zim_path: str, archive,
+                    loaded: Optional[Dict[str, Optional['TitleHashIndex']]] = None) -> Optional['TitleHashIndex']:
+        """
+        Index for an archive without re-reading the sidecar on every call: taken from
+        `loaded` (e.g. RAGSystem.title_hash_indexes) when the archive is there, otherwise
+        loaded once per path and archive UUID.
+        """
+        abs_path = os.path.abspath(zim_path)
+        if loaded is not None and abs_path in loaded:
+            return loaded[abs_path]
+        uuid_bytes = archive.uuid.bytes
+        with _loaded_lock:
+            cached = _loaded.get(abs_path)
+            if cached is None or cached[0] != uuid_bytes:
+                cached = _loaded[abs_path] = (uuid_bytes, cls.load(abs_path, archive))
+            return cached[1]
+
+    def lookup(self, title: str) -> List[int]:
+        """Return candidate entry indices for a title (hash matches, may include collisions)."""
+        h = np.uint64(title_hash(title))
+        lo = int(np.searchsorted(self.hashes, h, side='left'))
+        hi = int(np.searchsorted(self.hashes, h, side='right'))
+        return [int(i) for i in self.indices[lo:hi]]
+
+    def find_entry(self, archive, title: str):
+        """
+        Resolve any spelling variant of a title to its entry (redirects are NOT followed).
+        Leading '/' and old-style 'A/' prefixes are tolerated.
+        """
+        candidates = [title]
+        stripped = title.lstrip('/')
+        if stripped.startswith("A/"):
+            stripped = stripped[2:]
+        if stripped != title:
+            candidates.append(stripped)
+
+        for candidate in candidates:
+            key = title_key(candidate)
+            matches = []
+            for idx in self.lookup(candidate):
+                try:
+                    entry = entry_by_index(archive, idx)
+                except Exception:
+                    continue
+                # Guard against 64-bit hash collisions
+                if key in entry_title_keys(entry):
+                    matches.append(entry)
+            if not matches:
+                continue
+            # Several entries can fold to one key ('Java' vs 'JAVA'):
+            # prefer the exact spelling, then real articles over redirects
+            exact = candidate.replace(' ', '_')
+            for entry in matches:
+                if entry.path in (exact, f"A/{exact}") or entry.title == candidate:
+                    return entry
+            for entry in matches:
+                if not entry.is_redirect:
+                    return entry
+            return matches[0]
+        return None
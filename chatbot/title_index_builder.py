@@ -0,0 +1,273 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Parallel, Resumable Title Index Builder.
+Producer/consumer pipeline behind RAGSystem.build_index, producing one
+title shard per archive (see title_shards.py):
+
+  scan    - entry ranges are read by a pool of worker processes, each with
+            its own archive handle, running ahead of the encoder
+  encode  - titles are embedded in order, on a multi-process CPU pool
+            (SentenceTransformer.encode_multi_process) when on CPU
+  commit  - every encoded range is checkpointed under
+            <index_dir>/title_build/<zim>.<uuid>.<range>/, so an interrupted build
+            resumes from the last finished range instead of restarting
+  index   - checkpoints are assembled into the shard's FAISS index
+            (flat, sq8, hnsw or ivfpq, see title_ann.py)
+"""
+
+import os
+import glob
+import shutil
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from chatbot import config
+from chatbot.title_ann import build_title_index, effective_index_type, recall_report, format_report
+from chatbot.zim_utils import entry_by_index
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+# Per-process archive handles for scan workers
+_worker_archives: Dict[str, object] = {}
+
+
+def _scan_range(zim_path: str, start: int, stop: int) -> Tuple[int, List[str], List[str]]:
+    """Scan worker: (start, titles, paths) of the articles among entries [start, stop)."""
+    archive = _worker_archives.get(zim_path)
+    if archive is None:
+        import libzim
+        archive = _worker_archives[zim_path] = libzim.Archive(zim_path)
+
+    new_scheme = getattr(archive, "has_new_namespace_scheme", True)
+    titles, paths = [], []
+    for i in range(start, stop):
+        try:
+            entry = entry_by_index(archive, i)
+            if not new_scheme:
+                # Old-namespace archives keep articles under 'A/'
+                if not entry.path.startswith("A/"):
+                    continue
+            elif not entry.is_redirect and entry.get_item().mimetype != 'text/html':
+                continue  # Images, CSS and JS share the content namespace
+        except Exception:
+            continue
+        titles.append(entry.title)
+        paths.append(entry.path)
+    return start, titles, paths
+
+
+def _pack_strings(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """UTF-8 arena plus end offsets, as in title_columns.py (no padding to the longest value)."""
+    encoded = [str(value).encode('utf-8') for value in values]
+    ends = np.cumsum([len(data) for data in encoded], dtype='<u8')
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), ends
+
+
+def _unpack_strings(arena: np.ndarray, ends: np.ndarray, limit: Optional[int] = None) -> List[str]:
+    """Inverse of _pack_strings, decoding only the first `limit` values."""
+    ends = ends[:limit]
+    data = arena.tobytes()
+    starts = [0] + [int(end) for end in ends[:-1]]
+    return [data[start:int(end)].decode('utf-8') for start, end in zip(starts, ends)]
+
+
+class TitleIndexBuilder:
+    """Builds per-archive title FAISS shards with checkpointed, parallel stages."""
+
+    def __init__(self, encoder, index_dir: str, batch_size: int = 1000, index_type: Optional[str] = None):
+        self.encoder = encoder
+        self.batch_size = batch_size
+        self.index_type = index_type or config.TITLE_INDEX_TYPE
+        effective_index_type(self.index_type, 0)  # Fail on unknown types before any scanning
+        self.checkpoint_root = os.path.join(index_dir, "title_build")
+        self.dim = encoder.get_sentence_embedding_dimension()
+        self._encode_pool = None
+
+    def build_shards(self, zim_paths: List[str], limit: Optional[int] = None):
+        """
+        Index archives one at a time, yielding (zim_path, uuid, faiss_index, rows)
+        per archive, rows being (titles, paths) chunks in index order. An archive's
+        checkpoints are removed once the caller has taken its shard (i.e. when the
+        generator is resumed).
+        """
+        self._start_encode_pool()
+        try:
+            for zim_path in zim_paths:
+                built = self._build_archive(zim_path, limit)
+                if built is None:
+                    continue
+                uuid, checkpoint_dir, files = built
+                index, rows = self._assemble(files, limit)
+                yield zim_path, uuid, index, rows
+                shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        finally:
+            self._stop_encode_pool()
+
+    # --- stages ---
+
+    def _build_archive(self, zim_path: str, limit: Optional[int]):
+        """Scan + encode one archive. Returns (uuid, checkpoint_dir, checkpoint files in entry order)."""
+        import libzim
+
+        zim_name = os.path.basename(zim_path)
+        print(f"\nScanning: {zim_name}")
+        try:
+            archive = libzim.Archive(zim_path)
+        except Exception as e:
+            print(f"  ERROR: Failed to open {zim_name}: {e}")
+            return None
+
+        total_entries = archive.entry_count
+        print(f"  Total entries: {total_entries}")
+
+        step = config.TITLE_INDEX_CHUNK_ENTRIES
+        # Range size is part of the key: checkpoints from a differently-chunked run never mix
+        uuid = str(archive.uuid)
+        checkpoint_dir = os.path.join(self.checkpoint_root, f"{zim_name}.{uuid}.{step}")
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        ranges = [(start, min(start + step, total_entries)) for start in range(0, total_entries, step)]
+        done = {os.path.basename(f) for f in glob.glob(os.path.join(checkpoint_dir, "*.npz"))}
+        todo = [r for r in ranges if self._chunk_name(r[0]) not in done]
+        if len(todo) < len(ranges):
+            print(f"  Resuming: {len(ranges) - len(todo)}/{len(ranges)} ranges already checkpointed")
+
+        files = []
+        count = 0
+        pool = ProcessPoolExecutor(
+            max_workers=config.TITLE_INDEX_SCAN_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),  # Never fork a process holding torch threads
+        )
+        try:
+            scans = self._scan_ahead(pool, zim_path, todo)
+            for start, _ in ranges:
+                path = os.path.join(checkpoint_dir, self._chunk_name(start))
+                if self._chunk_name(start) in done:
+                    with np.load(path) as data:
+                        count += len(data['title_ends'])
+                else:
+                    _, titles, paths = next(scans)
+                    self._save_chunk(path, self._encode(titles), titles, paths)
+                    count += len(titles)
+                    print(f"  Indexed {count} titles ({min(start + step, total_entries)}/{total_entries} entries)")
+                files.append(path)
+                if limit and count >= limit:
+                    break
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        print(f"  Completed: {min(count, limit) if limit else count} titles from {zim_name}")
+        return uuid, checkpoint_dir, files
+
+    @staticmethod
+    def _scan_ahead(pool, zim_path: str, todo: List[Tuple[int, int]]):
+        """Yield scan results in range order, keeping the workers busy ahead of the encoder."""
+        pending = deque()
+        remaining = iter(todo)
+        for start, stop in remaining:
+            pending.append(pool.submit(_scan_range, zim_path, start, stop))
+            if len(pending) >= 2 * config.TITLE_INDEX_SCAN_WORKERS:
+                break
+        while pending:
+            future = pending.popleft()
+            next_range = next(remaining, None)
+            if next_range is not None:
+                pending.append(pool.submit(_scan_range, zim_path, *next_range))
+            yield future.result()
+
+    def _encode(self, titles: List[str]) -> np.ndarray:
+        if not titles:
+            return np.zeros((0, self.dim), dtype='float32')
+        if self._encode_pool is not None:
+            embeddings = self.encoder.encode_multi_process(titles, self._encode_pool, batch_size=self.batch_size)
+        else:
+            embeddings = self.encoder.encode(titles, batch_size=self.batch_size)
+        embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+    def _assemble(self, chunk_files: List[str], limit: Optional[int]):
+        """
+        Build one archive's shard index (TITLE_INDEX_TYPE) from its checkpoints.
+        Returns (index, rows), rows being a fresh iterator of (titles, paths) chunks.
+        """
+        n = sum(len(titles) for _, titles, _ in self._iter_chunks(chunk_files, limit, load_embeddings=False))
+        chunks = lambda: (embeddings for embeddings, _, _ in self._iter_chunks(chunk_files, limit))
+        index = build_title_index(self.index_type, self.dim, n, chunks)
+        rows = ((titles, paths) for _, titles, paths in self._iter_chunks(chunk_files, limit, load_embeddings=False))
+        return index, rows
+
+    def report(self, zim_paths: List[str], kinds: List[str], limit: Optional[int] = None, k: int = 10) -> None:
+        """
+        Print a recall/latency comparison of index types for each archive.
+        Encoded checkpoints are kept, so a following build reuses them.
+        """
+        for kind in kinds:
+            effective_index_type(kind, 0)
+        self._start_encode_pool()
+        try:
+            for zim_path in zim_paths:
+                built = self._build_archive(zim_path, limit)
+                if built is None:
+                    continue
+                _, _, files = built
+                n = sum(len(titles) for _, titles, _ in self._iter_chunks(files, limit, load_embeddings=False))
+                if n == 0:
+                    continue
+                chunks = lambda: (embeddings for embeddings, _, _ in self._iter_chunks(files, limit))
+                print(f"\n  Index types for {os.path.basename(zim_path)} ({n} titles):")
+                print(format_report(recall_report(kinds, self.dim, n, chunks, k=k), k=k))
+        finally:
+            self._stop_encode_pool()
+
+    # --- helpers ---
+
+    @staticmethod
+    def _iter_chunks(chunk_files: List[str], limit: Optional[int], load_embeddings: bool = True):
+        """Yield (embeddings, titles, paths) per checkpoint, truncated to the first `limit` titles."""
+        seen = 0
+        for path in chunk_files:
+            room = limit - seen if limit else None
+            if room is not None and room <= 0:
+                break
+            with np.load(path) as data:
+                titles = _unpack_strings(data['title_arena'], data['title_ends'], room)
+                paths = _unpack_strings(data['path_arena'], data['path_ends'], room)
+                embeddings = data['embeddings'][:room] if load_embeddings else None
+            seen += len(titles)
+            yield embeddings, titles, paths
+
+    @staticmethod
+    def _chunk_name(start: int) -> str:
+        return f"{start:012d}.npz"
+
+    @staticmethod
+    def _save_chunk(path: str, embeddings: np.ndarray, titles: List[str], paths: List[str]) -> None:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            title_arena, title_ends = _pack_strings(titles)
+            path_arena, path_ends = _pack_strings(paths)
+            np.savez(f, embeddings=embeddings, title_arena=title_arena, title_ends=title_ends,
+                     path_arena=path_arena, path_ends=path_ends)
+        os.replace(tmp_path, path)
+
+    def _start_encode_pool(self) -> None:
+        processes = config.TITLE_INDEX_ENCODE_PROCESSES
+        if processes > 1 and str(getattr(self.encoder, 'device', 'cpu')) == 'cpu':
+            print(f"Starting {processes}-process CPU encoding pool...")
+            self._encode_pool = self.encoder.start_multi_process_pool(target_devices=['cpu'] * processes)
+
+    def _stop_encode_pool(self) -> None:
+        if self._encode_pool is not None:
+            self.encoder.stop_multi_process_pool(self._encode_pool)
+            self._encode_pool = None
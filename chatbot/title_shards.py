@@ -0,0 +1,128 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Per-Archive Title Index Shards.
+The semantic title index is stored as one shard per ZIM, keyed by archive
+UUID, under <index_dir>/title_shards/:
+
+    <uuid>.faiss     inner-product index over normalized title embeddings
+                     (type per TITLE_INDEX_TYPE, mmap'd where supported)
+    <uuid>.meta      columnar {title, path} rows in index order (title_columns.py)
+
+Shards carry no archive path (it is attached at load time), so moving a ZIM
+keeps its shard valid. Adding an archive builds only its shard; removing one
+deletes only its shard. Queries search every loaded shard and merge by score;
+a hit is (shard number, row) until it makes the final top-k, and only then
+is its row decoded and its archive path attached.
+"""
+
+import os
+import glob
+import heapq
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from chatbot.debug_utils import debug_print
+from chatbot.title_ann import read_title_index
+from chatbot.title_columns import TitleColumns, write_title_columns
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+class TitleShardStore:
+    """On-disk shard directory: save, remove and load shards by archive UUID."""
+
+    def __init__(self, index_dir: str):
+        self.shard_dir = os.path.join(index_dir, "title_shards")
+
+    def _paths(self, uuid: str) -> Tuple[str, str]:
+        base = os.path.join(self.shard_dir, uuid)
+        return base + ".faiss", base + ".meta"
+
+    def has_shard(self, uuid: str) -> bool:
+        return all(os.path.exists(p) for p in self._paths(uuid))
+
+    def shard_ids(self) -> List[str]:
+        """UUIDs of every complete shard on disk."""
+        ids = [os.path.basename(p)[:-len(".faiss")] for p in glob.glob(os.path.join(self.shard_dir, "*.faiss"))]
+        return sorted(uuid for uuid in ids if self.has_shard(uuid))
+
+    def save(self, uuid: str, index, rows: Iterable[Tuple[Sequence[str], Sequence[str]]]) -> int:
+        """
+        Write a shard from its index and (titles, paths) row chunks in index order.
+        Metadata is written last, so has_shard() never sees half a shard. Returns the row count.
+        """
+        os.makedirs(self.shard_dir, exist_ok=True)
+        faiss_path, meta_path = self._paths(uuid)
+        self.remove(uuid)
+        faiss.write_index(index, faiss_path + ".tmp")
+        os.replace(faiss_path + ".tmp", faiss_path)
+        return write_title_columns(meta_path, rows)
+
+    def remove(self, uuid: str) -> None:
+        for path in self._paths(uuid):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def prune(self, keep_uuids) -> List[str]:
+        """Delete shards of archives that are gone (UUID not in keep_uuids). Returns removed UUIDs."""
+        keep = set(keep_uuids)
+        removed = [uuid for uuid in self.shard_ids() if uuid not in keep]
+        for uuid in removed:
+            self.remove(uuid)
+        return removed
+
+    def load(self, zim_uuids: Dict[str, str]) -> "TitleShardSet":
+        """
+        Load the shards of the given archives ({zim_path: uuid}).
+        Archives without a shard, or with an unreadable one, are skipped.
+        """
+        shards = []
+        for zim_path, uuid in zim_uuids.items():
+            if not self.has_shard(uuid):
+                continue
+            faiss_path, meta_path = self._paths(uuid)
+            try:
+                index = read_title_index(faiss_path)
+                columns = TitleColumns.load(meta_path)
+                if columns is None or len(columns) != index.ntotal:
+                    raise ValueError("metadata does not match index")
+            except Exception as e:
+                print(f"  Skipping title shard for {os.path.basename(zim_path)}: {e}")
+                continue
+            shards.append((zim_path, index, columns))
+        debug_print(f"Title shards loaded: {len(shards)}/{len(zim_uuids)} archives")
+        return TitleShardSet(shards)
+
+
+class TitleShardSet:
+    """Loaded shards, searched together as one index. A shard's position is its archive ID."""
+
+    def __init__(self, shards: List[Tuple[str, object, TitleColumns]]):
+        self.shards = shards
+
+    def __len__(self) -> int:
+        return sum(len(columns) for _, _, columns in self.shards)
+
+    def search(self, q_emb, top_k: int) -> List[Tuple[float, str, Dict]]:
+        """
+        Top-k (score, source_zim, meta) across all shards, best first.
+        q_emb must already be L2-normalized (1 x dim).
+        """
+        hits = []
+        for archive_id, (_, index, columns) in enumerate(self.shards):
+            if index.ntotal == 0:
+                continue
+            D, I = index.search(q_emb, min(top_k, index.ntotal))
+            for score, row in zip(D[0], I[0]):
+                if 0 <= row < len(columns):
+                    hits.append((float(score), archive_id, int(row)))
+        return [(score, self.shards[archive_id][0], self.shards[archive_id][2][row])
+                for score, archive_id, row in heapq.nlargest(top_k, hits, key=lambda hit: hit[0])]
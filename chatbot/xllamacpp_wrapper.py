@@ -1,9 +1,12 @@
 """
 XLlamaCPP Wrapper - Provides llama-cpp-python compatible interface using xllamacpp.
 Uses direct handle_chat_completions calls (non-streaming internally, simulates streaming externally).
+With n_parallel > 1 the server has that many sequence slots, and
+create_chat_completions() decodes a list of requests together.
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Generator, Any, Union, Optional
 
 try:
@@ -24,7 +27,8 @@ class XLlamaCPPWrapper:
     Wrapper that provides a llama-cpp-python compatible interface using xllamacpp.
     """
     
-    def __init__(self, model_path: str, n_ctx: int = 4096, n_gpu_layers: int = -1, verbose: bool = False):
+    def __init__(self, model_path: str, n_ctx: int = 4096, n_gpu_layers: int = -1, verbose: bool = False,
+                 n_parallel: int = 1):
         global _server_instance, _current_model_path
         
         if not XLLAMACPP_AVAILABLE:
@@ -33,9 +37,10 @@ class XLlamaCPPWrapper:
         self.model_path = model_path
         self.n_ctx = n_ctx
         self.n_gpu_layers = n_gpu_layers
+        self.n_parallel = n_parallel
         
-        # Reuse existing server if same model
-        if _server_instance is not None and _current_model_path == model_path:
+        # Reuse existing server if same model (multi-slot servers are owned by ModelManager)
+        if n_parallel == 1 and _server_instance is not None and _current_model_path == model_path:
             print(f"[XLlamaCPP] Reusing existing server for: {model_path}")
             self.server = _server_instance
             return
@@ -43,7 +48,9 @@ class XLlamaCPPWrapper:
         # Initialize xllamacpp Server with CommonParams
         params = xlc.CommonParams()
         params.model.path = model_path
-        params.n_ctx = n_ctx
+        # The server splits n_ctx across its slots: give every sequence the full window
+        params.n_ctx = n_ctx * n_parallel
+        params.n_parallel = n_parallel
         
         # GPU layers: -1 means all layers on GPU
         if n_gpu_layers == -1:
@@ -55,10 +62,11 @@ class XLlamaCPPWrapper:
         print(f"[XLlamaCPP] Loading model: {model_path}")
         self.server = xlc.Server(params)
         
-        # Cache globally
-        _server_instance = self.server
-        _current_model_path = model_path
-        print(f"[XLlamaCPP] Model loaded successfully")
+        if n_parallel == 1:
+            # Cache globally
+            _server_instance = self.server
+            _current_model_path = model_path
+        print(f"[XLlamaCPP] Model loaded successfully ({n_parallel} slot(s))")
 
     def create_chat_completion(
         self,
@@ -103,6 +111,48 @@ class XLlamaCPPWrapper:
             print(f"[XLlamaCPP] Error: {e}", file=sys.stderr)
             raise RuntimeError(f"XLlamaCPP completion failed: {e}")
     
+    def create_chat_completions(self, requests: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Run several independent chat completions at once.
+
+        Each request holds create_chat_completion-style fields (messages, max_tokens,
+        temperature, grammar as a GBNF string). All requests are submitted together;
+        the server assigns them to free slots and advances every active sequence in
+        the same decode batch, so N short completions take about as long as the
+        longest one. Results are in request order; a failed request yields None.
+        """
+        payloads = []
+        for request in requests:
+            payload = {
+                "model": "local-model",
+                "messages": request["messages"],
+                "temperature": request.get("temperature", 0.7),
+                "stream": False,
+                "cache_prompt": True,  # Slots keep the shared instruction prefix evaluated
+            }
+            if request.get("max_tokens"):
+                payload["max_tokens"] = request["max_tokens"]
+            if request.get("grammar"):
+                payload["grammar"] = request["grammar"]
+            payloads.append(payload)
+
+        def run(payload):
+            try:
+                response = self.server.handle_chat_completions(payload)
+            except Exception as e:
+                print(f"[XLlamaCPP] Batched request failed: {e}", file=sys.stderr)
+                return None
+            if not isinstance(response, dict) or "choices" not in response:
+                print(f"[XLlamaCPP] Batched request failed: {response}", file=sys.stderr)
+                return None
+            return response
+
+        if not payloads:
+            return []
+        # One blocking call per sequence; the server's own loop batches them
+        with ThreadPoolExecutor(max_workers=len(payloads), thread_name_prefix="xllamacpp-seq") as pool:
+            return list(pool.map(run, payloads))
+    
     def _simulate_stream(self, response: Dict) -> Generator[Dict[str, Any], None, None]:
         """Simulate streaming by yielding the full response content character by character."""
         try:
@@ -0,0 +1,117 @@
+# Hermit - Offline AI Chatbot for Wikipedia & ZIM Files
+# Copyright (C) 2026 Hermit-AI, Inc.
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+ZIM Utilities.
+Small helpers shared by the retrieval layer for identifying archives
+and normalizing article titles.
+"""
+
+from typing import List
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalize a candidate title for cache/index keys.
+    Strips surrounding whitespace and underscores, and maps spaces to underscores
+    so 'Albert Einstein' and 'Albert_Einstein' share one key.
+    """
+    if not title:
+        return ""
+    return "_".join(title.strip().strip('_').split())
+
+
+def archive_fingerprint(archive) -> str:
+    """
+    Return a stable identifier for an opened archive.
+    Uses the ZIM UUID plus the embedded checksum (when present), so a
+    re-downloaded or rebuilt archive never matches stale cached data.
+    """
+    fingerprint = str(archive.uuid)
+    try:
+        if archive.has_checksum:
+            fingerprint += f":{archive.checksum}"
+    except Exception:
+        pass
+    return fingerprint
+
+
+def title_key(title: str) -> str:
+    """
+    Case- and separator-insensitive lookup key for a title or path.
+    'python_(Programming language)' and 'Python (programming language)' map to the same key.
+    """
+    if not title:
+        return ""
+    return " ".join(title.replace('_', ' ').split()).casefold()
+
+
+def entry_title_keys(entry) -> List[str]:
+    """Keys an entry is reachable under: its title and its namespace-less path."""
+    path = entry.path
+    if path.startswith("A/"):
+        path = path[2:]
+    keys = {title_key(entry.title), title_key(path)}
+    keys.discard("")
+    return list(keys)
+
+
+def candidate_title_keys(title: str) -> List[str]:
+    """
+    Lookup keys for a candidate title, tolerating a leading '/' or old-style
+    'A/' prefix (the same spellings TitleHashIndex.find_entry accepts).
+    """
+    keys = [title_key(title)]
+    stripped = title.lstrip('/')
+    if stripped.startswith("A/"):
+        stripped = stripped[2:]
+    if stripped != title:
+        keys.append(title_key(stripped))
+    return [key for key in keys if key]
+
+
+def entry_by_index(archive, index: int):
+    """Fetch an entry by its index (libzim renamed this accessor across versions)."""
+    getter = getattr(archive, "_get_entry_by_id", None)
+    if getter is None:
+        getter = archive.get_entry_by_index
+    return getter(index)
+
+
+def iter_article_entries(archive):
+    """
+    Yield (index, entry) for every user-facing entry (articles and redirects).
+    Old-namespace archives keep articles under 'A/', everything else is skipped.
+    """
+    new_scheme = getattr(archive, "has_new_namespace_scheme", True)
+    for i in range(archive.entry_count):
+        try:
+            entry = entry_by_index(archive, i)
+        except Exception:
+            continue
+        if not new_scheme and not entry.path.startswith("A/"):
+            continue
+        yield i, entry
+
+
+def sidecar_path(zim_path: str, kind: str) -> str:
+    """Path of a Hermit sidecar file stored next to the archive (e.g. 'foo.zim.hermit-titles')."""
+    return f"{zim_path}.hermit-{kind}"
+
+
+def follow_redirects(entry, max_hops: int = 8):
+    """Walk a redirect chain to its final entry. Returns None for loops or dangling chains."""
+    hops = 0
+    while entry is not None and entry.is_redirect:
+        if hops >= max_hops:
+            return None
+        entry = entry.get_redirect_entry()
+        hops += 1
+    return entry
+
+
+def entry_index(entry) -> int:
+    """Index of an entry inside its archive (inverse of entry_by_index)."""
+    return entry._index
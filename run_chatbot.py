@@ -38,7 +38,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Hermit Chatbot")
     parser.add_argument("--debug", action="store_true", help="Enable detailed debug output")
     parser.add_argument("--cli", action="store_true", help="Run in command-line interface mode")
-    parser.add_argument("model", nargs="?", default=DEFAULT_MODEL, help="Ollama model to use")
+    parser.add_argument("--rebuild", action="store_true", help="With 'index-titles': rebuild sidecars even if up to date")
+    parser.add_argument("--index-types", default=None, help="With 'index-report': comma-separated types to compare (flat,sq8,hnsw,ivfpq)")
+    parser.add_argument("--limit", type=int, default=None, help="With 'index-report': max titles per ZIM")
+    parser.add_argument("model", nargs="?", default=DEFAULT_MODEL, help="Model to use, 'index-titles' to build ZIM title indices, or 'index-report' to compare title index types")
     
     args = parser.parse_args()
     
@@ -58,6 +61,19 @@ if __name__ == "__main__":
         print(f"[DEBUG] Using model: {args.model}", file=sys.stderr)
         print(f"[DEBUG] Script directory: {script_dir}", file=sys.stderr)
     
+    # Offline maintenance: `hermit index-titles` builds per-ZIM lookup sidecars
+    if args.model == "index-titles":
+        import glob
+        from chatbot.index_titles import run_index_titles
+        sys.exit(run_index_titles(sorted(glob.glob("*.zim")), force=args.rebuild))
+
+    # `hermit index-report`: recall/latency of each semantic title index type vs exact search
+    if args.model == "index-report":
+        from chatbot.rag import RAGSystem
+        kinds = args.index_types.split(",") if args.index_types else None
+        RAGSystem(load_existing=False).report_index_types(kinds=kinds, limit=args.limit)
+        sys.exit(0)
+
     # Check for CLI mode
     if args.cli:
         from chatbot.cli import ChatbotCLI
@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from chatbot import config
+from chatbot.joints import FactRefinementJoint
+from chatbot.joints import base
+from chatbot.model_manager import ModelManager
+
+
+def completion(content):
+    return {'choices': [{'message': {'content': content}}]}
+
+
+class TestBatchInference(unittest.TestCase):
+    @patch.object(config, 'JOINT_BATCH_SLOTS', 4)
+    @patch('chatbot.joints.base._xllamacpp_installed', return_value=True)
+    @patch('chatbot.joints.base.ModelManager.get_model')
+    def test_prompts_are_decoded_as_one_batch(self, mock_get_model, _):
+        server = MagicMock()
+        held = []
+
+        def create(requests):
+            held.append(ModelManager.inference_lock._is_owned())
+            return [completion('["a"]'), None, completion('["b", "c"]')]
+
+        server.create_chat_completions.side_effect = create
+        mock_get_model.return_value = server
+
+        joint = FactRefinementJoint(model="test-model")
+        facts = joint.refine_facts_batch("query", ["text 1", "text 2", "text 3"])
+
+        self.assertEqual(facts, [["a"], [], ["b", "c"]])
+        self.assertEqual(held, [True])
+        mock_get_model.assert_called_once_with("test-model", n_ctx=4096, parallel=4)
+        requests = server.create_chat_completions.call_args[0][0]
+        self.assertEqual(len(requests), 3)
+        self.assertTrue(requests[0]['messages'][1]['content'].startswith("Extract 3-5 key facts"))
+        self.assertIn("root ::=", requests[0]['grammar'])
+
+    @patch('chatbot.joints.base._xllamacpp_installed', return_value=False)
+    @patch('chatbot.joints.base.local_inference')
+    def test_falls_back_to_sequential_calls(self, mock_inference, _):
+        mock_inference.side_effect = ['["a"]', RuntimeError("boom")]
+
+        results = base.batch_inference("test-model", ["p1", "p2"], use_json_grammar=True, schema="string_list")
+
+        self.assertEqual(results, ['["a"]', None])
+        self.assertEqual(mock_inference.call_count, 2)
+
+    @patch('chatbot.joints.base._xllamacpp_installed', return_value=True)
+    @patch('chatbot.joints.base.ModelManager.get_model')
+    @patch('chatbot.joints.base.local_inference', return_value='["a"]')
+    def test_batch_server_is_opt_in(self, mock_inference, mock_get_model, _):
+        results = base.batch_inference("test-model", ["p1", "p2"])
+
+        self.assertEqual(results, ['["a"]', '["a"]'])
+        mock_get_model.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
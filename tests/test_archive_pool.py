@@ -0,0 +1,120 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from libzim.writer import Creator, Item, StringProvider, Hint
+
+from chatbot.archive_pool import ArchivePool
+
+
+class _Article(Item):
+    def __init__(self, path, title, html):
+        super().__init__()
+        self._path, self._title, self._html = path, title, html
+
+    def get_path(self): return self._path
+    def get_title(self): return self._title
+    def get_mimetype(self): return "text/html"
+    def get_contentprovider(self): return StringProvider(self._html)
+    def get_hints(self): return {Hint.FRONT_ARTICLE: True}
+
+
+class TestArchivePool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.zim_paths = []
+        for n in range(3):
+            path = os.path.join(cls.tmp.name, f"pool_{n}.zim")
+            with Creator(path) as creator:
+                creator.add_item(_Article(f"Article_{n}", f"Article {n}", f"<p>Article {n}</p>"))
+            cls.zim_paths.append(path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_handles_are_reused(self):
+        opened = []
+        pool = ArchivePool(2, on_open=lambda path, archive: opened.append(path))
+        first = pool.get(self.zim_paths[0])
+        self.assertIs(pool.get(self.zim_paths[0]), first)
+        self.assertEqual(opened, [self.zim_paths[0]])
+
+    def test_lru_eviction(self):
+        evicted = []
+        pool = ArchivePool(2, on_evict=evicted.append)
+        a, b, c = self.zim_paths
+        pool.get(a)
+        pool.get(b)
+        pool.get(a)  # b is now least recently used
+        pool.get(c)
+        self.assertEqual(evicted, [b])
+        self.assertIn(a, pool)
+        self.assertNotIn(b, pool)
+        self.assertEqual((len(pool), pool.status()['evictions']), (2, 1))
+
+        # An evicted archive is simply reopened on demand
+        self.assertIsNotNone(pool.get(b))
+        self.assertEqual(evicted, [b, a])
+
+    def test_unlimited_pool_never_evicts(self):
+        pool = ArchivePool(0)
+        for path in self.zim_paths:
+            pool.get(path)
+        self.assertEqual(len(pool), 3)
+
+    def test_concurrent_gets_open_once(self):
+        opened = []
+
+        def on_open(path, archive):
+            opened.append(path)
+            time.sleep(0.1)  # Keep the open in flight while the other callers arrive
+
+        pool = ArchivePool(2, on_open=on_open)
+        handles = []
+        threads = [threading.Thread(target=lambda: handles.append(pool.get(self.zim_paths[0]))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(opened, [self.zim_paths[0]])
+        self.assertEqual(len({id(handle) for handle in handles}), 1)
+
+    def test_failed_open_is_recorded(self):
+        pool = ArchivePool(2)
+        missing = os.path.join(self.tmp.name, "missing.zim")
+        self.assertIsNone(pool.get(missing))
+        self.assertIn(missing, pool.failed)
+        self.assertEqual(pool.status()['failed'], 1)
+
+    def test_preopen_opens_up_to_max_open_in_background(self):
+        pool = ArchivePool(2)
+        thread = pool.preopen(self.zim_paths)
+        thread.join(5)
+        status = pool.status()
+        self.assertTrue(status['ready'])
+        self.assertEqual((status['open'], status['preopened'], status['preopen_total']), (2, 2, 2))
+        self.assertIn(self.zim_paths[0], pool)
+        self.assertNotIn(self.zim_paths[2], pool)
+
+    def test_ready_is_clear_while_preopening(self):
+        gate = threading.Event()
+        pool = ArchivePool(2, on_open=lambda path, archive: gate.wait(5))
+        thread = pool.preopen(self.zim_paths)
+        self.assertFalse(pool.ready.is_set())
+        gate.set()
+        thread.join(5)
+        self.assertTrue(pool.ready.is_set())
+
+    def test_preopen_runs_then_after_pass(self):
+        pool = ArchivePool(2)
+        seen = []
+        pool.preopen(self.zim_paths, then=lambda: seen.append((pool.ready.is_set(), len(pool)))).join(5)
+        self.assertEqual(seen, [(True, 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from libzim.writer import Creator, Item, StringProvider, Hint
+
+from chatbot import config
+from chatbot.model_manager import ModelManager
+from chatbot.rag import RAGSystem
+from chatbot.state import HermitContext
+
+
+class _Article(Item):
+    def __init__(self, path, title, html):
+        super().__init__()
+        self._path, self._title, self._html = path, title, html
+
+    def get_path(self): return self._path
+    def get_title(self): return self._title
+    def get_mimetype(self): return "text/html"
+    def get_contentprovider(self): return StringProvider(self._html)
+    def get_hints(self): return {Hint.FRONT_ARTICLE: True}
+
+
+ARCHIVE_COUNT = 6
+
+
+class TestARetrieve(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # archive_n holds Topic_n_a .. Topic_n_c, plus a redirect to its first article
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.zim_paths = []
+        for n in range(ARCHIVE_COUNT):
+            zim_path = os.path.join(cls.tmp.name, f"archive_{n}.zim")
+            with Creator(zim_path) as creator:
+                for suffix in "abc":
+                    path = f"Topic_{n}_{suffix}"
+                    creator.add_item(_Article(path, path.replace('_', ' '), f"<p>{path} text.</p>"))
+                creator.add_redirection(f"Alias_{n}", f"Alias {n}", f"Topic_{n}_a", {Hint.FRONT_ARTICLE: True})
+            cls.zim_paths.append(zim_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(config, 'ZIM_PREOPEN', False),
+            mock.patch.object(config, 'USE_JOINTS', False),
+            mock.patch.object(config, 'USE_ORCHESTRATION', False),
+            mock.patch.object(config, 'TITLE_INDEX_BACKGROUND_LOAD', False),
+            mock.patch.object(config, 'TITLE_CACHE_ENABLED', False),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.index_dir = tempfile.TemporaryDirectory()
+        self.rag = RAGSystem(index_dir=self.index_dir.name, zim_paths=self.zim_paths)
+
+    def tearDown(self):
+        self.rag.archive_pool.close_all()
+        self.index_dir.cleanup()
+
+    def _candidates(self, titles):
+        return mock.patch.object(self.rag, '_generate_candidate_titles', side_effect=lambda query: list(titles))
+
+    def _slow_lookups(self, seconds):
+        """Every title lookup in every archive takes `seconds`."""
+        probe = self.rag._probe_archive
+
+        def slow_probe(zim_path, zim, title_guess, cancel=None):
+            time.sleep(seconds)
+            return probe(zim_path, zim, title_guess, cancel)
+
+        return mock.patch.object(self.rag, '_probe_archive', side_effect=slow_probe)
+
+    def test_results_follow_candidate_order(self):
+        titles = ["Topic_5_b", "Missing", "Topic_0_c", "Topic_3_a"]
+        with self._candidates(titles):
+            results = asyncio.run(self.rag.aretrieve("query", top_k=10))
+        self.assertEqual([r['metadata']['title'] for r in results], ["Topic 5 b", "Topic 0 c", "Topic 3 a"])
+
+    def test_spellings_of_one_article_are_merged(self):
+        with self._candidates(["Topic_2_a", "Topic 2 a", "Alias_2"]):
+            results = self.rag.retrieve("query", top_k=10)
+        self.assertEqual([r['metadata']['title'] for r in results], ["Topic 2 a"])
+
+    def test_duplicate_spellings_keep_first_position(self):
+        # The repeated spelling must not move Topic 1 a behind the other hits
+        titles = ["Topic_1_a", "Topic_4_b", "Topic_0_c", "Topic 1 a"]
+        with self._candidates(titles), mock.patch.object(self.rag, '_fan_out_resolve',
+                                                          wraps=self.rag._fan_out_resolve) as resolve:
+            results = self.rag.retrieve("query", top_k=10)
+        self.assertEqual([r['metadata']['title'] for r in results], ["Topic 1 a", "Topic 4 b", "Topic 0 c"])
+        self.assertCountEqual([call.args[0] for call in resolve.call_args_list], titles[:3])
+
+    def test_concurrent_queries_on_one_loop(self):
+        async def both():
+            with self._candidates(["Topic_1_a", "Topic_4_b"]):
+                return await asyncio.gather(self.rag.aretrieve("one", top_k=1), self.rag.aretrieve("two", top_k=5))
+
+        first, second = asyncio.run(both())
+        self.assertEqual([r['metadata']['title'] for r in first], ["Topic 1 a"])
+        self.assertEqual([r['metadata']['title'] for r in second], ["Topic 1 a", "Topic 4 b"])
+
+    def test_retrieve_inside_running_loop(self):
+        async def call_sync():
+            return self.rag.retrieve("query")
+
+        with self._candidates(["Topic_0_a"]):
+            results = asyncio.run(call_sync())
+        self.assertEqual(len(results), 1)
+
+    def test_llm_candidates_hold_inference_lock(self):
+        held = []
+
+        def llm_candidates(query, proper_nouns):
+            held.append(ModelManager.inference_lock._is_owned())
+            return ["Topic_0_a"]
+
+        with mock.patch.object(self.rag, '_llm_candidate_titles', side_effect=llm_candidates):
+            self.rag.retrieve("query")
+        self.assertEqual(held, [True])
+
+    def test_probes_do_not_wait_for_inference_lock(self):
+        # A long generation elsewhere holds the lock; archive probing must still finish
+        results = []
+        with ModelManager.inference_lock, self._candidates(["Topic_3_c"]):
+            worker = threading.Thread(target=lambda: results.extend(self.rag.retrieve("query")))
+            worker.start()
+            worker.join(5.0)
+        self.assertFalse(worker.is_alive())
+        self.assertEqual([r['metadata']['title'] for r in results], ["Topic 3 c"])
+
+    def test_queued_probes_are_not_charged_for_waiting(self):
+        # 12 candidates x 6 archives on 2 probe workers: most probes queue far longer than
+        # the budget, but each one runs well within it, so none may time out
+        titles = [f"Nothing_{n}" for n in range(11)] + ["Topic_5_c"]
+        with self._candidates(titles), self._slow_lookups(0.02), \
+                mock.patch.object(config, 'ZIM_PROBE_WORKERS', 2), \
+                mock.patch.object(config, 'ZIM_PROBE_BUDGET_MS', 250):
+            results = self.rag.retrieve("query", top_k=10)
+        self.assertEqual([r['metadata']['title'] for r in results], ["Topic 5 c"])
+        timings = self.rag.last_probe_timings
+        self.assertEqual(sum(stats["timeouts"] for stats in timings.values()), 0)
+        # Every miss probed all archives; the winner's probes still queued when it hit are cancelled
+        probes = sum(stats["probes"] for stats in timings.values())
+        self.assertGreaterEqual(probes, (len(titles) - 1) * ARCHIVE_COUNT + 1)
+        self.assertLessEqual(probes, len(titles) * ARCHIVE_COUNT)
+
+    def test_failed_lexical_search_keeps_title_hits(self):
+        ctx = HermitContext(original_query="query")
+        with self._candidates(["Topic_2_b"]), mock.patch.object(config, 'ENABLE_LEXICAL_SEARCH', True), \
+                mock.patch.object(self.rag, 'lexical_search', side_effect=OSError("unreadable sidecar")):
+            asyncio.run(self.rag._aorchestrate_search(ctx))
+        self.assertEqual([r['metadata']['title'] for r in ctx.retrieved_data], ["Topic 2 b"])
+        self.assertTrue(any("Lexical search failed" in line for line in ctx.logs))
+
+
+if __name__ == '__main__':
+    unittest.main()
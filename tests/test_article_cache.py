@@ -0,0 +1,36 @@
+import sys
+import unittest
+from chatbot.article_cache import ArticleTextCache
+
+class TestArticleTextCache(unittest.TestCase):
+    def test_hits_misses_and_cold_tier(self):
+        cache = ArticleTextCache(max_bytes=1 << 20, hot_entries=1)
+        cache.put(("uuid-a", 1, "lead"), "first article")
+        cache.put(("uuid-a", 2, "lead"), "second article")
+
+        # Entry 1 was demoted to the cold tier and is promoted back on access
+        self.assertEqual(cache.get(("uuid-a", 1, "lead")), "first article")
+        self.assertEqual(cache.get(("uuid-a", 2, "lead")), "second article")
+        self.assertIsNone(cache.get(("uuid-b", 1, "lead")))
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_byte_budget_evicts_least_recent(self):
+        text = "x" * 1000
+        cache = ArticleTextCache(max_bytes=sys.getsizeof(text) * 2, hot_entries=10)
+        for i in range(3):
+            cache.put(("uuid-a", i, "lead"), text)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(("uuid-a", 0, "lead")))
+        self.assertLessEqual(cache.stats()['bytes'], cache.max_bytes)
+
+    def test_get_or_load_calls_loader_once(self):
+        cache = ArticleTextCache(max_bytes=1 << 20)
+        calls = []
+        load = lambda: calls.append(1) or "text"
+        self.assertEqual(cache.get_or_load("k", load), "text")
+        self.assertEqual(cache.get_or_load("k", load), "text")
+        self.assertEqual(len(calls), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import threading
+import unittest
+from unittest import mock
+
+from chatbot import chat, config, speculative
+from chatbot.model_manager import ModelManager
+
+
+class FakeLlama:
+    """Records whether inference_lock is held, and whether another thread could take it, per chunk."""
+
+    def __init__(self):
+        self.held = []
+        self.contended = []
+
+    def _observe(self):
+        self.held.append(ModelManager.inference_lock._is_owned())
+        acquired = []
+
+        def try_lock():
+            acquired.append(ModelManager.inference_lock.acquire(blocking=False))
+            if acquired[0]:
+                ModelManager.inference_lock.release()
+
+        probe = threading.Thread(target=try_lock)
+        probe.start()
+        probe.join()
+        self.contended.append(not acquired[0])
+
+    def create_chat_completion(self, messages, stream=False, **kwargs):
+        if not stream:
+            self._observe()
+            return {'choices': [{'message': {'content': "answer"}}]}
+
+        def chunks():
+            for text in ["Hello", " world"]:
+                self._observe()
+                yield {'choices': [{'delta': {'content': text}}]}
+        return chunks()
+
+
+class TestChatHoldsInferenceLock(unittest.TestCase):
+    def setUp(self):
+        self.llm = FakeLlama()
+        patches = [
+            mock.patch.object(ModelManager, 'get_model', return_value=self.llm),
+            mock.patch.object(config, 'SPECULATIVE_DECODING', False),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_stream_holds_lock_until_done(self):
+        self.assertEqual("".join(chat.stream_chat("chat-model", [])), "Hello world")
+        self.assertEqual(self.llm.held, [True, True])
+        self.assertEqual(self.llm.contended, [True, True])
+        self.assertFalse(ModelManager.inference_lock._is_owned())
+
+    def test_closing_the_stream_releases_lock(self):
+        stream = chat.stream_chat("chat-model", [])
+        next(stream)
+        stream.close()
+        self.assertFalse(ModelManager.inference_lock._is_owned())
+        self.assertTrue(ModelManager.inference_lock.acquire(blocking=False))
+        ModelManager.inference_lock.release()
+
+    def test_full_chat_holds_lock(self):
+        self.assertEqual(chat.full_chat("chat-model", []), "answer")
+        self.assertEqual(self.llm.contended, [True])
+
+
+class TestChatPausesDrafter(unittest.TestCase):
+    def test_drafting_stops_when_the_stream_ends(self):
+        llm = FakeLlama()
+        llm.draft_model = speculative.DraftModelDecoding(mock.MagicMock(), "chat-model", "draft-model")
+        llm.draft_model.pause()
+        active = []
+        create = llm.create_chat_completion
+
+        def observed(*args, **kwargs):
+            for chunk in create(*args, **kwargs):
+                active.append(llm.draft_model.active)
+                yield chunk
+
+        llm.create_chat_completion = observed
+        with mock.patch.object(ModelManager, 'get_model', return_value=llm), \
+                mock.patch.object(chat, '_draft_model_for', return_value="draft-model"):
+            self.assertEqual("".join(chat.stream_chat("chat-model", [])), "Hello world")
+        self.assertEqual(active, [True, True])
+        # Joints share the instance between answers and must not draft
+        self.assertFalse(llm.draft_model.active)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import threading
+import unittest
+
+import numpy as np
+
+from chatbot.encoder_service import EncoderService
+
+
+class _CountingEncoder:
+    """Deterministic stand-in for SentenceTransformer.encode that records each call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        if "boom" in texts:
+            raise RuntimeError("encoder failed")
+        return np.array([[len(t), 1.0, float(sum(map(ord, t)) % 7)] for t in texts], dtype='float32')
+
+
+class TestEncoderService(unittest.TestCase):
+    def test_vectors_are_normalized_and_cached(self):
+        encoder = _CountingEncoder()
+        service = EncoderService(encoder, cache_entries=8, window_ms=1)
+        first = service.embed(["alpha", "beta", "alpha"])
+        np.testing.assert_allclose(np.linalg.norm(first, axis=1), 1.0, rtol=1e-6)
+        np.testing.assert_array_equal(first[0], first[2])
+        service.embed(["beta"])
+        self.assertEqual(sum(len(call) for call in encoder.calls), 2)
+        self.assertEqual(service.stats()['hits'], 1)
+
+    def test_concurrent_requests_share_a_batch(self):
+        encoder = _CountingEncoder()
+        service = EncoderService(encoder, window_ms=50)
+        barrier = threading.Barrier(8)
+
+        def query(n):
+            barrier.wait()
+            service.embed([f"query {n}"])
+
+        threads = [threading.Thread(target=query, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLess(len(encoder.calls), 8)
+        self.assertEqual(sorted(t for call in encoder.calls for t in call), sorted(f"query {n}" for n in range(8)))
+
+    def test_lru_evicts_oldest_and_errors_propagate(self):
+        encoder = _CountingEncoder()
+        service = EncoderService(encoder, cache_entries=1, window_ms=0)
+        service.embed(["one"])
+        service.embed(["two"])
+        service.embed(["one"])
+        self.assertEqual(len(encoder.calls), 3)
+        with self.assertRaises(RuntimeError):
+            service.embed(["boom"])
+        service.embed(["two"])  # Worker survives a failed batch
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import libzim
+from libzim.writer import Creator, Item, StringProvider, Hint
+
+from chatbot import config
+from chatbot.rag import RAGSystem
+from chatbot.title_bloom import build_title_bloom
+
+
+class _Article(Item):
+    def __init__(self, path, title, html):
+        super().__init__()
+        self._path, self._title, self._html = path, title, html
+
+    def get_path(self): return self._path
+    def get_title(self): return self._title
+    def get_mimetype(self): return "text/html"
+    def get_contentprovider(self): return StringProvider(self._html)
+    def get_hints(self): return {Hint.FRONT_ARTICLE: True}
+
+
+ARCHIVES = {
+    "alpha.zim": ["Mount_Etna", "Sicily"],
+    "beta.zim": ["Vesuvius", "Naples"],
+    "gamma.zim": ["Stromboli"],
+}
+
+
+def _build_archives(directory):
+    zim_paths = []
+    for name, paths in ARCHIVES.items():
+        zim_path = os.path.join(directory, name)
+        with Creator(zim_path) as creator:
+            for path in paths:
+                creator.add_item(_Article(path, path.replace('_', ' '), f"<p>{path} article.</p>"))
+        zim_paths.append(zim_path)
+    return zim_paths
+
+
+class TestFanOutResolve(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.zim_paths = _build_archives(cls.tmp.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(config, 'ZIM_PREOPEN', False),
+            mock.patch.object(config, 'USE_JOINTS', False),
+            mock.patch.object(config, 'TITLE_INDEX_BACKGROUND_LOAD', False),
+            mock.patch.object(config, 'TITLE_CACHE_ENABLED', False),
+            mock.patch.object(config, 'ZIM_PROBE_WORKERS', 4),
+            mock.patch.object(config, 'ZIM_PROBE_BUDGET_MS', 1500),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.index_dir = tempfile.TemporaryDirectory()
+        self.rag = RAGSystem(index_dir=self.index_dir.name, zim_paths=self.zim_paths)
+        self.alpha, self.beta, self.gamma = self.rag.zim_paths
+
+    def tearDown(self):
+        self.rag.archive_pool.close_all()
+        self.index_dir.cleanup()
+
+    def _slow_archive(self, slow_path, seconds):
+        """
+        Make probes of one archive take `seconds`, returning early (with nothing) once
+        cancelled. Other archives are probed only after the slow probe has started.
+        """
+        probe = self.rag._probe_archive
+        started = threading.Event()
+        cancelled = threading.Event()
+
+        def slow_probe(zim_path, zim, title_guess, cancel=None):
+            if zim_path == slow_path:
+                started.set()
+                if cancel.wait(seconds):
+                    cancelled.set()
+                    return None
+            else:
+                started.wait(1.0)
+            return probe(zim_path, zim, title_guess, cancel)
+
+        patcher = mock.patch.object(self.rag, '_probe_archive', side_effect=slow_probe)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return cancelled
+
+    def test_hit_in_any_archive(self):
+        timings = {}
+        entry, matched_path, zim_path = self.rag._fan_out_resolve("Vesuvius", timings)
+        self.assertEqual((entry.path, matched_path, zim_path), ("Vesuvius", "Vesuvius", self.beta))
+
+    def test_miss_everywhere_probes_every_archive(self):
+        timings = {}
+        self.assertIsNone(self.rag._fan_out_resolve("Krakatoa", timings))
+        self.assertEqual(sorted(timings), sorted(self.rag.zim_paths))
+        for stats in timings.values():
+            self.assertEqual((stats["probes"], stats["timeouts"]), (1, 0))
+
+    def test_first_hit_cancels_slow_archives(self):
+        cancelled = self._slow_archive(self.gamma, 5.0)
+        start = time.time()
+        hit = self.rag._fan_out_resolve("Sicily", {})
+        self.assertEqual(hit[2], self.alpha)
+        self.assertLess(time.time() - start, 2.0)
+        self.assertTrue(cancelled.wait(2.0))
+
+    def test_slow_archive_over_budget_is_counted_as_timeout(self):
+        self._slow_archive(self.gamma, 5.0)
+        timings = {}
+        with mock.patch.object(config, 'ZIM_PROBE_BUDGET_MS', 100):
+            self.assertIsNone(self.rag._fan_out_resolve("Krakatoa", timings))
+        self.assertEqual(timings[self.gamma]["timeouts"], 1)
+        self.assertEqual(timings[self.gamma]["max_ms"], 100)
+        self.assertEqual(timings[self.alpha]["timeouts"], 0)
+
+    def test_bloom_negatives_are_skipped(self):
+        zim_paths = _build_archives(self.index_dir.name)
+        for zim_path in zim_paths:
+            build_title_bloom(zim_path, libzim.Archive(zim_path))
+        rag = RAGSystem(index_dir=self.index_dir.name, zim_paths=zim_paths)
+        alpha, beta, gamma = rag.zim_paths
+        timings = {}
+        hit = rag._fan_out_resolve("Naples", timings)
+        self.assertEqual(hit[2], beta)
+        for zim_path in (alpha, gamma):
+            self.assertEqual(timings[zim_path]["skipped"], 1)
+            self.assertEqual(timings[zim_path]["probes"], 0)
+        self.assertNotIn(alpha, rag.archive_pool)
+        rag.archive_pool.close_all()
+
+    def test_probe_timings_merge_per_archive(self):
+        timings = [{}, {}]
+        self.rag._fan_out_resolve("Krakatoa", timings[0])
+        self.rag._fan_out_resolve("Naples", timings[1])
+        merged = self.rag._merge_probe_timings(timings)
+        self.assertEqual(merged[self.beta]["probes"], 2)
+        self.assertGreaterEqual(merged[self.alpha]["probes"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import libzim
+from libzim.writer import Creator, Item, StringProvider, Hint
+
+from chatbot import config
+from chatbot.fulltext_search import search_archive
+from chatbot.rag import RAGSystem
+
+
+class _Article(Item):
+    def __init__(self, path, title, html):
+        super().__init__()
+        self._path, self._title, self._html = path, title, html
+
+    def get_path(self): return self._path
+    def get_title(self): return self._title
+    def get_mimetype(self): return "text/html"
+    def get_contentprovider(self): return StringProvider(self._html)
+    def get_hints(self): return {Hint.FRONT_ARTICLE: True}
+
+
+ARCHIVES = {
+    "alpha.zim": {"Etna": "volcano on Sicily", "Vesuvius": "volcano near Naples", "Stromboli": "volcano island"},
+    "beta.zim": {"Krakatoa": "volcano in Indonesia", "Jakarta": "capital city"},
+}
+
+
+class TestFulltextSearch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.zim_paths = []
+        for name, articles in ARCHIVES.items():
+            zim_path = os.path.join(cls.tmp.name, name)
+            with Creator(zim_path).config_indexing(True, "eng") as creator:
+                creator.set_mainpath(next(iter(articles)))
+                for title, body in articles.items():
+                    creator.add_item(_Article(title, title, f"<html><body><p>{title} is a {body}.</p></body></html>"))
+            cls.zim_paths.append(zim_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(config, 'ZIM_PREOPEN', False),
+            mock.patch.object(config, 'USE_JOINTS', False),
+            mock.patch.object(config, 'TITLE_INDEX_BACKGROUND_LOAD', False),
+            mock.patch.object(config, 'FULLTEXT_BUDGET_MS', 3000),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.index_dir = tempfile.TemporaryDirectory()
+        self.rag = RAGSystem(index_dir=self.index_dir.name, zim_paths=self.zim_paths)
+        self.alpha, self.beta = self.rag.zim_paths
+
+    def tearDown(self):
+        self.rag.archive_pool.close_all()
+        self.index_dir.cleanup()
+
+    def test_search_archive_uses_fulltext_index(self):
+        archive = libzim.Archive(self.alpha)
+        self.assertTrue(archive.has_fulltext_index)
+        self.assertEqual(sorted(search_archive(archive, "volcano", 10)), ["Etna", "Stromboli", "Vesuvius"])
+        self.assertEqual(search_archive(archive, "volcano", 0), [])
+
+    def test_rankings_interleave_by_archive(self):
+        results = self.rag.fulltext_search("volcano", max_results=10)
+        self.assertEqual([r['metadata']['source_zim'] for r in results], [self.alpha, self.beta, self.alpha, self.alpha])
+        for result in results:
+            self.assertEqual(result['metadata']['retrieval'], 'fulltext')
+            self.assertEqual(result['score'], config.FULLTEXT_RESULT_SCORE)
+
+    def test_result_cap_across_archives(self):
+        results = self.rag.fulltext_search("volcano", max_results=2)
+        self.assertEqual([r['metadata']['source_zim'] for r in results], [self.alpha, self.beta])
+
+    def test_no_match(self):
+        self.assertEqual(self.rag.fulltext_search("glacier"), [])
+
+    def test_slow_archive_is_skipped(self):
+        def search(archive, query, limit):
+            if archive.has_entry_by_path("Krakatoa"):
+                time.sleep(1.0)
+            return search_archive(archive, query, limit)
+
+        with mock.patch('chatbot.rag.search_archive', side_effect=search), \
+                mock.patch.object(config, 'FULLTEXT_BUDGET_MS', 200):
+            results = self.rag.fulltext_search("volcano", max_results=10)
+        self.assertEqual({r['metadata']['source_zim'] for r in results}, {self.alpha})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import re
+import unittest
+
+from chatbot import grammar_utils
+
+try:
+    import llama_cpp
+except ImportError:
+    llama_cpp = None
+
+
+def _root_pattern(grammar):
+    """The root rule of a list grammar as a regex over items written as I."""
+    root = next(line for line in grammar.splitlines() if line.startswith("root ::="))
+    body = root.split("::=", 1)[1]
+    for gbnf, regex in (('"["', r'\['), ('"]"', r'\]'), ('","', ','), ('ws', ''), ('item', 'I'), (' ', '')):
+        body = body.replace(gbnf, regex)
+    return re.compile(body)
+
+
+class TestJointGrammars(unittest.TestCase):
+    def test_every_schema_has_a_token_budget(self):
+        for name in grammar_utils.SCHEMAS:
+            self.assertGreater(grammar_utils.max_tokens_for(name), 0)
+
+    @unittest.skipIf(llama_cpp is None, "llama-cpp-python not installed")
+    def test_schemas_compile_once(self):
+        for name in grammar_utils.SCHEMAS:
+            grammar = grammar_utils.get_grammar(name)
+            self.assertIsNotNone(grammar, name)
+            self.assertIs(grammar_utils.get_grammar(name), grammar)
+
+    def test_score_lists_are_bounded(self):
+        for grammar, most in ((grammar_utils.TITLE_SCORES_GRAMMAR, 20), (grammar_utils.CHUNK_SCORES_GRAMMAR, 15)):
+            pattern = _root_pattern(grammar)
+            for n in range(most + 1):
+                self.assertTrue(pattern.fullmatch("[" + ",".join(["I"] * n) + "]"), n)
+            self.assertFalse(pattern.fullmatch("[" + ",".join(["I"] * (most + 1)) + "]"))
+
+
+if __name__ == '__main__':
+    unittest.main()
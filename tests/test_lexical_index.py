@@ -0,0 +1,84 @@
+import os
+import random
+import tempfile
+import unittest
+
+import libzim
+import numpy as np
+from libzim.writer import Creator, Item, StringProvider, Hint
+
+from chatbot.lexical_index import LexicalIndex, build_lexical_index, tokenize
+from chatbot.zim_utils import entry_by_index
+
+
+class _Article(Item):
+    def __init__(self, path, title, html):
+        super().__init__()
+        self._path, self._title, self._html = path, title, html
+
+    def get_path(self): return self._path
+    def get_title(self): return self._title
+    def get_mimetype(self): return "text/html"
+    def get_contentprovider(self): return StringProvider(self._html)
+    def get_hints(self): return {Hint.FRONT_ARTICLE: True}
+
+
+WORDS = ["river", "mountain", "castle", "battle", "music", "album", "physics", "quantum",
+         "novel", "poet", "empire", "railway", "island", "volcano", "football", "opera"]
+
+
+class TestLexicalIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.zim_path = os.path.join(cls.tmp.name, "lexical_test.zim")
+        rng = random.Random(7)
+        with Creator(cls.zim_path) as creator:
+            creator.add_item(_Article("Mount_Etna", "Mount Etna", "<p>Mount Etna is an active volcano on the island of Sicily.</p>"))
+            for n in range(700):
+                title = f"{rng.choice(WORDS).title()} {n}"
+                body = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 40)))
+                creator.add_item(_Article(f"Doc_{n}", title, f"<p>{body}</p>"))
+            creator.add_redirection("Etna", "Etna", "Mount_Etna", {Hint.FRONT_ARTICLE: True})
+        cls.archive = libzim.Archive(cls.zim_path)
+        build_lexical_index(cls.zim_path, cls.archive)
+        cls.index = LexicalIndex.load(cls.zim_path, cls.archive)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _brute_force(self, query, k):
+        """Score every posting of every query term (no pruning)."""
+        index = self.index
+        totals = {}
+        for _, _, b0, b1, idf, _ in index._terms(query):
+            p0, p1 = int(index.block_post[b0]), int(index.block_post[b1])
+            docs = index.post_doc[p0:p1].astype(np.int64)
+            for doc, score in zip(docs, index._score(idf, index.post_tf[p0:p1], docs)):
+                totals[int(doc)] = totals.get(int(doc), 0.0) + float(score)
+        ranked = sorted(totals.items(), key=lambda item: -item[1])[:k]
+        return [(int(index.doc_entry[doc]), score) for doc, score in ranked]
+
+    def test_title_and_lead_terms_find_the_article(self):
+        entry_index, _ = self.index.search("Which volcano is on Sicily?", 1)[0]
+        self.assertEqual(entry_by_index(self.archive, entry_index).title, "Mount Etna")
+
+    def test_redirects_are_not_documents(self):
+        self.assertEqual(len(self.index), 701)
+
+    def test_pruned_search_matches_exhaustive_scores(self):
+        rng = random.Random(3)
+        for _ in range(30):
+            query = " ".join(rng.sample(WORDS, rng.randint(1, 4)))
+            got = self.index.search(query, 10)
+            want = self._brute_force(query, 10)
+            np.testing.assert_allclose([s for _, s in got], [s for _, s in want], rtol=1e-9)
+
+    def test_unknown_terms_and_stopwords(self):
+        self.assertEqual(self.index.search("zzzz qqqq", 5), [])
+        self.assertEqual(tokenize("What is the Eiffel Tower?"), ["eiffel", "tower"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from chatbot import config, speculative
+from chatbot.model_manager import ModelManager
+
+GB = 1024 ** 3
+FOOTPRINTS = {"chat-3b": 3 * GB, "fact-8b": 6 * GB, "joint-1.5b": 2 * GB}
+
+
+class TestModelResidency(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile(suffix=".gguf", delete=False)
+        self.tmp.close()
+        ModelManager.close_all()
+        ModelManager._pinned.clear()
+        ModelManager._chat_model = None
+        ModelManager._peak_ctx.clear()
+        ModelManager.resize_log.clear()
+        ModelManager.metrics.update(loads=0, hits=0, evictions=0, idle_unloads=0, resizes=0)
+        speculative._disabled_pairs.clear()
+        self.addCleanup(speculative._disabled_pairs.clear)
+        patches = [
+            patch('chatbot.model_manager.Llama', MagicMock(side_effect=lambda **kw: MagicMock(
+                name=kw['model_path'], **{'n_vocab.return_value': 0}))),
+            patch.object(ModelManager, 'ensure_model_path', staticmethod(lambda repo_id: self.tmp.name)),
+            patch.object(ModelManager, '_estimate_footprint', staticmethod(lambda path, n_ctx: 0)),
+            patch.object(config, 'MODEL_MEMORY_BUDGET_GB', 10),
+            patch.object(config, 'MODEL_IDLE_UNLOAD_SECONDS', 0),
+            patch.object(config, 'API_MODE', False),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        # Charge each model its fixture footprint
+        load = ModelManager._load_model.__func__
+
+        def charged_load(cls, repo_id, n_ctx, n_gpu_layers, parallel=1, draft_model=None):
+            with patch.object(ModelManager, '_estimate_footprint', staticmethod(lambda path, n: FOOTPRINTS[repo_id])):
+                return load(cls, repo_id, n_ctx, n_gpu_layers, parallel, draft_model)
+
+        p = patch.object(ModelManager, '_load_model', classmethod(charged_load))
+        p.start()
+        self.addCleanup(p.stop)
+
+    def tearDown(self):
+        ModelManager.close_all()
+        os.unlink(self.tmp.name)
+
+    def test_models_stay_resident_within_budget(self):
+        chat = ModelManager.get_model("chat-3b", chat_model=True)
+        ModelManager.get_model("fact-8b")
+        self.assertIs(ModelManager.get_model("chat-3b"), chat)
+        self.assertEqual(ModelManager.metrics["loads"], 2)
+        self.assertEqual(ModelManager.metrics["evictions"], 0)
+
+    def test_lru_unpinned_model_is_evicted_first(self):
+        ModelManager.get_model("chat-3b", chat_model=True)
+        ModelManager.get_model("fact-8b")
+        ModelManager.get_model("joint-1.5b")  # 3 + 6 + 2 > 10
+        resident = [m["repo_id"] for m in ModelManager.stats()["resident"]]
+        self.assertEqual(resident, ["chat-3b", "joint-1.5b"])
+        self.assertEqual(ModelManager.metrics["evictions"], 1)
+
+    def test_idle_unpinned_models_are_unloaded(self):
+        ModelManager.get_model("chat-3b", chat_model=True)
+        ModelManager.get_model("joint-1.5b")
+        self.assertEqual(ModelManager.unload_idle(max_idle=-1), ["joint-1.5b"])
+        self.assertEqual(ModelManager.metrics["idle_unloads"], 1)
+
+    def test_smaller_context_is_served_by_larger_instance(self):
+        chat = ModelManager.get_model("chat-3b", n_ctx=8192, chat_model=True)
+        self.assertIs(ModelManager.get_model("chat-3b", n_ctx=4096), chat)
+        self.assertEqual(ModelManager.metrics["loads"], 1)
+        self.assertEqual(ModelManager.metrics["resizes"], 0)
+
+    def test_larger_context_resizes_once_and_is_recorded(self):
+        joint = ModelManager.get_model("chat-3b", n_ctx=4096)
+        chat = ModelManager.get_model("chat-3b", n_ctx=8192, chat_model=True)
+        self.assertIsNot(chat, joint)
+        self.assertIs(ModelManager.get_model("chat-3b", n_ctx=4096), chat)
+        self.assertEqual(ModelManager.metrics["resizes"], 1)
+        resize = ModelManager.stats()["recent_resizes"][0]
+        self.assertEqual((resize["repo_id"], resize["from"], resize["to"]), ("chat-3b", 4096, 8192))
+
+    def test_reload_after_unload_uses_largest_requested_context(self):
+        ModelManager.get_model("joint-1.5b", n_ctx=8192)
+        ModelManager.unload_idle(max_idle=-1)
+        ModelManager.get_model("joint-1.5b", n_ctx=4096)
+        self.assertEqual(ModelManager.stats()["resident"][0]["n_ctx"], 8192)
+
+    def test_lookups_and_stats_do_not_wait_for_a_load(self):
+        chat = ModelManager.get_model("chat-3b", chat_model=True)
+        loading, release = threading.Event(), threading.Event()
+        path = self.tmp.name
+
+        def slow_path(repo_id):
+            # Stands in for a long download
+            loading.set()
+            release.wait(5)
+            return path
+
+        with patch.object(ModelManager, 'ensure_model_path', staticmethod(slow_path)):
+            loader = threading.Thread(target=ModelManager.get_model, args=("joint-1.5b",))
+            loader.start()
+            self.assertTrue(loading.wait(5))
+            lookups = []
+            worker = threading.Thread(target=lambda: lookups.append(
+                (ModelManager.get_model("chat-3b"), ModelManager.stats())))
+            worker.start()
+            worker.join(2)
+            still_blocked = worker.is_alive()
+            release.set()
+            loader.join(5)
+            worker.join(5)
+
+        self.assertFalse(still_blocked)
+        served, stats = lookups[0]
+        self.assertIs(served, chat)
+        self.assertEqual([m["repo_id"] for m in stats["resident"]], ["chat-3b"])
+        self.assertEqual(ModelManager.metrics["loads"], 2)
+
+    def test_drafting_instance_serves_plain_requests(self):
+        ModelManager.get_model("chat-3b", n_ctx=4096)  # A joint loads the plain model first
+        chat = ModelManager.get_model("chat-3b", n_ctx=8192, chat_model=True, draft_model="joint-1.5b")
+        resident = [m["repo_id"] for m in ModelManager.stats()["resident"]]
+        self.assertEqual(resident, ["chat-3b+draft:joint-1.5b"])
+        self.assertIs(ModelManager.get_model("chat-3b", n_ctx=4096), chat)
+        self.assertIs(ModelManager.get_model("chat-3b", n_ctx=8192, chat_model=True), chat)
+        self.assertEqual(ModelManager.metrics["loads"], 2)
+        self.assertEqual(ModelManager._chat_model, "chat-3b+draft:joint-1.5b")
+
+    def test_disabled_pair_is_not_served_to_plain_requests(self):
+        chat = ModelManager.get_model("chat-3b", n_ctx=8192, chat_model=True, draft_model="joint-1.5b")
+        speculative.disable_pair("chat-3b", "joint-1.5b")
+        self.assertIsNot(ModelManager.get_model("chat-3b", n_ctx=8192, chat_model=True), chat)
+        self.assertEqual(ModelManager._chat_model, "chat-3b")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from chatbot.prefix_cache import PrefixStateCache
+
+
+class FakeState:
+    def __init__(self, tokens):
+        self.n_tokens = len(tokens)
+        self.input_ids = list(tokens)
+        self.scores = np.zeros((512, 8), dtype='float32')
+
+
+class FakeLlama:
+    """Evaluates 'tokens' (the words of every message) and snapshots them."""
+    model_path = ""
+
+    def __init__(self):
+        self.evaluations = 0
+        self.loaded = None
+        self.tokens = []
+
+    def n_ctx(self):
+        return 4096
+
+    def reset(self):
+        self.tokens = []
+
+    def create_chat_completion(self, messages, max_tokens, temperature):
+        self.evaluations += 1
+        self.tokens = [word for m in messages for word in m["content"].split()]
+
+    def save_state(self):
+        return FakeState(self.tokens)
+
+    def load_state(self, state):
+        self.loaded = state
+
+
+def prefix_messages(prefix):
+    return [{"role": "system", "content": "Output JSON."}, {"role": "user", "content": prefix}]
+
+
+class TestPrefixStateCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = PrefixStateCache(cache_dir=self.tmp.name, ram_entries=4)
+
+    def test_prefix_is_evaluated_once_then_restored(self):
+        llm = FakeLlama()
+        for _ in range(3):
+            self.assertTrue(self.cache.restore(llm, "org/model", "entity_extract", prefix_messages("rules and examples")))
+        self.assertEqual(llm.evaluations, 1)
+        self.assertEqual(llm.loaded.input_ids, ["Output", "JSON.", "rules", "and", "examples"])
+        self.assertEqual(llm.loaded.scores.shape, (1, 8))  # Logits trimmed to one row
+        self.assertEqual(self.cache.metrics, {"ram_hits": 2, "disk_hits": 0, "builds": 1})
+
+    def test_state_persists_across_processes(self):
+        self.cache.restore(FakeLlama(), "org/model", "entity_extract", prefix_messages("rules"))
+        llm = FakeLlama()
+        fresh = PrefixStateCache(cache_dir=self.tmp.name)
+        fresh.restore(llm, "org/model", "entity_extract", prefix_messages("rules"))
+        self.assertEqual(llm.evaluations, 0)
+        self.assertEqual(fresh.metrics["disk_hits"], 1)
+
+    def test_edited_prefix_replaces_saved_state(self):
+        llm = FakeLlama()
+        self.cache.restore(llm, "org/model", "entity_extract", prefix_messages("rules v1"))
+        self.cache.restore(llm, "org/model", "entity_extract", prefix_messages("rules v2"))
+        self.cache.restore(llm, "org/model", "chunk_filter", prefix_messages("rules v1"))
+        self.assertEqual(llm.evaluations, 3)
+        self.assertEqual(len(os.listdir(self.tmp.name)), 2)  # One state per (model, joint)
+
+    def test_backend_without_state_support_is_skipped(self):
+        self.assertFalse(self.cache.restore(object(), "org/model", "entity_extract", prefix_messages("rules")))
+
+
+if __name__ == '__main__':
+    unittest.main()
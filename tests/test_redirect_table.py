@@ -0,0 +1,194 @@
+import os
+import tempfile
+import unittest
+import uuid
+import zlib
+from unittest import mock
+
+import faiss
+import libzim
+import numpy as np
+from libzim.writer import Creator, Item, StringProvider, Hint
+
+from chatbot import config
+from chatbot.index_titles import run_index_titles
+from chatbot.rag import RAGSystem
+from chatbot.redirect_table import DANGLING, RedirectTable, build_redirect_table
+from chatbot.title_shards import TitleShardStore
+from chatbot.zim_utils import sidecar_path
+
+
+class _Article(Item):
+    def __init__(self, path, title, html):
+        super().__init__()
+        self._path, self._title, self._html = path, title, html
+
+    def get_path(self): return self._path
+    def get_title(self): return self._title
+    def get_mimetype(self): return "text/html"
+    def get_contentprovider(self): return StringProvider(self._html)
+    def get_hints(self): return {Hint.FRONT_ARTICLE: True}
+
+
+def _build_zim(zim_path):
+    with Creator(zim_path) as creator:
+        creator.add_item(_Article("Final", "Final", "<p>Final</p>"))
+        creator.add_item(_Article("Other", "Other", "<p>Other</p>"))
+        creator.add_redirection("Mid", "Mid", "Final", {Hint.FRONT_ARTICLE: True})
+        creator.add_redirection("Start", "Start", "Mid", {Hint.FRONT_ARTICLE: True})
+        creator.add_redirection("Alias", "Alias", "Other", {Hint.FRONT_ARTICLE: True})
+
+
+class _FakeEntry:
+    """Entry whose redirect target may be missing (dangling) or loop back."""
+
+    def __init__(self, archive, index, path, target=None):
+        self.archive, self._index, self.path, self.target = archive, index, path, target
+        self.title = path
+
+    @property
+    def is_redirect(self):
+        return self.target is not None
+
+    def get_redirect_entry(self):
+        if self.target not in self.archive.by_path:
+            raise KeyError(self.target)
+        return self.archive.by_path[self.target]
+
+
+class _FakeArchive:
+    """libzim's writer drops loops and dangling redirects, so such archives are faked."""
+
+    def __init__(self, redirects, articles):
+        self.uuid = uuid.uuid4()
+        self.entries = []
+        for path in articles:
+            self.entries.append(_FakeEntry(self, len(self.entries), path))
+        for path, target in redirects.items():
+            self.entries.append(_FakeEntry(self, len(self.entries), path, target))
+        self.by_path = {entry.path: entry for entry in self.entries}
+
+    @property
+    def entry_count(self):
+        return len(self.entries)
+
+    def get_entry_by_index(self, index):
+        return self.entries[index]
+
+
+class TestRedirectTable(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.zim_path = os.path.join(self.tmp.name, "redirects_test.zim")
+        _build_zim(self.zim_path)
+        self.archive = libzim.Archive(self.zim_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_chains_are_flattened(self):
+        build_redirect_table(self.zim_path, self.archive)
+        table = RedirectTable.load(self.zim_path, self.archive)
+        self.assertEqual(len(table), 3)
+
+        start = self.archive.get_entry_by_path("Start")
+        final = self.archive.get_entry_by_path("Final")
+        self.assertEqual(table.final_index(start._index), final._index)
+        self.assertEqual(table.resolve(self.archive, start).path, "Final")
+        self.assertEqual(table.resolve(self.archive, self.archive.get_entry_by_path("Alias")).path, "Other")
+        # Articles pass through unchanged
+        self.assertEqual(table.resolve(self.archive, final).path, "Final")
+
+    def test_loops_and_dangling_targets(self):
+        archive = _FakeArchive(
+            {"LoopA": "LoopB", "LoopB": "LoopA", "Broken": "Missing", "ToBroken": "Broken", "Ok": "Page"},
+            ["Page"],
+        )
+        zim_path = os.path.join(self.tmp.name, "fake.zim")
+        build_redirect_table(zim_path, archive)
+        table = RedirectTable.load(zim_path, archive)
+
+        for path in ["LoopA", "LoopB", "Broken", "ToBroken"]:
+            entry = archive.by_path[path]
+            self.assertEqual(table.final_index(entry._index), DANGLING, path)
+            self.assertIsNone(table.resolve(archive, entry), path)
+        self.assertEqual(table.resolve(archive, archive.by_path["Ok"]).path, "Page")
+
+    def test_stale_sidecar_is_ignored_and_rebuilt(self):
+        build_redirect_table(self.zim_path, self.archive)
+        old_uuid = self.archive.uuid
+
+        # Replace the archive in place: same path, new UUID
+        del self.archive
+        os.remove(self.zim_path)
+        _build_zim(self.zim_path)
+        archive = libzim.Archive(self.zim_path)
+        self.assertNotEqual(archive.uuid, old_uuid)
+        self.assertIsNone(RedirectTable.load(self.zim_path, archive))
+
+        self.assertEqual(run_index_titles([self.zim_path]), 0)
+        self.assertIsNotNone(RedirectTable.load(self.zim_path, archive))
+
+    def test_corrupt_sidecar_is_ignored(self):
+        with open(sidecar_path(self.zim_path, "redirects"), 'wb') as f:
+            f.write(b"not a redirect table")
+        self.assertIsNone(RedirectTable.load(self.zim_path, self.archive))
+
+
+class BagOfWordsEncoder:
+    """Each word is one dimension, so cosine similarity measures word overlap."""
+    DIM = 64
+
+    def encode(self, texts, batch_size=None):
+        vectors = np.zeros((len(texts), self.DIM), dtype='float32')
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode()) % self.DIM] += 1
+        return vectors
+
+
+class TestSemanticTitleRedirects(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.zim_path = os.path.join(self.tmp.name, "semantic_redirects.zim")
+        _build_zim(self.zim_path)
+        archive = libzim.Archive(self.zim_path)
+        build_redirect_table(self.zim_path, archive)
+
+        titles = ["Start", "Other"]
+        index_dir = os.path.join(self.tmp.name, "indices")
+        embeddings = BagOfWordsEncoder().encode(titles)
+        faiss.normalize_L2(embeddings)
+        index = faiss.IndexFlatIP(BagOfWordsEncoder.DIM)
+        index.add(embeddings)
+        TitleShardStore(index_dir).save(str(archive.uuid), index, [(titles, titles)])
+
+        with mock.patch.object(config, 'ZIM_PREOPEN', False), \
+                mock.patch.object(config, 'USE_JOINTS', False), \
+                mock.patch.object(config, 'TITLE_INDEX_BACKGROUND_LOAD', False):
+            self.rag = RAGSystem(index_dir=index_dir, zim_paths=[self.zim_path])
+        self.rag.load_title_index_async().join(5)
+        self.rag.encoder = BagOfWordsEncoder()
+
+    def tearDown(self):
+        self.rag.archive_pool.close_all()
+        self.tmp.cleanup()
+
+    def test_semantic_hits_resolve_through_the_table(self):
+        self.assertIsNotNone(self.rag.redirect_tables.get(self.zim_path))
+        with mock.patch.object(self.rag, '_resolve_redirect', wraps=self.rag._resolve_redirect) as resolve:
+            results = self.rag.search_by_title("Start")
+        self.assertEqual(results[0]['metadata']['path'], "Start")
+        self.assertIn("Final", results[0]['text'])
+        self.assertEqual(resolve.call_count, 2)
+
+    def test_unresolvable_semantic_hits_are_skipped(self):
+        table = self.rag.redirect_tables[self.zim_path]
+        resolve = table.resolve
+        with mock.patch.object(table, 'resolve', side_effect=lambda zim, entry: None if entry.path == "Start" else resolve(zim, entry)):
+            results = self.rag.search_by_title("Start")
+        self.assertEqual([r['metadata']['path'] for r in results], ["Other"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+import zlib
+from unittest import mock
+
+import faiss
+import libzim
+import numpy as np
+from libzim.writer import Creator, Item, StringProvider, Hint
+
+from chatbot import config
+from chatbot.rag import RAGSystem
+from chatbot.title_shards import TitleShardStore
+
+
+class _Article(Item):
+    def __init__(self, path, title, html):
+        super().__init__()
+        self._path, self._title, self._html = path, title, html
+
+    def get_path(self): return self._path
+    def get_title(self): return self._title
+    def get_mimetype(self): return "text/html"
+    def get_contentprovider(self): return StringProvider(self._html)
+    def get_hints(self): return {Hint.FRONT_ARTICLE: True}
+
+
+class BagOfWordsEncoder:
+    """Each word is one dimension, so cosine similarity measures word overlap."""
+    DIM = 1024
+
+    def encode(self, texts, batch_size=None):
+        vectors = np.zeros((len(texts), self.DIM), dtype='float32')
+        for row, text in enumerate(texts):
+            for word in text.lower().replace('_', ' ').split():
+                vectors[row, zlib.crc32(word.encode()) % self.DIM] += 1
+        return vectors
+
+
+TITLES = ["Mount Etna", "Mount Etna eruptions", "Mount Vesuvius", "Sicily"]
+
+
+class TestSemanticCandidates(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.zim_path = os.path.join(cls.tmp.name, "semantic_test.zim")
+        with Creator(cls.zim_path) as creator:
+            for title in TITLES:
+                creator.add_item(_Article(title.replace(' ', '_'), title, f"<p>{title} article.</p>"))
+
+        cls.index_dir = os.path.join(cls.tmp.name, "indices")
+        embeddings = BagOfWordsEncoder().encode(TITLES)
+        faiss.normalize_L2(embeddings)
+        index = faiss.IndexFlatIP(BagOfWordsEncoder.DIM)
+        index.add(embeddings)
+        uuid = str(libzim.Archive(cls.zim_path).uuid)
+        TitleShardStore(cls.index_dir).save(uuid, index, [(TITLES, [t.replace(' ', '_') for t in TITLES])])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(config, 'ZIM_PREOPEN', False),
+            mock.patch.object(config, 'USE_JOINTS', False),
+            mock.patch.object(config, 'TITLE_INDEX_BACKGROUND_LOAD', True),
+            mock.patch.object(config, 'SEMANTIC_CANDIDATES_ENABLED', True),
+            mock.patch.object(config, 'SEMANTIC_CANDIDATE_COUNT', 10),
+            mock.patch.object(config, 'SEMANTIC_CANDIDATE_MIN_SCORE', 0.6),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.rag = RAGSystem(index_dir=self.index_dir, zim_paths=[self.zim_path])
+        self.rag.encoder = BagOfWordsEncoder()
+        self.assertTrue(self.rag.title_index_ready.wait(5))
+
+        self.llm = mock.patch.object(self.rag, '_llm_candidate_titles', return_value=["From_LLM"]).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def tearDown(self):
+        self.rag.archive_pool.close_all()
+
+    def test_close_titles_replace_the_llm(self):
+        candidates = self.rag._generate_candidate_titles("Mount Etna")
+        self.llm.assert_not_called()
+        # Neighbours at or above the threshold, best first; the heuristic spellings coincide
+        self.assertEqual(candidates, ["Mount_Etna", "Mount_Etna_eruptions"])
+
+    def test_titles_below_threshold_are_dropped(self):
+        # "Mount Etna eruptions" scores 1.0, "Mount Etna" 0.82, "Mount Vesuvius" 0.41
+        candidates = self.rag._generate_candidate_titles("Mount Etna eruptions")
+        self.llm.assert_not_called()
+        self.assertIn("Mount_Etna", candidates)
+        self.assertNotIn("Mount_Vesuvius", candidates)
+
+    def test_nothing_close_enough_asks_the_llm(self):
+        # Best neighbour "Mount Etna" scores 1/sqrt(6) ~ 0.41
+        self.assertEqual(self.rag._semantic_candidate_titles("Etna volcano lava"), [])
+        self.assertEqual(self.rag._generate_candidate_titles("Etna volcano lava"), ["From_LLM"])
+        self.llm.assert_called_once()
+
+    def test_threshold_is_configurable(self):
+        with mock.patch.object(config, 'SEMANTIC_CANDIDATE_MIN_SCORE', 0.4):
+            candidates = self.rag._generate_candidate_titles("Etna volcano lava")
+        self.llm.assert_not_called()
+        self.assertEqual(candidates[0], "Mount_Etna")
+
+    def test_llm_used_while_index_loading_or_disabled(self):
+        self.rag.title_shards, shards = None, self.rag.title_shards
+        self.assertEqual(self.rag._generate_candidate_titles("Mount Etna"), ["From_LLM"])
+        self.rag.title_shards = shards
+        with mock.patch.object(config, 'SEMANTIC_CANDIDATES_ENABLED', False):
+            self.assertEqual(self.rag._generate_candidate_titles("Mount Etna"), ["From_LLM"])
+        self.assertEqual(self.llm.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
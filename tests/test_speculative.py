@@ -0,0 +1,92 @@
+import unittest
+
+import numpy as np
+
+from chatbot import speculative
+from chatbot.speculative import DraftModelDecoding
+
+
+class FakeDraftLlama:
+    """Greedy 'draft model' that always continues with the same tokens."""
+
+    def __init__(self, continuation):
+        self.continuation = continuation
+        self.calls = 0
+
+    def generate(self, tokens, temp, reset):
+        self.calls += 1
+        yield from self.continuation
+
+
+class DraftModelDecodingTest(unittest.TestCase):
+    def setUp(self):
+        speculative._disabled_pairs.clear()
+        speculative._throughput.clear()
+
+    def test_drafts_at_most_num_pred_tokens(self):
+        drafter = DraftModelDecoding(FakeDraftLlama([5, 6, 7, 8, 9]), "t", "d",
+                                     num_pred_tokens=3, min_acceptance=0.4, window=64)
+        draft = drafter(np.array([1, 2], dtype=np.intc))
+        self.assertEqual(list(draft), [5, 6, 7])
+        self.assertEqual(draft.dtype, np.intc)
+
+    def test_counts_accepted_prefix(self):
+        drafter = DraftModelDecoding(FakeDraftLlama([5, 6, 7]), "t", "d",
+                                     num_pred_tokens=3, min_acceptance=0.4, window=64)
+        drafter(np.array([1, 2], dtype=np.intc))
+        # Target kept 5, 6 then sampled its own 4 instead of 7
+        drafter(np.array([1, 2, 5, 6, 4], dtype=np.intc))
+        self.assertEqual((drafter.accepted, drafter.proposed), (2, 3))
+        # Target rejected the first drafted token
+        drafter(np.array([1, 2, 5, 6, 4, 9], dtype=np.intc))
+        self.assertEqual((drafter.accepted, drafter.proposed), (2, 6))
+
+    def test_low_acceptance_falls_back_and_disables_pair(self):
+        draft_llm = FakeDraftLlama([5, 6])
+        drafter = DraftModelDecoding(draft_llm, "t", "d", num_pred_tokens=2, min_acceptance=0.5, window=4)
+        ids = [1]
+        for _ in range(3):
+            drafter(np.array(ids, dtype=np.intc))
+            ids.append(0)  # every draft rejected
+        self.assertFalse(drafter.active)
+        self.assertFalse(speculative.pair_enabled("t", "d"))
+        calls = draft_llm.calls
+        self.assertEqual(len(drafter(np.array(ids, dtype=np.intc))), 0)
+        self.assertEqual(draft_llm.calls, calls)
+
+        # A new stream for a disabled pair does not draft either
+        drafter.reset_stats()
+        self.assertFalse(drafter.active)
+
+    def test_good_acceptance_keeps_drafting(self):
+        drafter = DraftModelDecoding(FakeDraftLlama([5, 6]), "t", "d", num_pred_tokens=2, min_acceptance=0.5, window=4)
+        ids = [1]
+        for _ in range(4):
+            drafter(np.array(ids, dtype=np.intc))
+            ids += [5, 6, 0]
+        self.assertTrue(drafter.active)
+        self.assertEqual(drafter.acceptance, 1.0)
+
+
+class ThroughputTest(unittest.TestCase):
+    def setUp(self):
+        speculative._throughput.clear()
+
+    def test_report_per_mode(self):
+        speculative.record_stream("plain", 100, 10.0)
+        speculative.record_stream("draft", 100, 4.0)
+        speculative.record_stream("draft", 100, 6.0)
+        speculative.record_stream("draft", 0, 1.0)
+        report = speculative.throughput_report()
+        self.assertEqual(report["plain"], {"streams": 1, "tokens": 100, "tok_per_s": 10.0})
+        self.assertEqual(report["draft"], {"streams": 2, "tokens": 200, "tok_per_s": 20.0})
+
+    def test_stream_timer_counts_after_first_token(self):
+        timer = speculative.StreamTimer("plain")
+        for _ in range(5):
+            timer.tick()
+        self.assertEqual(timer.tokens, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from chatbot.text_processing import TextProcessor
+
+ARTICLE = (
+    "<html><head><title>Ignored</title><style>.mw-x{color:red}</style></head><body>"
+    "<table class='infobox'><tr><td>Born &amp; raised</td></tr></table>"
+    "<p>Lead <b>paragraph</b>&nbsp;one.</p><script>var s = '<p>';</script><!-- note -->"
+    "<h2>History</h2><p>Later section.</p>"
+    "</body></html>"
+)
+
+class TestExtractLeadText(unittest.TestCase):
+    def test_matches_clean_text_body(self):
+        self.assertEqual(
+            TextProcessor.extract_lead_text(ARTICLE),
+            "Born & raised Lead paragraph one. History Later section."
+        )
+
+    def test_stops_at_budget(self):
+        html = ARTICLE.replace("</body>", "<p>filler</p>" * 10000 + "</body>")
+        text = TextProcessor.extract_lead_text(html, max_chars=20)
+        self.assertEqual(text, "Born & raised Lead p")
+
+    def test_buffer_input_matches_str(self):
+        html = ARTICLE.replace("Lead", "Café naïve")
+        buffer = memoryview(html.encode('utf-8'))
+        self.assertEqual(TextProcessor.extract_lead_text(buffer), TextProcessor.extract_lead_text(html))
+        self.assertEqual(TextProcessor.extract_lead_text(buffer, max_chars=20), TextProcessor.extract_lead_text(html, max_chars=20))
+
+    def test_skips_page_furniture(self):
+        html = (
+            "<div role='note' class='hatnote navigation-not-searchable'>For other uses, see Foo.</div>"
+            "<div id='toc' class='toc'><div class='toctitle'>Contents</div><ul><li>1 History</li></ul></div>"
+            "<table class='infobox vcard'><tr><td>Born 1900</td></tr></table>"
+            "<p>Lead<sup id='cite_ref-1' class='reference'><a href='#c'>[1]</a></sup> text.</p>"
+            "<h2>History<span class='mw-editsection'>[edit]</span></h2><p>Later.</p>"
+            "<table class='navbox'><tr><td><table class='navbox-inner'><tr><td>Nav</td></tr></table>"
+            "<div>Links</div></td></tr></table><p>End.</p>"
+        )
+        expected = "Born 1900 Lead text. History Later. End."
+        self.assertEqual(TextProcessor.extract_lead_text(html), expected)
+        self.assertEqual(TextProcessor.extract_lead_text(memoryview(html.encode('utf-8'))), expected)
+
+    def test_budget_goes_to_lead_not_hatnotes(self):
+        html = "<div class='hatnote'>" + "Not to be confused with Bar. " * 50 + "</div><p>Lead text.</p>"
+        self.assertEqual(TextProcessor.extract_lead_text(html, max_chars=10), "Lead text.")
+
+    def test_unclosed_furniture_keeps_following_text(self):
+        self.assertEqual(TextProcessor.extract_lead_text("<div class='hatnote'>Note <p>Lead."), "Note Lead.")
+
+if __name__ == '__main__':
+    unittest.main()
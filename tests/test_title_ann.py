@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import faiss
+import numpy as np
+
+from chatbot import config
+from chatbot.title_ann import build_title_index, read_title_index, recall_report
+
+
+def _chunks(n=2000, dim=32, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((n, dim)).astype('float32')
+    faiss.normalize_L2(vectors)
+    return lambda: (vectors[i:i + 500] for i in range(0, n, 500))
+
+
+class TestTitleAnn(unittest.TestCase):
+    def test_flat_report_has_perfect_recall(self):
+        rows = recall_report(["flat"], 32, 2000, _chunks(), k=10, num_queries=20)
+        self.assertEqual(rows[0]['type'], "flat")
+        self.assertAlmostEqual(rows[0]['recall'], 1.0)
+
+    def test_small_shards_fall_back_to_flat(self):
+        index = build_title_index("ivfpq", 32, 2000, _chunks())
+        self.assertEqual(index.ntotal, 2000)
+        self.assertIsInstance(index, faiss.IndexFlat)
+
+    def test_sq8_round_trips_through_disk(self):
+        with mock.patch.object(config, "TITLE_INDEX_MIN_ANN_TITLES", 0):
+            index = build_title_index("sq8", 32, 2000, _chunks())
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "shard.faiss")
+                faiss.write_index(index, path)
+                loaded = read_title_index(path)
+                self.assertEqual(loaded.ntotal, 2000)
+                rows = recall_report(["sq8"], 32, 2000, _chunks(), k=10, num_queries=20)
+        self.assertGreater(rows[0]['recall'], 0.8)
+
+
+if __name__ == '__main__':
+    unittest.main()
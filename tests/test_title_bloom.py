@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import libzim
+from libzim.writer import Creator, Item, StringProvider, Hint
+
+from chatbot import config
+from chatbot.index_titles import run_index_titles
+from chatbot.rag import RAGSystem
+from chatbot.title_bloom import TitleBloomFilter, build_title_bloom
+from chatbot.zim_utils import sidecar_path
+
+
+class _Article(Item):
+    def __init__(self, path, title, html):
+        super().__init__()
+        self._path, self._title, self._html = path, title, html
+
+    def get_path(self): return self._path
+    def get_title(self): return self._title
+    def get_mimetype(self): return "text/html"
+    def get_contentprovider(self): return StringProvider(self._html)
+    def get_hints(self): return {Hint.FRONT_ARTICLE: True}
+
+
+TITLE_COUNT = 2000
+
+
+def _build_zim(zim_path, titles):
+    with Creator(zim_path) as creator:
+        for title in titles:
+            creator.add_item(_Article(title.replace(' ', '_'), title, f"<p>{title}</p>"))
+        creator.add_redirection("Python", "Python", "Python_(programming_language)", {Hint.FRONT_ARTICLE: True})
+
+
+class TestTitleBloomFilter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.titles = ["Python (programming language)", "Guido van Rossum"] + [f"Article number {n}" for n in range(TITLE_COUNT)]
+        cls.zim_path = os.path.join(cls.tmp.name, "bloom_test.zim")
+        _build_zim(cls.zim_path, cls.titles)
+        cls.archive = libzim.Archive(cls.zim_path)
+        build_title_bloom(cls.zim_path, cls.archive)
+        cls.bloom = TitleBloomFilter.load(cls.zim_path, cls.archive)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_no_false_negatives(self):
+        for title in self.titles:
+            self.assertTrue(self.bloom.may_contain(title), title)
+            self.assertTrue(self.bloom.may_contain(title.replace(' ', '_').upper()), title)
+
+    def test_routes_spelling_variants(self):
+        for spelling in ["PYTHON", "guido_van_rossum", "A/Python (programming language)", "/Guido van Rossum"]:
+            self.assertTrue(self.bloom.may_contain(spelling), spelling)
+        self.assertFalse(self.bloom.may_contain("Monty Python"))
+
+    def test_false_positive_rate_within_bound(self):
+        probes = 20000
+        false_positives = sum(self.bloom.may_contain(f"Absent title {n}") for n in range(probes))
+        # Keys are sized for TITLE_BLOOM_FALSE_POSITIVE_RATE; allow for sampling noise
+        self.assertLess(false_positives / probes, 2 * config.TITLE_BLOOM_FALSE_POSITIVE_RATE)
+
+    def test_size_tracks_key_count(self):
+        # Title and path keys coincide here: ~1.2 bytes per key at 1%
+        self.assertLess(self.bloom.nbytes, 2 * (TITLE_COUNT + 3))
+
+
+class TestTitleBloomSidecar(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.zim_path = os.path.join(self.tmp.name, "bloom_sidecar.zim")
+        _build_zim(self.zim_path, ["Python (programming language)", "Guido van Rossum"])
+        build_title_bloom(self.zim_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_changed_mtime_invalidates_and_rebuilds(self):
+        self.assertIsNotNone(TitleBloomFilter.load(self.zim_path))
+        stat = os.stat(self.zim_path)
+        os.utime(self.zim_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNone(TitleBloomFilter.load(self.zim_path))
+
+        self.assertEqual(run_index_titles([self.zim_path]), 0)
+        self.assertIsNotNone(TitleBloomFilter.load(self.zim_path))
+
+    def test_replaced_archive_invalidates(self):
+        os.remove(self.zim_path)
+        _build_zim(self.zim_path, ["Python (programming language)", "Guido van Rossum", "Monty Python"])
+        self.assertIsNone(TitleBloomFilter.load(self.zim_path))
+
+    def test_uuid_mismatch_with_open_archive(self):
+        other_path = os.path.join(self.tmp.name, "other.zim")
+        _build_zim(other_path, ["Other"])
+        self.assertIsNone(TitleBloomFilter.load(self.zim_path, libzim.Archive(other_path)))
+        self.assertIsNotNone(TitleBloomFilter.load(self.zim_path, libzim.Archive(self.zim_path)))
+
+    def test_corrupt_sidecar(self):
+        with open(sidecar_path(self.zim_path, "bloom"), 'wb') as f:
+            f.write(b"garbage")
+        self.assertIsNone(TitleBloomFilter.load(self.zim_path))
+
+    def test_missing_sidecar_routes_to_every_archive(self):
+        os.remove(sidecar_path(self.zim_path, "bloom"))
+        self.assertIsNone(TitleBloomFilter.load(self.zim_path))
+
+        with mock.patch.object(config, 'ZIM_PREOPEN', False), \
+                mock.patch.object(config, 'USE_JOINTS', False), \
+                mock.patch.object(config, 'TITLE_INDEX_BACKGROUND_LOAD', False):
+            rag = RAGSystem(index_dir=os.path.join(self.tmp.name, "indices"), zim_paths=[self.zim_path])
+        timings = {}
+        self.assertEqual(rag._route_candidate("Monty Python", timings), rag.zim_paths)
+        self.assertEqual(timings, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import libzim
+from libzim.writer import Creator, Item, StringProvider, Hint
+
+from chatbot import config
+from chatbot.rag import RAGSystem
+from chatbot.title_cache import TitleResolutionCache, MISS
+from chatbot.zim_utils import archive_fingerprint
+
+
+class _Article(Item):
+    def __init__(self, path, title, html):
+        super().__init__()
+        self._path, self._title, self._html = path, title, html
+
+    def get_path(self): return self._path
+    def get_title(self): return self._title
+    def get_mimetype(self): return "text/html"
+    def get_contentprovider(self): return StringProvider(self._html)
+    def get_hints(self): return {Hint.FRONT_ARTICLE: True}
+
+
+class TestTitleResolutionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "title_cache.sqlite")
+        self.cache = TitleResolutionCache(self.db_path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_hit_and_miss_roundtrip(self):
+        self.cache.put_hit("uuid-a", "Albert Einstein", "Albert_Einstein", "Albert_Einstein")
+        self.cache.put_miss("uuid-a", "Not_A_Title")
+
+        # Space/underscore spellings share one key
+        self.assertEqual(self.cache.get("uuid-a", "Albert_Einstein"), ("Albert_Einstein", "Albert_Einstein"))
+        self.assertIs(self.cache.get("uuid-a", "Not A Title"), MISS)
+        self.assertIsNone(self.cache.get("uuid-b", "Albert Einstein"))
+
+    def test_persists_across_instances(self):
+        self.cache.put_hit("uuid-a", "Py", "Py", "Python_(programming_language)")
+        self.cache.close()
+
+        self.cache = TitleResolutionCache(self.db_path)
+        self.assertEqual(self.cache.get("uuid-a", "Py"), ("Py", "Python_(programming_language)"))
+
+    def test_prune_drops_removed_archives(self):
+        self.cache.put_miss("uuid-a", "X")
+        self.cache.put_miss("uuid-b", "X")
+        self.cache.flush()
+
+        self.assertEqual(self.cache.prune(["uuid-b"]), 1)
+        self.assertIsNone(self.cache.get("uuid-a", "X"))
+        self.assertIs(self.cache.get("uuid-b", "X"), MISS)
+
+    def test_stats_count_negative_rows_separately(self):
+        self.cache.put_hit("uuid-a", "Py", "Py", "Python")
+        self.cache.put_miss("uuid-a", "X")
+        self.cache.get("uuid-a", "Py")
+        self.cache.get("uuid-a", "X")
+        self.cache.get("uuid-a", "X")
+        self.cache.get("uuid-a", "Unknown")
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'negative_hits': 2, 'misses': 1})
+
+    def test_stats_are_exact_under_concurrent_lookups(self):
+        # Fan-out probe threads share one cache
+        self.cache.put_hit("uuid-a", "Py", "Py", "Python")
+        self.cache.put_miss("uuid-a", "X")
+
+        def lookups():
+            for _ in range(300):
+                self.cache.get("uuid-a", "Py")
+                self.cache.get("uuid-a", "X")
+                self.cache.get("uuid-a", "Unknown")
+
+        threads = [threading.Thread(target=lookups) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.cache.stats(), {'hits': 2400, 'negative_hits': 2400, 'misses': 2400})
+
+
+class TestTitleCachePrune(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.zim_paths = []
+        for n in range(2):
+            path = os.path.join(self.tmp.name, f"prune_{n}.zim")
+            with Creator(path) as creator:
+                creator.add_item(_Article(f"Article_{n}", f"Article {n}", f"<p>Article {n}</p>"))
+            self.zim_paths.append(path)
+        patches = [
+            mock.patch.object(config, 'ZIM_PREOPEN', False),
+            mock.patch.object(config, 'USE_JOINTS', False),
+            mock.patch.object(config, 'TITLE_INDEX_BACKGROUND_LOAD', False),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.rag = RAGSystem(index_dir=os.path.join(self.tmp.name, "indices"), zim_paths=self.zim_paths)
+
+    def tearDown(self):
+        self.rag.title_cache.close()
+        self.rag.archive_pool.close_all()
+        self.tmp.cleanup()
+
+    def test_prune_keeps_current_archives(self):
+        # Only the first archive is open; the second is fingerprinted without the pool
+        self.rag.get_zim_archive(self.zim_paths[0])
+        live = [archive_fingerprint(libzim.Archive(path)) for path in self.zim_paths]
+        cache = self.rag.title_cache
+        for key in live + ["replaced-archive"]:
+            cache.put_miss(key, "X")
+        cache.flush()
+
+        self.rag._prune_title_cache()
+
+        self.assertIsNone(cache.get("replaced-archive", "X"))
+        for key in live:
+            self.assertIs(cache.get(key, "X"), MISS)
+        self.assertNotIn(os.path.abspath(self.zim_paths[1]), self.rag.archive_pool)
+
+if __name__ == '__main__':
+    unittest.main()
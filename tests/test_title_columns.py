@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+
+from chatbot.title_columns import TitleColumns, write_title_columns
+
+
+class TestTitleColumns(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "shard.meta")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rows_round_trip_across_chunks(self):
+        count = write_title_columns(self.path, [
+            (["Zürich", "Python (programming language)"], ["Zürich", "A/Python_(programming_language)"]),
+            ([], []),
+            (["東京"], ["東京"]),
+        ])
+        columns = TitleColumns.load(self.path)
+        self.assertEqual(count, 3)
+        self.assertEqual(len(columns), 3)
+        self.assertEqual(columns[1], {'title': "Python (programming language)", 'path': "A/Python_(programming_language)"})
+        self.assertEqual(columns.title(2), "東京")
+        with self.assertRaises(IndexError):
+            columns[3]
+
+    def test_empty_and_corrupt_files(self):
+        write_title_columns(self.path, [])
+        self.assertEqual(len(TitleColumns.load(self.path)), 0)
+        with open(self.path, 'wb') as f:
+            f.write(b"not a metadata file at all....")
+        self.assertIsNone(TitleColumns.load(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
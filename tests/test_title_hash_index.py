@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import libzim
+from libzim.writer import Creator, Item, StringProvider, Hint
+
+from chatbot.title_hash_index import TitleHashIndex, build_title_hash_index
+from chatbot.zim_utils import follow_redirects
+
+
+class _Article(Item):
+    def __init__(self, path, title, html):
+        super().__init__()
+        self._path, self._title, self._html = path, title, html
+
+    def get_path(self): return self._path
+    def get_title(self): return self._title
+    def get_mimetype(self): return "text/html"
+    def get_contentprovider(self): return StringProvider(self._html)
+    def get_hints(self): return {Hint.FRONT_ARTICLE: True}
+
+
+class TestTitleHashIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.zim_path = os.path.join(self.tmp.name, "wikipedia_test.zim")
+        with Creator(self.zim_path) as creator:
+            creator.add_item(_Article("Python_(programming_language)", "Python (programming language)", "<p>Python</p>"))
+            creator.add_item(_Article("Guido_van_Rossum", "Guido van Rossum", "<p>Guido</p>"))
+            creator.add_redirection("Python", "Python", "Python_(programming_language)", {Hint.FRONT_ARTICLE: True})
+        self.archive = libzim.Archive(self.zim_path)
+        build_title_hash_index(self.zim_path, self.archive)
+        self.index = TitleHashIndex.load(self.zim_path, self.archive)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_spelling_variants_resolve(self):
+        for spelling in ["Guido van Rossum", "guido_VAN_rossum", "/Guido_van_Rossum", "A/Guido van Rossum"]:
+            entry = self.index.find_entry(self.archive, spelling)
+            self.assertIsNotNone(entry, spelling)
+            self.assertEqual(entry.path, "Guido_van_Rossum")
+
+    def test_redirect_entry_is_returned(self):
+        entry = self.index.find_entry(self.archive, "python")
+        self.assertTrue(entry.is_redirect)
+        self.assertEqual(follow_redirects(entry).path, "Python_(programming_language)")
+
+    def test_miss(self):
+        self.assertIsNone(self.index.find_entry(self.archive, "Monty Python"))
+
+    def test_cached_load_reads_sidecar_once(self):
+        with mock.patch.object(TitleHashIndex, 'load', wraps=TitleHashIndex.load) as load:
+            first = TitleHashIndex.load_cached(self.zim_path, self.archive)
+            self.assertIs(TitleHashIndex.load_cached(self.zim_path, libzim.Archive(self.zim_path)), first)
+        self.assertEqual(load.call_count, 1)
+
+        # A replaced archive (new UUID) is loaded again
+        os.remove(self.zim_path)
+        with Creator(self.zim_path) as creator:
+            creator.add_item(_Article("Monty_Python", "Monty Python", "<p>Monty</p>"))
+        build_title_hash_index(self.zim_path)
+        replaced = TitleHashIndex.load_cached(self.zim_path, libzim.Archive(self.zim_path))
+        self.assertIsNot(replaced, first)
+        self.assertEqual(len(replaced), 1)
+
+    def test_cached_load_prefers_already_loaded_indexes(self):
+        with mock.patch.object(TitleHashIndex, 'load') as load:
+            loaded = {os.path.abspath(self.zim_path): self.index}
+            self.assertIs(TitleHashIndex.load_cached(self.zim_path, self.archive, loaded), self.index)
+            # No sidecar for this archive: known, not re-read
+            self.assertIsNone(TitleHashIndex.load_cached(self.zim_path, self.archive, {os.path.abspath(self.zim_path): None}))
+        load.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import glob
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from libzim.writer import Creator, Item, StringProvider, Hint
+
+from chatbot import config
+from chatbot.title_index_builder import TitleIndexBuilder, _unpack_strings
+
+
+class _Article(Item):
+    def __init__(self, path, title, html):
+        super().__init__()
+        self._path, self._title, self._html = path, title, html
+
+    def get_path(self): return self._path
+    def get_title(self): return self._title
+    def get_mimetype(self): return "text/html"
+    def get_contentprovider(self): return StringProvider(self._html)
+    def get_hints(self): return {Hint.FRONT_ARTICLE: True}
+
+
+class FakeEncoder:
+    """Deterministic title embeddings; raises once `fail_after` calls have been made."""
+    device = "cpu"
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.encoded = []
+
+    def get_sentence_embedding_dimension(self):
+        return 8
+
+    def encode(self, titles, batch_size=None):
+        if self.fail_after is not None and len(self.encoded) >= self.fail_after:
+            raise KeyboardInterrupt("build interrupted")
+        self.encoded.append(list(titles))
+        return np.array([np.frombuffer(hashlib.sha256(t.encode()).digest()[:8], dtype=np.uint8) for t in titles],
+                        dtype='float32') + 1
+
+
+class TestTitleIndexBuilder(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.zim_path = os.path.join(cls.tmp.name, "builder_test.zim")
+        with Creator(cls.zim_path) as creator:
+            for n in range(45):
+                creator.add_item(_Article(f"Title_{n}", f"Title {n}", f"<p>{n}</p>"))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(config, 'TITLE_INDEX_CHUNK_ENTRIES', 10),
+            mock.patch.object(config, 'TITLE_INDEX_SCAN_WORKERS', 1),
+            mock.patch.object(config, 'TITLE_INDEX_ENCODE_PROCESSES', 1),
+            mock.patch.object(config, 'TITLE_INDEX_TYPE', 'flat'),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.index_dir.cleanup)
+
+    def _build(self, encoder):
+        builder = TitleIndexBuilder(encoder, self.index_dir.name)
+        shards = []
+        for zim_path, uuid, index, rows in builder.build_shards([self.zim_path]):
+            titles = [str(t) for chunk_titles, _ in rows for t in chunk_titles]
+            shards.append((uuid, index.ntotal, titles))
+        return shards
+
+    def _checkpoints(self):
+        return sorted(os.path.basename(p) for p in glob.glob(os.path.join(self.index_dir.name, "title_build", "*", "*.npz")))
+
+    def test_interrupted_build_resumes_from_checkpoints(self):
+        with self.assertRaises(KeyboardInterrupt):
+            self._build(FakeEncoder(fail_after=2))
+        self.assertEqual(self._checkpoints(), ["000000000000.npz", "000000000010.npz"])
+
+        encoder = FakeEncoder()
+        (uuid, ntotal, titles), = self._build(encoder)
+        # Only the ranges without a checkpoint were encoded again
+        self.assertEqual(len(encoder.encoded), 3)
+        self.assertEqual(ntotal, 45)
+        self.assertEqual(len(set(titles)), 45)
+        # Checkpoints go once the shard has been handed over
+        self.assertEqual(self._checkpoints(), [])
+
+    def test_resumed_build_matches_clean_build(self):
+        clean = self._build(FakeEncoder())
+        with self.assertRaises(KeyboardInterrupt):
+            self._build(FakeEncoder(fail_after=3))
+        self.assertEqual(self._build(FakeEncoder()), clean)
+
+    def test_checkpoints_of_other_chunk_size_are_not_reused(self):
+        with self.assertRaises(KeyboardInterrupt):
+            self._build(FakeEncoder(fail_after=2))
+        encoder = FakeEncoder()
+        with mock.patch.object(config, 'TITLE_INDEX_CHUNK_ENTRIES', 20):
+            (_, ntotal, _), = self._build(encoder)
+        self.assertEqual(len(encoder.encoded), 3)
+        self.assertEqual(ntotal, 45)
+
+    def test_checkpoint_strings_are_not_padded(self):
+        with self.assertRaises(KeyboardInterrupt):
+            self._build(FakeEncoder(fail_after=1))
+        path, = glob.glob(os.path.join(self.index_dir.name, "title_build", "*", "*.npz"))
+        with np.load(path) as data:
+            self.assertFalse(any(data[name].dtype.kind in "US" for name in data.files))
+            titles = _unpack_strings(data['title_arena'], data['title_ends'])
+            paths = _unpack_strings(data['path_arena'], data['path_ends'])
+            self.assertEqual(len(data['title_arena']), sum(len(t.encode()) for t in titles))
+        self.assertEqual(len(titles), 10)
+        self.assertEqual(paths, [t.replace(' ', '_') for t in titles])
+
+
+if __name__ == '__main__':
+    unittest.main()
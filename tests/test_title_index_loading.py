@@ -0,0 +1,137 @@
+import os
+import tempfile
+import threading
+import unittest
+import zlib
+from unittest import mock
+
+import faiss
+import libzim
+import numpy as np
+from libzim.writer import Creator, Item, StringProvider, Hint
+
+from chatbot import config
+from chatbot.rag import RAGSystem
+from chatbot.title_hash_index import build_title_hash_index
+from chatbot.title_shards import TitleShardStore
+
+
+class _Article(Item):
+    def __init__(self, path, title, html):
+        super().__init__()
+        self._path, self._title, self._html = path, title, html
+
+    def get_path(self): return self._path
+    def get_title(self): return self._title
+    def get_mimetype(self): return "text/html"
+    def get_contentprovider(self): return StringProvider(self._html)
+    def get_hints(self): return {Hint.FRONT_ARTICLE: True}
+
+
+class BagOfWordsEncoder:
+    """Each word is one dimension, so cosine similarity measures word overlap."""
+    DIM = 64
+
+    def encode(self, texts, batch_size=None):
+        vectors = np.zeros((len(texts), self.DIM), dtype='float32')
+        for row, text in enumerate(texts):
+            for word in text.lower().replace('_', ' ').split():
+                vectors[row, zlib.crc32(word.encode()) % self.DIM] += 1
+        return vectors
+
+
+TITLES = ["Mount Etna", "Mount Vesuvius", "Sicily"]
+
+
+class TestTitleIndexLoading(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.zim_path = os.path.join(self.tmp.name, "loading_test.zim")
+        with Creator(self.zim_path) as creator:
+            for title in TITLES:
+                creator.add_item(_Article(title.replace(' ', '_'), title, f"<p>{title} article.</p>"))
+        archive = libzim.Archive(self.zim_path)
+        build_title_hash_index(self.zim_path, archive)
+
+        self.index_dir = os.path.join(self.tmp.name, "indices")
+        embeddings = BagOfWordsEncoder().encode(TITLES)
+        faiss.normalize_L2(embeddings)
+        index = faiss.IndexFlatIP(BagOfWordsEncoder.DIM)
+        index.add(embeddings)
+        TitleShardStore(self.index_dir).save(str(archive.uuid), index, [(TITLES, [t.replace(' ', '_') for t in TITLES])])
+
+        patches = [
+            mock.patch.object(config, 'ZIM_PREOPEN', False),
+            mock.patch.object(config, 'USE_JOINTS', False),
+            mock.patch.object(config, 'TITLE_INDEX_BACKGROUND_LOAD', False),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.rag = RAGSystem(index_dir=self.index_dir, zim_paths=[self.zim_path])
+        self.rag.encoder = BagOfWordsEncoder()
+
+    def tearDown(self):
+        self.rag.archive_pool.close_all()
+        self.tmp.cleanup()
+
+    def _gated_load(self):
+        """Hold the background load until the returned event is set."""
+        gate = threading.Event()
+        load = self.rag.title_shard_store.load
+
+        def gated(*args):
+            gate.wait(5)
+            return load(*args)
+
+        patcher = mock.patch.object(self.rag.title_shard_store, 'load', side_effect=gated)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return gate
+
+    def test_not_ready_until_background_load_finishes(self):
+        gate = self._gated_load()
+        thread = self.rag.load_title_index_async()
+        self.assertEqual(self.rag.title_index_status(), {'ready': False, 'shards': 0, 'titles': 0})
+        self.assertIsNone(self.rag.title_shards)
+
+        gate.set()
+        thread.join(5)
+        self.assertEqual(self.rag.title_index_status(), {'ready': True, 'shards': 1, 'titles': 3})
+
+    def test_search_falls_back_while_loading(self):
+        gate = self._gated_load()
+        thread = self.rag.load_title_index_async()
+        # Heuristic path: exact lookup through the title hash index
+        results = self.rag.search_by_title("mount etna")
+        self.assertEqual([(r['metadata']['title'], r['score']) for r in results], [("Mount Etna", 100.0)])
+
+        gate.set()
+        thread.join(5)
+        # Semantic path: nearest titles with their similarity
+        results = self.rag.search_by_title("Etna")
+        self.assertEqual(results[0]['metadata']['title'], "Mount Etna")
+        self.assertLess(results[0]['score'], 1.0)
+        self.assertEqual(len(results), 3)
+
+    def test_failed_load_still_becomes_ready(self):
+        with mock.patch.object(self.rag.title_shard_store, 'load', side_effect=OSError("unreadable shard")):
+            self.rag.load_title_index_async().join(5)
+        self.assertEqual(self.rag.title_index_status(), {'ready': True, 'shards': 0, 'titles': 0})
+        self.assertEqual(len(self.rag.search_by_title("mount etna")), 1)
+
+    def test_startup_loads_in_background(self):
+        with mock.patch.object(config, 'TITLE_INDEX_BACKGROUND_LOAD', True):
+            rag = RAGSystem(index_dir=self.index_dir, zim_paths=[self.zim_path])
+        self.assertTrue(rag.title_index_ready.wait(5))
+        self.assertEqual(rag.title_index_status()['titles'], 3)
+        rag.archive_pool.close_all()
+
+    def test_ready_without_loading_existing_index(self):
+        rag = RAGSystem(index_dir=self.index_dir, zim_paths=[self.zim_path], load_existing=False)
+        self.assertEqual(rag.title_index_status(), {'ready': True, 'shards': 0, 'titles': 0})
+        rag.archive_pool.close_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
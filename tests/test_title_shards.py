@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+import faiss
+import numpy as np
+
+from chatbot.title_shards import TitleShardStore
+
+
+def _shard(vectors, titles):
+    embeddings = np.ascontiguousarray(vectors, dtype='float32')
+    faiss.normalize_L2(embeddings)
+    index = faiss.IndexFlatIP(embeddings.shape[1])
+    index.add(embeddings)
+    return index, [(titles, [t.replace(' ', '_') for t in titles])]
+
+
+class TestTitleShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = TitleShardStore(self.tmp.name)
+        self.store.save("uuid-a", *_shard([[1, 0, 0], [0, 1, 0]], ["Alpha", "Beta"]))
+        self.store.save("uuid-b", *_shard([[0.9, 0.1, 0], [0, 0, 1]], ["Alpha Centauri", "Gamma"]))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_search_merges_shards_by_score(self):
+        shards = self.store.load({"/zims/a.zim": "uuid-a", "/zims/b.zim": "uuid-b"})
+        query = np.array([[1, 0, 0]], dtype='float32')
+        hits = shards.search(query, 2)
+        self.assertEqual([(zim, meta['title']) for _, zim, meta in hits],
+                         [("/zims/a.zim", "Alpha"), ("/zims/b.zim", "Alpha Centauri")])
+        self.assertEqual(len(shards), 4)
+        self.assertEqual(hits[1][2], {'title': "Alpha Centauri", 'path': "Alpha_Centauri"})
+
+    def test_removing_one_archive_keeps_the_others(self):
+        self.store.remove("uuid-a")
+        self.assertEqual(self.store.shard_ids(), ["uuid-b"])
+        shards = self.store.load({"/zims/a.zim": "uuid-a", "/zims/b.zim": "uuid-b"})
+        self.assertEqual([zim for zim, _, _ in shards.shards], ["/zims/b.zim"])
+
+    def test_prune_drops_shards_of_missing_archives(self):
+        self.assertEqual(self.store.prune(["uuid-b"]), ["uuid-a"])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "title_shards", "uuid-a.faiss")))
+
+
+if __name__ == '__main__':
+    unittest.main()